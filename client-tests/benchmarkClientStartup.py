@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+'''
+Benchmark the time to import the workspaceService client and to make a
+client, which dominate the run time of short lived scripts. Needs no
+server: nothing here makes a call.
+
+    python benchmarkClientStartup.py [runs]
+'''
+
+import os
+import subprocess
+import sys
+import timeit
+
+LIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+
+IMPORT = '''
+import time
+t = time.time()
+import biokbase.workspaceService.client
+print time.time() - t
+'''
+
+
+def import_times(runs):
+    # each import needs a fresh interpreter
+    env = dict(os.environ, PYTHONPATH=LIB, PYTHONDONTWRITEBYTECODE='1')
+    return [float(subprocess.check_output([sys.executable, '-c', IMPORT],
+                                          env=env))
+            for _ in range(runs)]
+
+
+def constructor_time(runs, **kwargs):
+    sys.path.insert(0, LIB)
+    from biokbase.workspaceService.client import workspaceService
+    return min(timeit.repeat(
+        lambda: workspaceService('http://localhost:7058', **kwargs),
+        number=runs, repeat=3)) / runs
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    times = sorted(import_times(runs))
+    print 'import: median %.1f ms, min %.1f ms over %d runs' % (
+        times[len(times) // 2] * 1000, times[0] * 1000, runs)
+    for name, kwargs in (('token', {'token': 'un=benchmark|sig=x'}),
+                         ('user_id/password', {'user_id': 'benchmark',
+                                               'password': 'x'}),
+                         ('authrc lookup', {})):
+        print 'constructor (%s): %.1f us' % (
+            name, constructor_time(runs * 50, **kwargs) * 1e6)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+'''
+Benchmark the JSON backends available to the workspaceService client on
+payloads shaped like a Genome and an FBA model. Needs no server.
+
+    python benchmarkJSONCodecs.py [features]
+'''
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'lib'))
+from biokbase.workspaceService import rpc
+
+
+def genome(features):
+    rand = random.Random(1)
+    bases = 'ACGT'
+    return {
+        'id': 'kb|g.0',
+        'scientific_name': 'Escherichia coli K-12',
+        'domain': 'Bacteria',
+        'genetic_code': 11,
+        'contigs': [{'id': 'kb|g.0.c.%d' % i,
+                     'dna': ''.join(rand.choice(bases) for _ in range(2000))}
+                    for i in range(5)],
+        'features': [{
+            'id': 'kb|g.0.peg.%d' % i,
+            'type': 'peg',
+            'location': [['kb|g.0.c.1', rand.randint(1, 10 ** 6), '+',
+                          rand.randint(100, 3000)]],
+            'function': 'Hypothetical protein %d' % i,
+            'aliases': set(['b%04d' % i, 'ECK%04d' % i]),
+            'protein_translation': ''.join(
+                rand.choice('ACDEFGHIKLMNPQRSTVWY') for _ in range(300)),
+        } for i in range(features)],
+    }
+
+
+def fba(reactions):
+    rand = random.Random(2)
+    return {
+        'id': 'kb|fba.0',
+        'objectiveValue': 0.8739215069684305,
+        'reactionFluxes': [['rxn%05d' % i, rand.uniform(-1000, 1000),
+                            rand.uniform(-1000, 0), rand.uniform(0, 1000),
+                            rand.random() * 1e-6, 'c0']
+                           for i in range(reactions)],
+        'compoundFluxes': [['cpd%05d' % i, rand.gauss(0, 10)]
+                           for i in range(reactions // 2)],
+        'geneKO': frozenset('kb|g.0.peg.%d' % i for i in range(50)),
+    }
+
+
+def main():
+    features = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    payloads = (('genome', genome(features)), ('fba', fba(features)))
+    print '%-12s %-8s %12s %12s %10s' % ('codec', 'payload', 'encode ms',
+                                         'decode ms', 'MB')
+    for name in rpc.available_codecs():
+        codec = rpc.set_codec(name)
+        for label, payload in payloads:
+            text = codec.encode(payload)
+            enc = min(timeit.repeat(lambda: codec.encode(payload),
+                                    number=1, repeat=5))
+            dec = min(timeit.repeat(lambda: codec.decode(text),
+                                    number=1, repeat=5))
+            print '%-12s %-8s %12.1f %12.1f %10.2f' % (
+                name, label, enc * 1000, dec * 1000, len(text) / 1e6)
+    rpc.set_codec()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import unittest
+from biokbase.workspaceService.asyncclient import AsyncWorkspaceService
+from biokbase.workspaceService.rpc import ServerError
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+import urllib.error
+
+
+class FakeWorkspaceHandler(BaseHTTPRequestHandler):
+    """
+    Answers each request with the response the test has queued, recording
+    the request
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server.requests.append((self.path, dict(self.headers.items()),
+                                json.loads(body.decode('utf-8')),
+                                self.client_address))
+        status, headers, data, delay = server.responses.pop(0)
+        time.sleep(delay)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except ConnectionError:
+            # the client gave up on the call
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeWorkspaceServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TestAsyncWorkspaces(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeWorkspaceServer(('localhost', 0),
+                                          FakeWorkspaceHandler)
+        self.server.requests = []
+        self.server.responses = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = 'http://localhost:%d/services/ws' % (
+            self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, status=200, result=None, error=None, headers=None,
+                data=None, delay=0):
+        if data is None:
+            if error is not None:
+                data = json.dumps({'version': '1.1', 'error': error})
+            else:
+                data = json.dumps({'version': '1.1', 'result': [result]})
+            data = data.encode('utf-8')
+        if headers is None:
+            headers = {'Content-Type': 'application/json'}
+        self.server.responses.append((status, headers, data, delay))
+
+    def run_client(self, calls, **kwargs):
+        async def run():
+            async with AsyncWorkspaceService(self.url, **kwargs) as impl:
+                return await calls(impl)
+        return asyncio.run(run())
+
+    def testRequest(self):
+        """
+        Test the JSON-RPC request sent for a call, and its result
+        """
+        self.respond(result=['ws1', 'kbasetest'])
+        meta = self.run_client(
+            lambda impl: impl.get_workspacemeta({"workspace": "ws1"}),
+            token='token1')
+        self.assertEqual(meta, ['ws1', 'kbasetest'])
+        path, headers, body, _ = self.server.requests[0]
+        self.assertEqual(path, '/services/ws')
+        self.assertEqual(headers['content-type'], 'application/json')
+        self.assertEqual(headers['AUTHORIZATION'], 'token1')
+        self.assertEqual(body['method'], 'workspaceService.get_workspacemeta')
+        self.assertEqual(body['params'], [{"workspace": "ws1"}])
+
+        # methods without params send an empty list
+        self.respond(result=['Genome'])
+        types = self.run_client(lambda impl: impl.get_types(), token='token1')
+        self.assertEqual(types, ['Genome'])
+        self.assertEqual(self.server.requests[1][2]['params'], [])
+
+    def testToken(self):
+        """
+        Test that the token defaults to KB_AUTH_TOKEN, and is optional
+        """
+        old = os.environ.pop('KB_AUTH_TOKEN', None)
+        try:
+            self.respond(result=[])
+            self.run_client(lambda impl: impl.list_workspaces({}))
+            self.assertNotIn('AUTHORIZATION', self.server.requests[0][1])
+
+            os.environ['KB_AUTH_TOKEN'] = 'envtoken'
+            self.respond(result=[])
+            self.run_client(lambda impl: impl.list_workspaces({}))
+            self.assertEqual(self.server.requests[1][1]['AUTHORIZATION'],
+                             'envtoken')
+        finally:
+            os.environ.pop('KB_AUTH_TOKEN', None)
+            if old is not None:
+                os.environ['KB_AUTH_TOKEN'] = old
+
+    def testServerError(self):
+        """
+        Test that an error reported by the service raises ServerError
+        """
+        self.respond(500, error={"name": "JSONRPCError", "code": -32500,
+                                 "message": "Workspace not found!",
+                                 "error": "trace"})
+        try:
+            self.run_client(
+                lambda impl: impl.get_workspacemeta({"workspace": "nows"}))
+            self.fail("ServerError not raised")
+        except ServerError as e:
+            self.assertEqual(e.name, "JSONRPCError")
+            self.assertEqual(e.code, -32500)
+            self.assertEqual(e.message, "Workspace not found!")
+            self.assertEqual(e.data, "trace")
+            self.assertEqual(e.httpError.code, 500)
+
+    def testHTTPError(self):
+        """
+        Test that an HTTP error without a JSON body raises HTTPError
+        """
+        self.respond(502, headers={'Content-Type': 'text/html'},
+                     data=b'<html>Bad Gateway</html>')
+        try:
+            self.run_client(lambda impl: impl.get_types())
+            self.fail("HTTPError not raised")
+        except urllib.error.HTTPError as e:
+            self.assertEqual(e.code, 502)
+            self.assertEqual(e.read(), b'<html>Bad Gateway</html>')
+
+    def testCompressedResponse(self):
+        """
+        Test that a gzipped response is inflated
+        """
+        result = {"data": "ACGT" * 10000}
+        self.respond(headers={'Content-Type': 'application/json',
+                              'Content-Encoding': 'gzip'},
+                     data=gzip.compress(json.dumps(
+                         {'version': '1.1', 'result': [result]}).encode()))
+        obj = self.run_client(lambda impl: impl.get_object({"id": "a"}))
+        self.assertEqual(obj, result)
+        self.assertIn('gzip', self.server.requests[0][1]['Accept-Encoding'])
+
+    def testKeepAlive(self):
+        """
+        Test that calls in turn share one connection
+        """
+        for i in range(3):
+            self.respond(result=i)
+
+        async def calls(impl):
+            return [await impl.get_types() for i in range(3)]
+        self.assertEqual(self.run_client(calls), [0, 1, 2])
+        ports = set(request[3] for request in self.server.requests)
+        self.assertEqual(len(ports), 1)
+
+    def testTimeout(self):
+        """
+        Test that a call taking longer than the timeout is abandoned
+        """
+        self.respond(result=[], delay=2)
+        self.assertRaises(asyncio.TimeoutError, self.run_client,
+                          lambda impl: impl.get_types(), timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,18 @@
 import unittest
 from biokbase.auth.auth_token import get_token
 from biokbase.workspaceService.Client import workspaceService
+from biokbase.workspaceService.pool import ConnectionPool
+from biokbase.workspaceService.cache import RefCache, MetadataCache, TokenCache
+from biokbase.workspaceService.rpc import ServerError, available_codecs, set_codec
+from biokbase.workspaceService.retry import RetryPolicy
+from biokbase.workspaceService.endpoints import Endpoints
+from biokbase.workspaceService.coalesce import SingleFlight
 from datetime import datetime
+from StringIO import StringIO
 import os
 import subprocess
+import threading
+import time
 
 class TestWorkspaces(unittest.TestCase):
 
@@ -399,6 +408,506 @@ class TestWorkspaces(unittest.TestCase):
         self.assertEquals(has_orig_object, 0)
 
 
+    def testSharedConnectionPool(self):
+        """
+        Test that clients sharing a pool reuse one keep-alive connection
+        """
+        ws_name = self.ws_name
+        pool = ConnectionPool(maxsize=2, maxperhost=2)
+        impl1 = workspaceService('http://localhost:7058', pool=pool)
+        impl2 = workspaceService('http://localhost:7058', pool=pool)
+
+        for impl in (impl1, impl2, impl1):
+            ws_meta = impl.get_workspacemeta({"workspace": ws_name, "auth": self.__class__.token})
+            self.assertEquals(ws_meta[0], ws_name)
+        self.assertEquals(pool._idlecount, 1)
+
+        impl1.close()
+        self.assertEquals(pool._idlecount, 0)
+
+        impl2.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testIterGetObjects(self):
+        """
+        Test that streamed get_objects results match get_objects
+        """
+        impl = self.impl
+        ws_name = self.ws_name
+
+        ids = []
+        for i in range(3):
+            ids.append("test_object_id%d" % i)
+            impl.save_object({
+                "id": ids[-1],
+                "type": "Genome",
+                "data": {"name":"testgenome%d" % i, "string":"ACACGATTACA"},
+                "workspace": ws_name,
+                "auth": self.__class__.token
+            })
+        params = {"ids": ids, "types": ["Genome"] * 3,
+                  "workspaces": [ws_name] * 3, "auth": self.__class__.token}
+
+        objs = list(impl.iter_get_objects(params))
+        self.assertEquals(objs, impl.get_objects(params))
+        self.assertEquals(objs[2]['data']['name'], "testgenome2")
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testStreamSaveObject(self):
+        """
+        Test saving objects with a streamed request
+        """
+        impl = self.impl
+        ws_name = self.ws_name
+
+        test_object1 = {
+            "id": "test_object_id1",
+            "type": "Genome",
+            "data": {"name":"testgenome1", "features":[{"id": i} for i in range(1000)]},
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        }
+        obj_meta1 = impl.stream_save_object(test_object1)
+        self.assertEquals(obj_meta1[0], "test_object_id1")
+
+        # data may also be given as JSON text
+        test_object1["data"] = StringIO('{"name": "testgenome2"}')
+        obj_meta2 = impl.stream_save_object(test_object1)
+        self.assertEquals(obj_meta2[3], 1)
+
+        obj = impl.get_object({"workspace":ws_name,"id": "test_object_id1", "type": "Genome","auth": self.__class__.token})
+        self.assertEquals(obj['data']['name'], "testgenome2")
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testFailedStreamSave(self):
+        """
+        Test that a stream save failing part way leaves the pool usable
+        """
+        ws_name = self.ws_name
+        pool = ConnectionPool(maxsize=1, maxperhost=1)
+        impl = workspaceService('http://localhost:7058', pool=pool, timeout=5)
+
+        def pieces():
+            yield '{"name": '
+            raise ValueError("no more data")
+        for i in range(2):
+            self.assertRaises(ValueError, impl.stream_save_object, {
+                "id": "test_object_id1",
+                "type": "Genome",
+                "data": pieces(),
+                "workspace": ws_name,
+                "auth": self.__class__.token
+            })
+
+        ws_meta = impl.get_workspacemeta({"workspace": ws_name, "auth": self.__class__.token})
+        self.assertEquals(ws_meta[0], ws_name)
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testCompressedSave(self):
+        """
+        Test that large data is saved gzipped and read back intact
+        """
+        ws_name = self.ws_name
+        impl = workspaceService('http://localhost:7058', compress_threshold=1024)
+
+        data = {"name":"testgenome1", "features":[{"id": "f%d" % i, "seq": "ACACGATTACA"} for i in range(1000)]}
+        impl.save_object({
+            "id": "test_object_id1",
+            "type": "Genome",
+            "data": data,
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        })
+
+        obj = impl.get_object({"workspace":ws_name,"id": "test_object_id1", "type": "Genome","auth": self.__class__.token})
+        self.assertEquals(obj['data'], data)
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testCompressedResponse(self):
+        """
+        Test that a large result is sent compressed and decoded intact
+        """
+        ws_name = self.ws_name
+        calls = []
+        impl = workspaceService('http://localhost:7058', on_call=calls.append)
+        plain = workspaceService('http://localhost:7058', on_call=calls.append,
+                                 accept_compressed=False)
+
+        data = {"name":"testgenome1", "features":[{"id": "f%d" % i, "seq": "ACACGATTACA"} for i in range(1000)]}
+        impl.save_object({
+            "id": "test_object_id1",
+            "type": "Genome",
+            "data": data,
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        })
+
+        params = {"workspace":ws_name,"id": "test_object_id1", "type": "Genome","auth": self.__class__.token}
+        obj = impl.get_object(params)
+        self.assertEquals(obj['data'], data)
+        self.assertEquals(plain.get_object(params), obj)
+        # the compressed response is much smaller than the plain one
+        self.assertTrue(calls[-2].response_bytes * 4 < calls[-1].response_bytes)
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testRefCache(self):
+        """
+        Test that objects fetched by reference are cached
+        """
+        ws_name = self.ws_name
+        cache = RefCache(max_bytes=1024 * 1024)
+        impl = workspaceService('http://localhost:7058', ref_cache=cache)
+
+        obj_meta1 = impl.save_object({
+            "id": "test_object_id1",
+            "type": "Genome",
+            "data": {"name":"testgenome1", "string":"ACACGATTACA"},
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        })
+        ref = obj_meta1[8]
+
+        obj1 = impl.get_object_by_ref({"reference": ref, "auth": self.__class__.token})
+        obj2 = impl.get_object_by_ref({"reference": ref, "auth": self.__class__.token})
+        self.assertEquals(obj1, obj2)
+        self.assertEquals(obj2['data']['name'], "testgenome1")
+        self.assertEquals((cache.hits, cache.misses), (1, 1))
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testMetadataCache(self):
+        """
+        Test that metadata is cached until this client changes the object
+        """
+        ws_name = self.ws_name
+        cache = MetadataCache()
+        impl = workspaceService('http://localhost:7058', metadata_cache=cache)
+        params = {
+            "id": "test_object_id1",
+            "type": "Genome",
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        }
+
+        impl.save_object(dict(params, data={"name":"testgenome1", "string":"ACACGATTACA"}))
+        meta1 = impl.get_objectmeta(params)
+        meta2 = impl.get_objectmeta(params)
+        self.assertEquals(meta1, meta2)
+        self.assertEquals((cache.hits, cache.misses), (1, 1))
+
+        impl.save_object(dict(params, data={"name":"testgenome2", "string":"ACACGATTACA"}))
+        meta3 = impl.get_objectmeta(params)
+        self.assertEquals((cache.hits, cache.misses), (1, 2))
+        self.assertNotEquals(meta1[3], meta3[3])
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testTokenCache(self):
+        """
+        Test that clients sharing a token cache log in once
+        """
+        cache = TokenCache()
+        impls = [workspaceService('http://localhost:7058', user_id='kbasetest',
+                                  password='@Suite525', token_cache=cache)
+                 for _ in range(3)]
+        for impl in impls:
+            ws_meta = impl.get_workspacemeta({"workspace": self.ws_name})
+            self.assertEquals(ws_meta[0], self.ws_name)
+        self.assertEquals(cache.fetches, 1)
+
+        self.impl.delete_workspace({"workspace": self.ws_name, "auth": self.__class__.token})
+
+    def testMetrics(self):
+        """
+        Test that calls are timed and errors counted
+        """
+        ws_name = self.ws_name
+        calls = []
+        impl = workspaceService('http://localhost:7058', on_call=calls.append)
+
+        impl.get_workspacemeta({"workspace": ws_name, "auth": self.__class__.token})
+        self.assertRaises(ServerError, impl.get_object, {
+            "id": "no_such_object",
+            "type": "Genome",
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        })
+
+        self.assertEquals([call.method for call in calls], ["get_workspacemeta", "get_object"])
+        self.assertEquals(calls[0].error, None)
+        self.assertTrue(isinstance(calls[1].error, ServerError))
+        stats = impl.metrics.stats()
+        self.assertEquals(stats["get_workspacemeta"]["calls"], 1)
+        self.assertTrue(stats["get_workspacemeta"]["response_bytes"] > 0)
+        self.assertEquals(sum(stats["get_object"]["errors"].values()), 1)
+        self.assertEquals(stats["get_object"]["latency"]["wait"]["count"], 1)
+        self.assertTrue('workspace_client_calls_total{method="get_object"} 1' in
+                        impl.metrics.prometheus())
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testRetry(self):
+        """
+        Test that reads are retried and writes are not
+        """
+        ws_name = self.ws_name
+        # nothing listens on port 1
+        impl = workspaceService('http://localhost:1', retry=RetryPolicy(backoff=0.01))
+        self.assertRaises(IOError, impl.get_workspacemeta, {"workspace": ws_name, "auth": self.__class__.token})
+        self.assertEquals(impl.metrics.stats()["get_workspacemeta"]["retries"], 3)
+        self.assertRaises(IOError, impl.delete_workspace, {"workspace": ws_name, "auth": self.__class__.token})
+        self.assertEquals(impl.metrics.stats()["delete_workspace"]["retries"], 0)
+
+        self.impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testMultipleEndpoints(self):
+        """
+        Test that calls avoid a replica that is down
+        """
+        ws_name = self.ws_name
+        # nothing listens on port 1
+        endpoints = Endpoints(['http://localhost:1', 'http://localhost:7058'], explore=0)
+        impl = workspaceService(endpoints, retry=RetryPolicy(backoff=0.01))
+        for i in range(5):
+            ws_meta = impl.get_workspacemeta({"workspace": ws_name, "auth": self.__class__.token})
+            self.assertEquals(ws_meta[0], ws_name)
+        self.assertEquals(impl.metrics.stats()["get_workspacemeta"]["retries"], 1)
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testCodecs(self):
+        """
+        Test that each JSON backend round trips an object
+        """
+        ws_name = self.ws_name
+        impl = self.impl
+        try:
+            for codec in available_codecs():
+                set_codec(codec)
+                impl.save_object({
+                    "id": "test_object_" + codec,
+                    "type": "Genome",
+                    "data": {"name": u"testgenome\u00e9", "aliases": set(["a"]), "gc": 0.1 + 0.2},
+                    "workspace": ws_name,
+                    "auth": self.__class__.token
+                })
+                obj = impl.get_object({
+                    "id": "test_object_" + codec,
+                    "type": "Genome",
+                    "workspace": ws_name,
+                    "auth": self.__class__.token
+                })
+                self.assertEquals(obj["data"], {"name": u"testgenome\u00e9", "aliases": ["a"], "gc": 0.1 + 0.2})
+                # strings decode as unicode, as with the standard json module
+                self.assertTrue(isinstance(obj["metadata"][0], unicode))
+                self.assertTrue(isinstance(obj["data"]["aliases"][0], unicode))
+                # a reference cycle is refused before anything is sent
+                cyclic = {"name": "testgenome"}
+                cyclic["self"] = [cyclic]
+                self.assertRaises(ValueError, impl.save_object, {
+                    "id": "test_object_cyclic",
+                    "type": "Genome",
+                    "data": cyclic,
+                    "workspace": ws_name,
+                    "auth": self.__class__.token
+                })
+        finally:
+            set_codec()
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testBulkGetObjects(self):
+        """
+        Test getting many objects, some missing, in chunks
+        """
+        ws_name = self.ws_name
+        impl = self.impl
+        refs = []
+        for i in range(20):
+            impl.save_object({
+                "id": "test_object_%d" % i,
+                "type": "Genome",
+                "data": {"name": "testgenome%d" % i, "string": "ACACGATTACA"},
+                "workspace": ws_name,
+                "auth": self.__class__.token
+            })
+            refs.append({"id": "test_object_%d" % i, "type": "Genome", "workspace": ws_name})
+        refs.insert(7, {"id": "no_such_object", "type": "Genome", "workspace": ws_name})
+
+        results = list(impl.bulk_get_objects(refs, chunk_size=5, parallel=2, auth=self.__class__.token))
+        self.assertEquals([ref for ref, obj, error in results], refs)
+        self.assertTrue(isinstance(results[7][2], ServerError))
+        self.assertEquals(results[7][1], None)
+        names = [obj["data"]["name"] for ref, obj, error in results if error is None]
+        self.assertEquals(names, ["testgenome%d" % i for i in range(20)])
+
+        # an error that isn't about one object fails the whole call
+        self.assertRaises(ServerError, list, impl.bulk_get_objects(refs, chunk_size=5, auth="not_a_token"))
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testSingleFlight(self):
+        """
+        Test that identical concurrent reads share one request
+        """
+        ws_name = self.ws_name
+
+        class HeldFlight(SingleFlight):
+            # holds the first request until the other calls wait for it
+            def do(self, key, send, call):
+                def held():
+                    deadline = time.time() + 10
+                    while self.coalesced < 9 and time.time() < deadline:
+                        time.sleep(0.01)
+                    return send()
+                return SingleFlight.do(self, key, held, call)
+        impl = workspaceService('http://localhost:7058', single_flight=HeldFlight())
+        params = {"workspace": ws_name, "auth": self.__class__.token}
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(impl.get_workspacemeta(params)))
+                   for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(len(results), 10)
+        self.assertEquals(results[0][0], ws_name)
+        self.assertTrue(all(meta == results[0] for meta in results))
+        self.assertEquals(len(set(id(meta) for meta in results)), 10)
+        self.assertEquals(impl.single_flight.coalesced, 9)
+        stats = impl.metrics.stats()["get_workspacemeta"]
+        self.assertEquals(stats["coalesced"], 9)
+        self.assertEquals(stats["calls"], 10)
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testBufferedSaver(self):
+        """
+        Test saving objects in the background
+        """
+        ws_name = self.ws_name
+        impl = self.impl
+        with impl.buffered_saver(workers=2, max_queue=4) as saver:
+            futures = [saver.save({
+                "id": "test_object_%d" % (i % 5),
+                "type": "Genome",
+                "data": {"name": "testgenome%d" % i, "string": "ACACGATTACA"},
+                "workspace": ws_name,
+                "auth": self.__class__.token
+            }) for i in range(15)]
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEquals(futures[14].result()[0], "test_object_4")
+        for i in range(5):
+            obj = impl.get_object({
+                "id": "test_object_%d" % i,
+                "type": "Genome",
+                "workspace": ws_name,
+                "auth": self.__class__.token
+            })
+            # saves of one object are made in order
+            self.assertEquals(obj["data"]["name"], "testgenome%d" % (i + 10))
+
+        saver = impl.buffered_saver()
+        future = saver.save({
+            "id": "test_object_0",
+            "type": "Genome",
+            "data": {"name": "testgenome"},
+            "workspace": "no_such_workspace",
+            "auth": self.__class__.token
+        })
+        self.assertRaises(ServerError, saver.flush)
+        self.assertRaises(ServerError, future.result)
+        saver.close()
+
+        # a bad save fails alone, not with the saves batched with it
+        saver = impl.buffered_saver(workers=1)
+        futures = [saver.save({
+            "id": "test_object_%d" % i,
+            "type": "NoSuchType" if i == 3 else "Genome",
+            "data": {"name": "testgenome%d" % i},
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        }) for i in range(10)]
+        self.assertRaises(ServerError, saver.flush)
+        saver.close()
+        self.assertRaises(ServerError, futures[3].result)
+        for i, future in enumerate(futures):
+            if i != 3:
+                self.assertEquals(future.result()[0], "test_object_%d" % i)
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testSaveObjects(self):
+        """
+        Test saving many objects in one call
+        """
+        ws_name = self.ws_name
+        impl = self.impl
+        objects = [{
+            "id": "test_object_%d" % (i % 5),
+            "type": "Genome",
+            "data": {"name": "testgenome%d" % i, "string": "ACACGATTACA"},
+            "workspace": ws_name,
+        } for i in range(10)]
+        metas = impl.save_objects({"objects": objects, "auth": self.__class__.token})
+        self.assertEquals([meta[0] for meta in metas], [obj["id"] for obj in objects])
+        self.assertEquals([meta[3] for meta in metas], [0] * 5 + [1] * 5)
+        obj = impl.get_object({
+            "id": "test_object_3",
+            "type": "Genome",
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        })
+        self.assertEquals(obj["data"]["name"], "testgenome8")
+
+        # nothing is saved if any object is invalid
+        self.assertRaises(ServerError, impl.save_objects, {
+            "objects": [dict(objects[0], id="test_object_new"),
+                        dict(objects[0], type="NoSuchType")],
+            "auth": self.__class__.token
+        })
+        self.assertFalse(impl.has_object({
+            "id": "test_object_new",
+            "type": "Genome",
+            "workspace": ws_name,
+            "auth": self.__class__.token
+        }))
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
+    def testIterObjectMetas(self):
+        """
+        Test checking and getting the metadata of many objects in chunks
+        """
+        ws_name = self.ws_name
+        impl = self.impl
+        impl.save_objects({"objects": [{
+            "id": "test_object_%d" % i,
+            "type": "Genome",
+            "data": {"name": "testgenome%d" % i},
+            "workspace": ws_name,
+        } for i in range(0, 20, 2)], "auth": self.__class__.token})
+        refs = [{"id": "test_object_%d" % i, "type": "Genome", "workspace": ws_name} for i in range(20)]
+
+        present = list(impl.iter_has_objects(iter(refs), chunk_size=7, auth=self.__class__.token))
+        self.assertEquals(present, [(ref, i % 2 == 0) for i, ref in enumerate(refs)])
+
+        results = list(impl.iter_get_objectmetas(refs, chunk_size=7, auth=self.__class__.token))
+        self.assertEquals([ref for ref, meta, error in results], refs)
+        for i, (ref, meta, error) in enumerate(results):
+            if i % 2:
+                self.assertEquals(meta, None)
+                self.assertTrue(isinstance(error, ServerError))
+            else:
+                self.assertEquals(meta[0], ref["id"])
+
+        impl.delete_workspace({"workspace": ws_name, "auth": self.__class__.token})
+
     @classmethod
     def tearDownClass(self):
         test_dir = os.path.dirname(os.path.abspath(__file__))
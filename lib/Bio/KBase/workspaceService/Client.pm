@@ -674,6 +674,164 @@ sub save_object
 
 
 
+=head2 save_objects
+
+  $metadatas = $obj->save_objects($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a save_objects_params
+$metadatas is a reference to a list where each element is an object_metadata
+save_objects_params is a reference to a hash where the following keys are defined:
+	objects has a value which is a reference to a list where each element is a save_object_params
+	auth has a value which is a string
+	asHash has a value which is a bool
+save_object_params is a reference to a hash where the following keys are defined:
+	id has a value which is an object_id
+	type has a value which is an object_type
+	data has a value which is an ObjectData
+	workspace has a value which is a workspace_id
+	command has a value which is a string
+	metadata has a value which is a reference to a hash where the key is a string and the value is a string
+	auth has a value which is a string
+	json has a value which is a bool
+	compressed has a value which is a bool
+	retrieveFromURL has a value which is a bool
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+ObjectData is a reference to a hash where the following keys are defined:
+	version has a value which is an int
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a save_objects_params
+$metadatas is a reference to a list where each element is an object_metadata
+save_objects_params is a reference to a hash where the following keys are defined:
+	objects has a value which is a reference to a list where each element is a save_object_params
+	auth has a value which is a string
+	asHash has a value which is a bool
+save_object_params is a reference to a hash where the following keys are defined:
+	id has a value which is an object_id
+	type has a value which is an object_type
+	data has a value which is an ObjectData
+	workspace has a value which is a workspace_id
+	command has a value which is a string
+	metadata has a value which is a reference to a hash where the key is a string and the value is a string
+	auth has a value which is a string
+	json has a value which is a bool
+	compressed has a value which is a bool
+	retrieveFromURL has a value which is a bool
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+ObjectData is a reference to a hash where the following keys are defined:
+	version has a value which is an int
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+
+=end text
+
+
+
+=item Description
+
+Saves the input objects into the selected workspaces, returning the object_metadata of each saved object in the order of the input.
+Objects are checked and saved together, so this is much faster than calling "save_object" for each. If any object fails validation, none are saved.
+
+=back
+
+=cut
+
+sub save_objects
+{
+    my($self, @args) = @_;
+
+# Authentication: optional
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function save_objects (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to save_objects:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'save_objects');
+	}
+    }
+
+    my $result = $self->{client}->call($self->{url}, {
+	method => "workspaceService.save_objects",
+	params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'save_objects',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method save_objects",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'save_objects',
+				       );
+    }
+}
+
+
+
 =head2 delete_object
 
   $metadata = $obj->delete_object($params)
@@ -1647,6 +1805,142 @@ sub get_objectmeta
 
 
 
+=head2 get_objectmetas
+
+  $metadatas = $obj->get_objectmetas($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a get_objectmetas_params
+$metadatas is a reference to a list where each element is an object_metadata
+get_objectmetas_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
+	auth has a value which is a string
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a get_objectmetas_params
+$metadatas is a reference to a list where each element is an object_metadata
+get_objectmetas_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
+	auth has a value which is a string
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+
+=end text
+
+
+
+=item Description
+
+Retrieves the metadata for the specified objects from the specified workspaces, in the order requested.
+This is much faster than calling "get_objectmeta" for each object.
+
+=back
+
+=cut
+
+sub get_objectmetas
+{
+    my($self, @args) = @_;
+
+# Authentication: optional
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function get_objectmetas (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to get_objectmetas:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'get_objectmetas');
+	}
+    }
+
+    my $result = $self->{client}->call($self->{url}, {
+	method => "workspaceService.get_objectmetas",
+	params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'get_objectmetas',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method get_objectmetas",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'get_objectmetas',
+				       );
+    }
+}
+
+
+
 =head2 get_objectmeta_by_ref
 
   $metadata = $obj->get_objectmeta_by_ref($params)
@@ -2293,6 +2587,110 @@ sub has_object
 
 
 
+=head2 has_objects
+
+  $objects_present = $obj->has_objects($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a has_objects_params
+$objects_present is a reference to a list where each element is a bool
+has_objects_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
+	auth has a value which is a string
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a has_objects_params
+$objects_present is a reference to a list where each element is a bool
+has_objects_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
+	auth has a value which is a string
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+
+
+=end text
+
+
+
+=item Description
+
+Checks if the specified objects in the specified workspaces exist.
+Returns "1" for each object that exists and "0" for each that does not, in the order requested.
+
+=back
+
+=cut
+
+sub has_objects
+{
+    my($self, @args) = @_;
+
+# Authentication: optional
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function has_objects (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to has_objects:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'has_objects');
+	}
+    }
+
+    my $result = $self->{client}->call($self->{url}, {
+	method => "workspaceService.has_objects",
+	params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'has_objects',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method has_objects",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'has_objects',
+				       );
+    }
+}
+
+
+
 =head2 object_history
 
   $metadatas = $obj->object_history($params)
@@ -5139,6 +5537,49 @@ asHash has a value which is a bool
 
 
 
+=head2 save_objects_params
+
+=over 4
+
+
+
+=item Description
+
+Input parameters for the "save_objects" function.
+
+        list<save_object_params> objects - parameters for each object to be saved, as for the "save_object" function; the auth and asHash of each are ignored (an essential argument)
+        string auth - the authentication token of the KBase account to associate this save command
+        bool asHash - a boolean indicating if metadata should be returned as a hash
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+objects has a value which is a reference to a list where each element is a save_object_params
+auth has a value which is a string
+asHash has a value which is a bool
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+objects has a value which is a reference to a list where each element is a save_object_params
+auth has a value which is a string
+asHash has a value which is a bool
+
+
+=end text
+
+=back
+
+
+
 =head2 delete_object_params
 
 =over 4
@@ -5555,6 +5996,59 @@ asHash has a value which is a bool
 
 
 
+=head2 get_objectmetas_params
+
+=over 4
+
+
+
+=item Description
+
+Input parameters for the "get_objectmetas" function.
+
+        list<object_id> ids - IDs of the objects for which metadata is to be retrieved, or references to them if their workspace is "NO_WORKSPACE" (an essential argument)
+        list<object_type> types - types of the objects for which metadata is to be retrieved (an essential argument)
+        list<workspace_id> workspaces - IDs of the workspaces containing the objects for which metadata is to be retrieved (an essential argument)
+        list<int> instances - Versions of the objects for which metadata is to be retrieved (an optional argument; the current metadata is retrieved for any version not provided)
+        string auth - the authentication token of the KBase account to associate with this object metadata retrieval command (an optional argument)
+        bool asHash - a boolean indicating if metadata should be returned as a hash
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+asHash has a value which is a bool
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+asHash has a value which is a bool
+
+
+=end text
+
+=back
+
+
+
 =head2 get_objectmeta_by_ref_params
 
 =over 4
@@ -5818,6 +6312,56 @@ auth has a value which is a string
 
 
 
+=head2 has_objects_params
+
+=over 4
+
+
+
+=item Description
+
+Input parameters for the "has_objects" function.
+
+        list<object_id> ids - IDs of the objects to be checked for existance, or references to them if their workspace is "NO_WORKSPACE" (an essential argument)
+        list<object_type> types - types of the objects to be checked for existance (an essential argument)
+        list<workspace_id> workspaces - IDs of the workspaces containing the objects to be checked for existance (an essential argument)
+        list<int> instances - Versions of the objects to be checked for existance (an optional argument; the current object is checked for any version not provided)
+        string auth - the authentication token of the KBase account to associate with this object check command (an optional argument)
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+
+
+=end text
+
+=back
+
+
+
 =head2 object_history_params
 
 =over 4
@@ -0,0 +1,96 @@
+package Bio::KBase::workspaceService::CompressResponse;
+use strict;
+use warnings;
+use parent qw(Plack::Middleware);
+use Plack::Util;
+use Plack::Util::Accessor qw(threshold level);
+use IO::Compress::Gzip qw(gzip $GzipError);
+use IO::Compress::Deflate qw(deflate $DeflateError);
+
+=head1 NAME
+
+Bio::KBase::workspaceService::CompressResponse
+
+=head1 DESCRIPTION
+
+PSGI middleware that gzip or deflate encodes responses for clients that
+send a matching Accept-Encoding header. Only fully buffered response bodies
+of at least threshold bytes (default 1024) are compressed, at the given
+zlib level (default 6).
+
+	$handler = Bio::KBase::workspaceService::CompressResponse->wrap($handler,
+		threshold => 1024, level => 6);
+
+=cut
+
+sub prepare_app {
+	my ($self) = @_;
+	$self->threshold(1024) unless defined($self->threshold);
+	$self->level(6) unless defined($self->level);
+}
+
+sub call {
+	my ($self, $env) = @_;
+	my $res = $self->app->($env);
+	my $encoding = _chooseEncoding($env->{HTTP_ACCEPT_ENCODING});
+	return $self->response_cb($res, sub {
+		my $res = shift;
+		my $headers = Plack::Util::headers($res->[1]);
+		$headers->push('Vary' => 'Accept-Encoding');
+		if (!defined($encoding) || ref($res->[2]) ne 'ARRAY' ||
+				$headers->exists('Content-Encoding')) {
+			return;
+		}
+		my $body = join('', @{$res->[2]});
+		if (length($body) < $self->threshold) {
+			return;
+		}
+		my $out;
+		if ($encoding eq "gzip") {
+			gzip(\$body => \$out, -Level => $self->level, Minimal => 1)
+				or die "gzip failed: $GzipError";
+		} else {
+			deflate(\$body => \$out, -Level => $self->level)
+				or die "deflate failed: $DeflateError";
+		}
+		$res->[2] = [$out];
+		$headers->set('Content-Encoding' => $encoding);
+		$headers->set('Content-Length' => length($out));
+	});
+}
+
+=head3 _chooseEncoding
+
+Definition:
+	string = _chooseEncoding(string accept_encoding);
+Description:
+	Returns "gzip" or "deflate" if the Accept-Encoding header allows it,
+	preferring gzip, or undef
+
+=cut
+
+sub _chooseEncoding {
+	my ($accept) = @_;
+	if (!defined($accept)) {
+		return undef;
+	}
+	my $allowed = {};
+	foreach my $coding (split(/\s*,\s*/, lc($accept))) {
+		my ($name, @params) = split(/\s*;\s*/, $coding);
+		my $q = 1;
+		foreach my $param (@params) {
+			if ($param =~ m/^q=([\d.]+)$/) {
+				$q = $1;
+			}
+		}
+		$allowed->{$name} = $q > 0;
+	}
+	foreach my $name (qw(gzip deflate)) {
+		if ($allowed->{$name}) {
+			return $name;
+		}
+	}
+	return undef;
+}
+
+1;
@@ -79,6 +79,8 @@ use Tie::IxHash;
 use FileHandle;
 use DateTime;
 use Data::Dumper;
+use Digest::SHA qw(sha256_hex);
+use Scalar::Util qw(blessed);
 use Bio::KBase::AuthUser;
 use Bio::KBase::AuthToken;
 use Bio::KBase::workspaceService::Object;
@@ -134,7 +136,97 @@ sub _accountType {
 	return $self->{_accounttype};	
 }
 
+=head3 _authenticate
+
+Definition:
+	{authentication => string,user => string} = _authenticate(string:auth);
+Description:
+	Validates the authentication, remembering the outcome for later calls in this process. Valid authentications are remembered for auth-cache-ttl seconds, but not past the expiry of a token that states one; authentications known to be invalid for auth-cache-invalid-ttl seconds (see _authenticationRejected). At most auth-cache-size authentications are remembered, the oldest being forgotten first
+
+=cut
+
 sub _authenticate {
+	my ($self,$auth) = @_;
+	if ($self->{'_auth-cache-size'} <= 0) {
+		return $self->_validateAuthentication($auth);
+	}
+	#Only a digest of the authentication is kept as the key
+	my $key = sha256_hex($self->{_accounttype}."\t".$auth);
+	my $cache = $self->_authCache();
+	my $entry = $cache->FETCH($key);
+	if (defined($entry)) {
+		if ($entry->{expires} > time()) {
+			$self->{_cacheStats}->{authentication}->{hits}++;
+			if (defined($entry->{error})) {
+				die $entry->{error};
+			}
+			return $entry->{output};
+		}
+		$cache->Delete($key);
+	}
+	$self->{_cacheStats}->{authentication}->{misses}++;
+	my $output;
+	eval {
+		$output = $self->_validateAuthentication($auth);
+	};
+	if ($@) {
+		my $error = $@;
+		if ($self->{'_auth-cache-invalid-ttl'} > 0 && $self->_authenticationRejected($auth,$error)) {
+			$self->_cacheAuthentication($key,{error => $error,expires => time() + $self->{'_auth-cache-invalid-ttl'}});
+		}
+		die $error;
+	}
+	my $expires = time() + $self->{'_auth-cache-ttl'};
+	if ($auth =~ m/(?:^|\|)expiry=(\d+)/ && $1 < $expires) {
+		$expires = $1;
+	}
+	$self->_cacheAuthentication($key,{output => $output,expires => $expires});
+	return $output;
+}
+
+=head3 _authenticationRejected
+
+Definition:
+	bool = _authenticationRejected(string:auth,exception:error);
+Description:
+	Returns "1" if the error validating the authentication shows that it is invalid, rather than that it could not be checked.
+	A kbase token fails to validate both when it is bad and when the auth service cannot be reached, so only a token past the expiry it states is known to be invalid.
+
+=cut
+
+sub _authenticationRejected {
+	my ($self,$auth,$error) = @_;
+	if (!ref($error) || !$error->isa("Bio::KBase::Exceptions::KBaseException") || $error->isa("Bio::KBase::Exceptions::HTTP")) {
+		return 0;
+	}
+	if ($self->{_accounttype} eq "kbase") {
+		return ($auth =~ m/(?:^|\|)expiry=(\d+)/ && $1 <= time()) ? 1 : 0;
+	}
+	return 1;
+}
+
+sub _authCache {
+	my ($self) = @_;
+	if (!defined($self->{_authCache})) {
+		$self->{_authCache} = Tie::IxHash->new();
+	}
+	return $self->{_authCache};
+}
+
+sub _cacheAuthentication {
+	my ($self,$key,$entry) = @_;
+	my $cache = $self->_authCache();
+	if ($entry->{expires} <= time()) {
+		return;
+	}
+	$cache->Delete($key);
+	while ($cache->Length() >= $self->{'_auth-cache-size'}) {
+		$cache->Shift();
+	}
+	$cache->Push($key => $entry);
+}
+
+sub _validateAuthentication {
 	my ($self,$auth) = @_;
 	if ($self->{_accounttype} eq "kbase") {
 		my $token = Bio::KBase::AuthToken->new(
@@ -180,7 +272,8 @@ sub _authenticate {
 		};
 	} elsif ($self->{_accounttype} eq "simple") {
 		if ($auth !~ m/^[a-zA-Z0-9_]*$/) {
-			$self->_error("Simple accounts must be alphanumeric!",'_setContext');
+			Bio::KBase::Exceptions::KBaseException->throw(error => "Simple accounts must be alphanumeric!",
+			method_name => '_setContext');
 		}
 		return {
 			authentication => $auth,
@@ -215,6 +308,7 @@ sub _setContext {
 		$ARG_VAL_ERR->throw(error => 'Authentication required: ' . $auth_err,
 							method_name => $method);
 	}
+	$self->_logCacheStatistics();
 }
 
 sub _getContext {
@@ -290,7 +384,7 @@ sub _get_new_id {
 Definition:
 	MongoDB = _gridfs();
 Description:
-	Returns MongoDB::GridFS object
+	Returns MongoDB::GridFS object, with data files indexed uniquely by checksum
 
 =cut
 
@@ -298,6 +392,13 @@ sub _gridfs {
 	my ($self) = @_;
 	if (!defined($self->{_gridfs})) {
 		$self->{_gridfs} = $self->_mongodb()->get_gridfs;
+		#Older databases may hold duplicate data from before the index, which a unique index cannot be built over
+		eval {
+			$self->{_gridfs}->files()->ensure_index({chsum => 1},{unique => 1,safe => 1});
+		};
+		if ($@) {
+			$self->{_gridfs}->files()->ensure_index({chsum => 1});
+		}
 	}
 	return $self->{_gridfs};
 }
@@ -450,6 +551,7 @@ Description:
 
 sub _createWorkspaceUser {
 	my ($self,$id) = @_;
+	$self->_forgetWorkspaceUsers([$id]);
 	my $user = $self->_getWorkspaceUser($id);
 	if (defined($user)) {
 		Bio::KBase::Exceptions::ArgumentValidationError->throw(error => "Cannot create WorkspaceUser ".$id." because WorkspaceUser already exists!",
@@ -485,7 +587,39 @@ sub _createObject {
 	$data->{parent} = $self;
 	my $obj = Bio::KBase::workspaceService::Object->new($data);
 	$obj->setDefaultMetadata();
-	$self->_mongodb()->get_collection( 'workspaceObjects' )->insert({
+	$self->_mongodb()->get_collection( 'workspaceObjects' )->insert($self->_objectDocument($obj));
+	return $obj;
+}
+
+=head3 _createObjects
+
+Definition:
+	[Bio::KBase::workspaceService::Object] =  _createObjects([{}]:data);
+Description:
+	Creates specified Objects in database with a single insert and returns the Objects
+
+=cut
+
+sub _createObjects {
+	my ($self,$datas) = @_;
+	my $objs = [];
+	my $docs = [];
+	foreach my $data (@{$datas}) {
+		$data->{parent} = $self;
+		my $obj = Bio::KBase::workspaceService::Object->new($data);
+		$obj->setDefaultMetadata();
+		push(@{$objs},$obj);
+		push(@{$docs},$self->_objectDocument($obj));
+	}
+	if (@{$docs} > 0) {
+		$self->_mongodb()->get_collection( 'workspaceObjects' )->batch_insert($docs);
+	}
+	return $objs;
+}
+
+sub _objectDocument {
+	my ($self,$obj) = @_;
+	return {
 		uuid => $obj->uuid(),
 		id => $obj->id(),
 		workspace => $obj->workspace(),
@@ -501,8 +635,7 @@ sub _createObject {
 		refdeps => $obj->refDependencies(),
 		iddeps => $obj->idDependencies(),
 		moddate => $obj->moddate()
-	});
-	return $obj;
+	};
 }
 
 =head3 _createDataObject
@@ -520,23 +653,82 @@ sub _createDataObject {
 		parent => $self,
 		rawdata => $data	
 	});
-	#Checking if the data is already in the database
-	my $dbobj = $self->_getDataObject($obj->chsum());
-	if (defined($dbobj)) {
-		return $dbobj;
+	#Checking if the data is already in the database from the index alone, without reading the data back
+	my $file = $self->_gridfs()->files()->find_one({chsum => $obj->chsum()},{_id => 1});
+	if (!defined($file)) {
+		$self->_insertDataObject($obj);
+	}
+	return $obj;
+}
+
+=head3 _createDataObjects
+
+Definition:
+	[Bio::KBase::workspaceService::DataObject] =  _createDataObjects([{}|string]:data);
+Description:
+	Creates specified DataObjects from input data in database, checking for data already in the database with a single query
+
+=cut
+
+sub _createDataObjects {
+	my ($self,$datas) = @_;
+	my $objs = [];
+	my $newObjs = {};
+	foreach my $data (@{$datas}) {
+		my $obj = Bio::KBase::workspaceService::DataObject->new({
+			parent => $self,
+			rawdata => $data
+		});
+		push(@{$objs},$obj);
+		$newObjs->{$obj->chsum()} = $obj;
+	}
+	#Checking which data are already in the database
+	if (keys(%{$newObjs}) > 0) {
+		my $cursor = $self->_gridfs()->files()->find({chsum => {'$in' => [keys(%{$newObjs})]}});
+		while (my $file = $cursor->next) {
+			delete $newObjs->{$file->{chsum}};
+		}
 	}
+	foreach my $chsum (keys(%{$newObjs})) {
+		$self->_insertDataObject($newObjs->{$chsum});
+	}
+	return $objs;
+}
+
+=head3 _insertDataObject
+
+Definition:
+	void _insertDataObject(Bio::KBase::workspaceService::DataObject:object);
+Description:
+	Inserts the data of the DataObject into the database. If the same data is inserted by another call first, the unique checksum index rejects this copy, which is then removed
+
+=cut
+
+sub _insertDataObject {
+	my ($self,$obj) = @_;
 	#Inserting data using gridfs
 	my $dataString = $obj->data();
 	open(my $basic_fh, "<", \$dataString);
 	my $fh = FileHandle->new;
 	$fh->fdopen($basic_fh, 'r');
-	$self->_gridfs()->insert($fh, {
-		creationDate => $obj->creationDate(),
-		chsum => $obj->chsum(),
-		compressed => $obj->compressed(),
-		json => $obj->json()
-	});
-	return $obj;
+	my $id = MongoDB::OID->new();
+	eval {
+		$self->_gridfs()->insert($fh, {
+			_id => $id,
+			creationDate => $obj->creationDate(),
+			chsum => $obj->chsum(),
+			compressed => $obj->compressed(),
+			json => $obj->json()
+		},{safe => 1});
+	};
+	if ($@) {
+		my $error = $@;
+		#The chunks are written before the file, so they are left behind when the file is rejected
+		$self->_gridfs()->chunks()->remove({files_id => $id});
+		if ($error !~ m/E11000|duplicate key/) {
+			die $error;
+		}
+	}
 }
 
 
@@ -572,6 +764,7 @@ sub _deleteWorkspaceUser {
 	my ($self,$id) = @_;
 	$self->_getWorkspaceUser($id,{throwErrorIfMissing => 1});
 	$self->_mongodb()->get_collection('workspaceUsers')->remove({id => $id});
+	$self->_forgetWorkspaceUsers([$id]);
 }
 
 =head3 _deleteObject
@@ -650,6 +843,7 @@ Description:
 sub _clearAllWorkspaceUsers {
 	my ($self) = @_;
 	$self->_mongodb()->get_collection('workspaceUsers')->remove({});
+	delete $self->{_workspaceUserCache};
 }
 
 =head3 _clearAllWorkspaceObjects
@@ -679,6 +873,8 @@ sub _clearAllWorkspaceDataObjects {
 	my ($self) = @_;
 	my $grid = $self->_gridfs();
 	$grid->drop();
+	#Dropping the collections drops their indexes, which are rebuilt with the next GridFS object
+	delete $self->{_gridfs};
 }
 
 #####################################################################
@@ -714,16 +910,40 @@ Description:
 
 sub _getWorkspaceUsers {
 	my ($self,$ids,$options) = @_;
-	my $cursor = $self->_mongodb()->get_collection('workspaceUsers')->find({id => {'$in' => $ids} });
+	#Users read by earlier calls in this process are taken from the cache
+	my $documents = {};
+	my $missing = {};
+	my $cache = $self->_workspaceUserCache();
+	foreach my $id (@{$ids}) {
+		my $entry = $cache->FETCH($id);
+		if (defined($entry) && $entry->{expires} > time()) {
+			$documents->{$id} = $entry->{document};
+		} else {
+			$missing->{$id} = 1;
+		}
+	}
+	$self->{_cacheStats}->{workspaceUsers}->{hits} += keys(%{$documents});
+	$self->{_cacheStats}->{workspaceUsers}->{misses} += keys(%{$missing});
+	if (keys(%{$missing}) > 0) {
+		my $cursor = $self->_mongodb()->get_collection('workspaceUsers')->find({id => {'$in' => [keys(%{$missing})]} });
+		while (my $object = $cursor->next) {
+			$documents->{$object->{id}} = $object;
+			$self->_cacheWorkspaceUser($object);
+		}
+	}
 	my $objHash = {};
-	while (my $object = $cursor->next) {
-		my $newObject = Bio::KBase::workspaceService::WorkspaceUser->new({
+	foreach my $object (values(%{$documents})) {
+		#The permissions and settings are copied, as the WorkspaceUser changes them in place
+		my $args = {
 			parent => $self,
 			id => $object->{id},
-			workspaces => $object->{workspaces},
-			moddate => $object->{moddate},
-			settings => $object->{settings}
-		});
+			workspaces => {%{$object->{workspaces} || {}}},
+			moddate => $object->{moddate}
+		};
+		if (defined($object->{settings})) {
+			$args->{settings} = {%{$object->{settings}}};
+		}
+		my $newObject = Bio::KBase::workspaceService::WorkspaceUser->new($args);
 		$objHash->{$newObject->id()} = $newObject;
 	}
 	my $objects = [];
@@ -740,6 +960,103 @@ sub _getWorkspaceUsers {
 	return $objects;
 }
 
+=head3 _workspaceUserCache
+
+Definition:
+	Tie::IxHash = _workspaceUserCache();
+Description:
+	Returns the workspace users read by this process, which are kept for permission-cache-ttl seconds.
+	Changes made through this process remove the changed users; changes made by other processes are seen once the users expire.
+	At most permission-cache-size users are kept, the oldest being forgotten first
+
+=cut
+
+sub _workspaceUserCache {
+	my ($self) = @_;
+	if (!defined($self->{_workspaceUserCache})) {
+		$self->{_workspaceUserCache} = Tie::IxHash->new();
+	}
+	return $self->{_workspaceUserCache};
+}
+
+sub _cacheWorkspaceUser {
+	my ($self,$document) = @_;
+	if ($self->{'_permission-cache-ttl'} <= 0 || $self->{'_permission-cache-size'} <= 0) {
+		return;
+	}
+	my $cache = $self->_workspaceUserCache();
+	$cache->Delete($document->{id});
+	while ($cache->Length() >= $self->{'_permission-cache-size'}) {
+		$cache->Shift();
+	}
+	$cache->Push($document->{id} => {document => $document,expires => time() + $self->{'_permission-cache-ttl'}});
+}
+
+sub _forgetWorkspaceUsers {
+	my ($self,$ids) = @_;
+	my $cache = $self->_workspaceUserCache();
+	foreach my $id (@{$ids}) {
+		$cache->Delete($id);
+	}
+}
+
+=head3 _cacheStatistics
+
+Definition:
+	{string:cache => {hits => int,misses => int,hitRate => float}} = _cacheStatistics();
+Description:
+	Returns the hits and misses of the caches kept by this process since it started
+
+=cut
+
+sub _cacheStatistics {
+	my ($self) = @_;
+	my $output = {};
+	foreach my $name (qw(authentication workspaceUsers)) {
+		my $stats = $self->{_cacheStats}->{$name};
+		my $hits = defined($stats->{hits}) ? $stats->{hits} : 0;
+		my $misses = defined($stats->{misses}) ? $stats->{misses} : 0;
+		$output->{$name} = {
+			hits => $hits,
+			misses => $misses,
+			hitRate => ($hits + $misses > 0) ? $hits/($hits + $misses) : 0
+		};
+	}
+	return $output;
+}
+
+=head3 _logCacheStatistics
+
+Definition:
+	void _logCacheStatistics();
+Description:
+	Writes the cache statistics to the server log of the current call, at most once every cache-stats-interval seconds
+
+=cut
+
+sub _logCacheStatistics {
+	my ($self) = @_;
+	if ($self->{'_cache-stats-interval'} <= 0) {
+		return;
+	}
+	my $ctx = $self->_getContext();
+	if (!blessed($ctx) || !$ctx->can("log_info")) {
+		return;
+	}
+	if (!defined($self->{_cacheStatsLogged})) {
+		$self->{_cacheStatsLogged} = time();
+		return;
+	}
+	if (time() - $self->{_cacheStatsLogged} < $self->{'_cache-stats-interval'}) {
+		return;
+	}
+	$self->{_cacheStatsLogged} = time();
+	my $stats = $self->_cacheStatistics();
+	$ctx->log_info("Cache statistics: ".join(", ",map {
+		sprintf("%s %d hits %d misses (%.1f%% hit rate)",$_,$stats->{$_}->{hits},$stats->{$_}->{misses},100*$stats->{$_}->{hitRate})
+	} sort(keys(%{$stats}))));
+}
+
 =head3 _getAllWorkspaceUsersByWorkspace
 
 Definition:
@@ -1055,6 +1372,95 @@ sub _getObjectsByID {
 	return $objects;
 }
 
+=head3 _getWorkspaceObjects
+
+Definition:
+	[Bio::KBase::workspaceService::Object] = _getWorkspaceObjects([string]:workspaces,[string]:types,[string]:ids,[int]:instances,{}:options);
+Description:
+	Retrieves specified Objects from database by workspace, type, ID and instance, in the order requested.
+	Current versions are retrieved with one query and specified instances with another, and missing objects are returned as undef.
+	As in Workspace::getObject, an object is missing if its ID is no longer in the workspace; it is also missing if its type is not the requested type.
+	Objects with workspace "NO_WORKSPACE" are retrieved by reference.
+
+=cut
+
+sub _getWorkspaceObjects {
+	my ($self,$workspaces,$types,$ids,$instances,$options) = @_;
+	my $wsHash = {};
+	foreach my $ws (@{$workspaces}) {
+		if ($ws ne "NO_WORKSPACE") {
+			$wsHash->{$ws} = 1;
+		}
+	}
+	if (keys(%{$wsHash}) > 0) {
+		my $wsList = $self->_getWorkspaces([keys(%{$wsHash})],{throwErrorIfMissing => 1});
+		foreach my $ws (@{$wsList}) {
+			$ws->checkPermissions(["r","w","a"]);
+			$wsHash->{$ws->id()} = $ws;
+		}
+	}
+	my $uuidIndecies = {};
+	my $instanceIndecies = {};
+	my $query = {workspace => {}, id => {}, instance => {}};
+	for (my $i=0; $i < @{$ids}; $i++) {
+		if ($workspaces->[$i] eq "NO_WORKSPACE") {
+			push(@{$uuidIndecies->{$ids->[$i]}},$i);
+		} elsif (!defined($wsHash->{$workspaces->[$i]}->objects()->{$ids->[$i]})) {
+			#Objects deleted from the workspace are missing, whatever the instance
+			next;
+		} elsif (defined($instances->[$i])) {
+			push(@{$instanceIndecies->{join("/",$workspaces->[$i],$types->[$i],$ids->[$i],int($instances->[$i]))}},$i);
+			$query->{workspace}->{$workspaces->[$i]} = 1;
+			$query->{id}->{$ids->[$i]} = 1;
+			$query->{instance}->{int($instances->[$i])} = 1;
+		} else {
+			my $uuid = $wsHash->{$workspaces->[$i]}->objects()->{$ids->[$i]};
+			if (defined($uuid)) {
+				push(@{$uuidIndecies->{$uuid}},$i);
+			}
+		}
+	}
+	my $objects = [];
+	#Retrieving current versions and references
+	if (keys(%{$uuidIndecies}) > 0) {
+		my $objs = $self->_getObjects([keys(%{$uuidIndecies})]);
+		foreach my $obj (@{$objs}) {
+			foreach my $index (@{$uuidIndecies->{$obj->uuid()}}) {
+				if ($workspaces->[$index] eq "NO_WORKSPACE" || $obj->type() eq $types->[$index]) {
+					$objects->[$index] = $obj;
+				}
+			}
+		}
+	}
+	#Retrieving specified instances
+	if (keys(%{$instanceIndecies}) > 0) {
+		my $cursor = $self->_mongodb()->get_collection('workspaceObjects')->find({
+			workspace => {'$in' => [keys(%{$query->{workspace}})]},
+			id => {'$in' => [keys(%{$query->{id}})]},
+			instance => {'$in' => [map {int($_)} keys(%{$query->{instance}})]}
+		});
+		while (my $object = $cursor->next) {
+			my $key = join("/",$object->{workspace},$object->{type},$object->{id},$object->{instance});
+			if (defined($instanceIndecies->{$key})) {
+				$object->{parent} = $self;
+				my $obj = Bio::KBase::workspaceService::Object->new($object);
+				foreach my $index (@{$instanceIndecies->{$key}}) {
+					$objects->[$index] = $obj;
+				}
+			}
+		}
+	}
+	if (defined($options->{throwErrorIfMissing}) && $options->{throwErrorIfMissing} == 1) {
+		for (my $i=0; $i < @{$ids}; $i++) {
+			if (!defined($objects->[$i])) {
+				Bio::KBase::Exceptions::ArgumentValidationError->throw(error => "Object ".$workspaces->[$i]."/".$types->[$i]."/".$ids->[$i]." not found!",
+									method_name => '_getWorkspaceObjects');
+			}
+		}
+	}
+	return $objects;
+}
+
 =head3 _getDataObject
 
 Definition:
@@ -1085,29 +1491,72 @@ Description:
 sub _getDataObjects {
 	my ($self,$chsums,$options) = @_;
 	my $grid = $self->_gridfs();
+	#Finding the files of all the data with one query
+	my $files = {};
+	my $uniqueChsums = {map {$_ => 1} @{$chsums}};
+	if (keys(%{$uniqueChsums}) > 0) {
+		my $cursor = $grid->files()->find({chsum => {'$in' => [keys(%{$uniqueChsums})]}});
+		while (my $file = $cursor->next) {
+			if (!defined($files->{$file->{chsum}})) {
+				$files->{$file->{chsum}} = $file;
+			}
+		}
+	}
+	#Reading the chunks of all the files with one query
+	my $chunks = {};
+	if (keys(%{$files}) > 0) {
+		#Chunks are placed by number rather than sorted by the database, which would have to hold them all in memory
+		my $cursor = $grid->chunks()->find({files_id => {'$in' => [map {$_->{_id}} values(%{$files})]}});
+		while (my $chunk = $cursor->next) {
+			$chunks->{$chunk->{files_id}}->[$chunk->{n}] = $chunk->{data};
+		}
+	}
+	my $dataObjects = {};
 	my $objects = [];
 	foreach my $chsum (@{$chsums}) {
-		my $file = $grid->find_one({chsum => $chsum});
+		my $file = $files->{$chsum};
 		if (!defined($file) && $options->{throwErrorIfMissing} == 1) {
 			Bio::KBase::Exceptions::ArgumentValidationError->throw(error => "DataObject ".$chsum." not found!",
 									method_name => '_getDataObjects');
 		}
 		if (defined($file)) {
-			my $dataString = $file->slurp();
-			my $newObject = Bio::KBase::workspaceService::DataObject->new({
-				parent => $self,
-				compressed => $file->{info}->{compressed},
-				json => $file->{info}->{json},
-				chsum => $file->{info}->{chsum},
-				data => $dataString,
-				creationDate => $file->{info}->{creationDate}	
-			});
-			push(@{$objects},$newObject);
+			if (!defined($dataObjects->{$chsum})) {
+				$dataObjects->{$chsum} = Bio::KBase::workspaceService::DataObject->new({
+					parent => $self,
+					compressed => $file->{compressed},
+					json => $file->{json},
+					chsum => $file->{chsum},
+					data => join("",@{$chunks->{$file->{_id}} || []}),
+					creationDate => $file->{creationDate}
+				});
+			}
+			push(@{$objects},$dataObjects->{$chsum});
 		}
 	}
 	return $objects;
 }
 
+=head3 _loadDataObjects
+
+Definition:
+	void _loadDataObjects([Bio::KBase::workspaceService::Object]:objects);
+Description:
+	Retrieves the data of all the input objects from the database at once, rather than one object at a time as each is used
+
+=cut
+
+sub _loadDataObjects {
+	my ($self,$objects) = @_;
+	my $objs = [grep {defined($_) && !$_->hasDataObject()} @{$objects}];
+	my $dataObjects = $self->_getDataObjects([map {$_->chsum()} @{$objs}]);
+	my $chsumHash = {map {$_->chsum() => $_} @{$dataObjects}};
+	foreach my $obj (@{$objs}) {
+		if (defined($chsumHash->{$obj->chsum()})) {
+			$obj->setDataObject($chsumHash->{$obj->chsum()});
+		}
+	}
+}
+
 =head3 _tohtml
 
 Definition:
@@ -1207,16 +1656,62 @@ sub _validateTypeName {
 
 sub _validateObjectType {
 	my ($self,$type) = @_;
-	my $types = $self->_permanentTypes();
-	if (defined($types->{$type})) {
-		return;
+	$self->_validateObjectTypes([$type]);
+}
+
+sub _validateObjectTypes {
+	my ($self,$types) = @_;
+	my $registry = $self->_typeRegistry();
+	my $missing = [grep {!defined($registry->{$_})} @{$types}];
+	if (@{$missing} > 0) {
+		#The types may have been added by another server process since they were last checked
+		$registry = $self->_typeRegistry(1);
+		$missing = [grep {!defined($registry->{$_})} @{$missing}];
 	}
-	my $cursor = $self->_mongodb()->get_collection('typeObjects')->find({id => $type});
-	if (my $object = $cursor->next) {
-		return;
+	if (@{$missing} > 0) {
+		my $msg = "Specified type not valid!";
+		Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,method_name => '_validateObjectType');
+	}
+}
+
+=head3 _typeRegistry
+
+Definition:
+	{string:type => 1} = _typeRegistry(0/1:check);
+Description:
+	Returns all permanent and optional types, kept in memory. The optional types are reloaded when add_type or remove_type changes them in this process. Changes made by other server processes are picked up when the type version in the database is checked, every type-check-interval seconds or when check is set
+
+=cut
+
+sub _typeRegistry {
+	my ($self,$check) = @_;
+	my $registry = $self->{_typeRegistry};
+	if (defined($registry) && !$check && time() - $registry->{checked} < $self->{'_type-check-interval'}) {
+		return $registry->{types};
+	}
+	#The version is read before the types, so types changed in between are only ever reloaded again
+	my $version = 0;
+	my $object = $self->_mongodb()->get_collection('typeRegistry')->find_one({id => "version"});
+	if (defined($object)) {
+		$version = $object->{version};
+	}
+	if (!defined($registry) || $registry->{version} != $version) {
+		my $types = $self->_permanentTypes();
+		my $cursor = $self->_mongodb()->get_collection('typeObjects')->find({});
+		while (my $object = $cursor->next) {
+			$types->{$object->{id}} = 1;
+		}
+		$registry = {types => $types,version => $version};
+		$self->{_typeRegistry} = $registry;
 	}
-	my $msg = "Specified type not valid!";
-	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,method_name => '_validateObjectType');
+	$registry->{checked} = time();
+	return $registry->{types};
+}
+
+sub _typesChanged {
+	my ($self) = @_;
+	$self->_mongodb()->get_collection('typeRegistry')->update({id => "version"},{'$inc' => {version => 1}},{upsert => 1,safe => 1});
+	delete $self->{_typeRegistry};
 }
 
 sub _permanentTypes {
@@ -1438,7 +1933,14 @@ sub new
 	my $db = "workspace_service";
 	my $user = undef;
 	my $pwd = undef;
-	my $paramlist = [qw(mongodb-database mongodb-host mongodb-user mongodb-pwd mssserver-url accounttype idserver-url)];
+	$self->{'_auth-cache-ttl'} = 300;
+	$self->{'_auth-cache-invalid-ttl'} = 60;
+	$self->{'_auth-cache-size'} = 1000;
+	$self->{'_type-check-interval'} = 10;
+	$self->{'_permission-cache-ttl'} = 5;
+	$self->{'_permission-cache-size'} = 1000;
+	$self->{'_cache-stats-interval'} = 3600;
+	my $paramlist = [qw(mongodb-database mongodb-host mongodb-user mongodb-pwd mssserver-url accounttype idserver-url auth-cache-ttl auth-cache-invalid-ttl auth-cache-size type-check-interval permission-cache-ttl permission-cache-size cache-stats-interval)];
 
 	# so it looks like params is created by looping over the config object
 	# if deployment.cfg exists
@@ -1462,7 +1964,7 @@ sub new
 			$c->read($e);
 			for my $p (@{$paramlist}) {
 				my $v = $c->param("$service.$p");
-				if ($v) {
+				if (defined($v) && $v ne "") {
 					$params->{$p} = $v;
 				}
 			}
@@ -1505,6 +2007,11 @@ sub new
 	if (defined $params->{'mssserver-url'}) {
 			$self->{'_mssserver-url'} = $params->{'mssserver-url'};
 	}
+	foreach my $p (qw(auth-cache-ttl auth-cache-invalid-ttl auth-cache-size type-check-interval permission-cache-ttl permission-cache-size cache-stats-interval)) {
+		if (defined $params->{$p}) {
+			$self->{"_$p"} = $params->{$p};
+		}
+	}
 	
 	#print STDERR "***Starting workspace service with mongo parameters:***\n";
 	#print STDERR "Host: $host\n";
@@ -1534,6 +2041,7 @@ sub new
 	} else {
 		$self->{_idserver} = Bio::KBase::IDServer::Client->new($self->{'_idserver-url'});
 	}
+	$self->_typeRegistry();
 	
     #END_CONSTRUCTOR
 
@@ -2197,6 +2705,215 @@ sub save_object
 
 
 
+=head2 save_objects
+
+  $metadatas = $obj->save_objects($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a save_objects_params
+$metadatas is a reference to a list where each element is an object_metadata
+save_objects_params is a reference to a hash where the following keys are defined:
+	objects has a value which is a reference to a list where each element is a save_object_params
+	auth has a value which is a string
+	asHash has a value which is a bool
+save_object_params is a reference to a hash where the following keys are defined:
+	id has a value which is an object_id
+	type has a value which is an object_type
+	data has a value which is an ObjectData
+	workspace has a value which is a workspace_id
+	command has a value which is a string
+	metadata has a value which is a reference to a hash where the key is a string and the value is a string
+	auth has a value which is a string
+	json has a value which is a bool
+	compressed has a value which is a bool
+	retrieveFromURL has a value which is a bool
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+ObjectData is a reference to a hash where the following keys are defined:
+	version has a value which is an int
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a save_objects_params
+$metadatas is a reference to a list where each element is an object_metadata
+save_objects_params is a reference to a hash where the following keys are defined:
+	objects has a value which is a reference to a list where each element is a save_object_params
+	auth has a value which is a string
+	asHash has a value which is a bool
+save_object_params is a reference to a hash where the following keys are defined:
+	id has a value which is an object_id
+	type has a value which is an object_type
+	data has a value which is an ObjectData
+	workspace has a value which is a workspace_id
+	command has a value which is a string
+	metadata has a value which is a reference to a hash where the key is a string and the value is a string
+	auth has a value which is a string
+	json has a value which is a bool
+	compressed has a value which is a bool
+	retrieveFromURL has a value which is a bool
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+ObjectData is a reference to a hash where the following keys are defined:
+	version has a value which is an int
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+
+=end text
+
+
+
+=item Description
+
+Saves the input objects into the selected workspaces, returning the object_metadata of each saved object in the order of the input.
+Objects are checked and saved together, so this is much faster than calling "save_object" for each. If any object fails validation, none are saved.
+
+=back
+
+=cut
+
+sub save_objects
+{
+    my $self = shift;
+    my($params) = @_;
+
+    my @_bad_arguments;
+    (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument \"params\" (value was \"$params\")");
+    if (@_bad_arguments) {
+	my $msg = "Invalid arguments passed to save_objects:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+							       method_name => 'save_objects');
+    }
+
+    my $ctx = $Bio::KBase::workspaceService::Service::CallContext;
+    my($metadatas);
+    #BEGIN save_objects
+	$self->_setContext($params->{auth}, 'Save objects', 'save_objects');
+	$params = $self->_validateargs($params,["objects"],{
+		asHash => 0,
+	});
+	#Validating all objects before anything is saved
+	my $objects = [];
+	my $wsIndecies = {};
+	my $refIndecies = [];
+	for (my $i=0; $i < @{$params->{objects}}; $i++) {
+		my $object = $self->_validateargs($params->{objects}->[$i],["id","type","data","workspace"],{
+			command => undef,
+			metadata => {},
+			json => 0,
+			compressed => 0,
+			retrieveFromURL => 0,
+		});
+		$self->_validateObjectID($object->{id});
+		if ($object->{retrieveFromURL} == 1) {
+			$object->{data} = $self->_retreiveDataFromURL($object->{data});
+		}
+		if ($object->{compressed} == 1) {
+			$object->{data} = $self->_uncompress($object->{data});
+		}
+		if ($object->{json} == 1) {
+			$object->{data} = $self->_decode($object->{data});
+		}
+		push(@{$objects},$object);
+		if ($object->{workspace} eq "NO_WORKSPACE") {
+			push(@{$refIndecies},$i);
+		} else {
+			push(@{$wsIndecies->{$object->{workspace}}},$i);
+		}
+	}
+	$self->_validateObjectTypes([map {$_->{type}} @{$objects}]);
+	my $wsList = [];
+	if (keys(%{$wsIndecies}) > 0) {
+		$wsList = $self->_getWorkspaces([keys(%{$wsIndecies})],{throwErrorIfMissing => 1});
+		foreach my $ws (@{$wsList}) {
+			$ws->checkPermissions(["w","a"]);
+		}
+	}
+	#Saving the data of all workspace objects at once
+	my $wsSaves = [map {@{$wsIndecies->{$_->id()}}} @{$wsList}];
+	my $datas = $self->_createDataObjects([map {$objects->[$_]->{data}} @{$wsSaves}]);
+	my $dataObjects = {};
+	for (my $i=0; $i < @{$wsSaves}; $i++) {
+		$dataObjects->{$wsSaves->[$i]} = $datas->[$i];
+	}
+	my $saved = [];
+	foreach my $ws (@{$wsList}) {
+		my $indecies = $wsIndecies->{$ws->id()};
+		my $objs = $ws->saveObjects(
+			[map {$objects->[$_]->{type}} @{$indecies}],
+			[map {$objects->[$_]->{id}} @{$indecies}],
+			[map {$dataObjects->{$_}} @{$indecies}],
+			[map {$objects->[$_]->{command}} @{$indecies}],
+			[map {$objects->[$_]->{metadata}} @{$indecies}]
+		);
+		for (my $i=0; $i < @{$indecies}; $i++) {
+			$saved->[$indecies->[$i]] = $objs->[$i];
+		}
+	}
+	#Dealing with objects that will be saved as references only
+	foreach my $i (@{$refIndecies}) {
+		my $object = $objects->[$i];
+		$saved->[$i] = $self->_saveObjectByRef($object->{type},$object->{id},$object->{data},$object->{command},$object->{metadata});
+	}
+	$metadatas = [map {$_->metadata($params->{asHash})} @{$saved}];
+    #END save_objects
+    my @_bad_returns;
+    (ref($metadatas) eq 'ARRAY') or push(@_bad_returns, "Invalid type for return variable \"metadatas\" (value was \"$metadatas\")");
+    if (@_bad_returns) {
+	my $msg = "Invalid returns passed to save_objects:\n" . join("", map { "\t$_\n" } @_bad_returns);
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+							       method_name => 'save_objects');
+    }
+    return($metadatas);
+}
+
+
+
+
 =head2 delete_object
 
   $metadata = $obj->delete_object($params)
@@ -2754,6 +3471,7 @@ sub get_objects
 	#Retreiving references
 	if (@{$refs} > 0) {
 		my $objs = $self->_getObjects($refs,{throwErrorIfMissing => 1});
+		$self->_loadDataObjects($objs);
 		for (my $i=0; $i < @{$objs}; $i++) {
 			$output->[$refIndecies->{$refs->[$i]}] = {
 				data => $objs->[$i]->data(),
@@ -2767,6 +3485,7 @@ sub get_objects
 		for (my $i=0; $i < @{$wsList}; $i++) {
 			my $ws = $wsList->[$i]->id();
 			my $objs = $wsList->[$i]->getObjects($wsHash->{$ws}->{types},$wsHash->{$ws}->{ids},$wsHash->{$ws}->{instances},{throwErrorIfMissing => 1});
+			$self->_loadDataObjects($objs);
 			for (my $j=0; $j < @{$objs}; $j++) {
 				$output->[$idHash->{$ws}->{$wsHash->{$ws}->{types}->[$j]}->{$wsHash->{$ws}->{ids}->[$j]}] = {
 					data => $objs->[$j]->data(),
@@ -3086,7 +3805,137 @@ sub save_object_by_ref
     if (@_bad_returns) {
 	my $msg = "Invalid returns passed to save_object_by_ref:\n" . join("", map { "\t$_\n" } @_bad_returns);
 	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
-							       method_name => 'save_object_by_ref');
+							       method_name => 'save_object_by_ref');
+    }
+    return($metadata);
+}
+
+
+
+
+=head2 get_objectmeta
+
+  $metadata = $obj->get_objectmeta($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a get_objectmeta_params
+$metadata is an object_metadata
+get_objectmeta_params is a reference to a hash where the following keys are defined:
+	id has a value which is an object_id
+	type has a value which is an object_type
+	workspace has a value which is a workspace_id
+	instance has a value which is an int
+	auth has a value which is a string
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a get_objectmeta_params
+$metadata is an object_metadata
+get_objectmeta_params is a reference to a hash where the following keys are defined:
+	id has a value which is an object_id
+	type has a value which is an object_type
+	workspace has a value which is a workspace_id
+	instance has a value which is an int
+	auth has a value which is a string
+	asHash has a value which is a bool
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+object_metadata is a reference to a list containing 11 items:
+	0: (id) an object_id
+	1: (type) an object_type
+	2: (moddate) a timestamp
+	3: (instance) an int
+	4: (command) a string
+	5: (lastmodifier) a username
+	6: (owner) a username
+	7: (workspace) a workspace_id
+	8: (ref) a workspace_ref
+	9: (chsum) a string
+	10: (metadata) a reference to a hash where the key is a string and the value is a string
+timestamp is a string
+username is a string
+workspace_ref is a string
+
+
+=end text
+
+
+
+=item Description
+
+Retrieves the metadata for a specified object from the specified workspace.
+This commands provides access to metadata for all versions of the object via the instance parameter.
+
+=back
+
+=cut
+
+sub get_objectmeta
+{
+    my $self = shift;
+    my($params) = @_;
+
+    my @_bad_arguments;
+    (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument \"params\" (value was \"$params\")");
+    if (@_bad_arguments) {
+	my $msg = "Invalid arguments passed to get_objectmeta:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+							       method_name => 'get_objectmeta');
+    }
+
+    my $ctx = $Bio::KBase::workspaceService::Service::CallContext;
+    my($metadata);
+    #BEGIN get_objectmeta
+	$self->_setContext($params->{auth});
+	$self->_validateargs($params,["id","type","workspace"],{
+		instance => undef,
+		asHash => 0
+	});
+	my $ws = $self->_getWorkspace($params->{workspace},{throwErrorIfMissing => 1});
+	my $obj = $ws->getObject($params->{type},$params->{id},{
+		throwErrorIfMissing => 1,
+		instance => $params->{instance}
+	});
+	$metadata = $obj->metadata($params->{asHash});
+    #END get_objectmeta
+    my @_bad_returns;
+    (ref($metadata) eq 'ARRAY') or push(@_bad_returns, "Invalid type for return variable \"metadata\" (value was \"$metadata\")");
+    if (@_bad_returns) {
+	my $msg = "Invalid returns passed to get_objectmeta:\n" . join("", map { "\t$_\n" } @_bad_returns);
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+							       method_name => 'get_objectmeta');
     }
     return($metadata);
 }
@@ -3094,9 +3943,9 @@ sub save_object_by_ref
 
 
 
-=head2 get_objectmeta
+=head2 get_objectmetas
 
-  $metadata = $obj->get_objectmeta($params)
+  $metadatas = $obj->get_objectmetas($params)
 
 =over 4
 
@@ -3105,13 +3954,13 @@ sub save_object_by_ref
 =begin html
 
 <pre>
-$params is a get_objectmeta_params
-$metadata is an object_metadata
-get_objectmeta_params is a reference to a hash where the following keys are defined:
-	id has a value which is an object_id
-	type has a value which is an object_type
-	workspace has a value which is a workspace_id
-	instance has a value which is an int
+$params is a get_objectmetas_params
+$metadatas is a reference to a list where each element is an object_metadata
+get_objectmetas_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
 	auth has a value which is a string
 	asHash has a value which is a bool
 object_id is a string
@@ -3140,13 +3989,13 @@ workspace_ref is a string
 
 =begin text
 
-$params is a get_objectmeta_params
-$metadata is an object_metadata
-get_objectmeta_params is a reference to a hash where the following keys are defined:
-	id has a value which is an object_id
-	type has a value which is an object_type
-	workspace has a value which is a workspace_id
-	instance has a value which is an int
+$params is a get_objectmetas_params
+$metadatas is a reference to a list where each element is an object_metadata
+get_objectmetas_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
 	auth has a value which is a string
 	asHash has a value which is a bool
 object_id is a string
@@ -3176,14 +4025,14 @@ workspace_ref is a string
 
 =item Description
 
-Retrieves the metadata for a specified object from the specified workspace.
-This commands provides access to metadata for all versions of the object via the instance parameter.
+Retrieves the metadata for the specified objects from the specified workspaces, in the order requested.
+This is much faster than calling "get_objectmeta" for each object.
 
 =back
 
 =cut
 
-sub get_objectmeta
+sub get_objectmetas
 {
     my $self = shift;
     my($params) = @_;
@@ -3191,34 +4040,30 @@ sub get_objectmeta
     my @_bad_arguments;
     (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument \"params\" (value was \"$params\")");
     if (@_bad_arguments) {
-	my $msg = "Invalid arguments passed to get_objectmeta:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	my $msg = "Invalid arguments passed to get_objectmetas:\n" . join("", map { "\t$_\n" } @_bad_arguments);
 	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
-							       method_name => 'get_objectmeta');
+							       method_name => 'get_objectmetas');
     }
 
     my $ctx = $Bio::KBase::workspaceService::Service::CallContext;
-    my($metadata);
-    #BEGIN get_objectmeta
+    my($metadatas);
+    #BEGIN get_objectmetas
 	$self->_setContext($params->{auth});
-	$self->_validateargs($params,["id","type","workspace"],{
-		instance => undef,
+	$params = $self->_validateargs($params,["ids","types","workspaces"],{
+		instances => [],
 		asHash => 0
 	});
-	my $ws = $self->_getWorkspace($params->{workspace},{throwErrorIfMissing => 1});
-	my $obj = $ws->getObject($params->{type},$params->{id},{
-		throwErrorIfMissing => 1,
-		instance => $params->{instance}
-	});
-	$metadata = $obj->metadata($params->{asHash});
-    #END get_objectmeta
+	my $objs = $self->_getWorkspaceObjects($params->{workspaces},$params->{types},$params->{ids},$params->{instances},{throwErrorIfMissing => 1});
+	$metadatas = [map {$_->metadata($params->{asHash})} @{$objs}];
+    #END get_objectmetas
     my @_bad_returns;
-    (ref($metadata) eq 'ARRAY') or push(@_bad_returns, "Invalid type for return variable \"metadata\" (value was \"$metadata\")");
+    (ref($metadatas) eq 'ARRAY') or push(@_bad_returns, "Invalid type for return variable \"metadatas\" (value was \"$metadatas\")");
     if (@_bad_returns) {
-	my $msg = "Invalid returns passed to get_objectmeta:\n" . join("", map { "\t$_\n" } @_bad_returns);
+	my $msg = "Invalid returns passed to get_objectmetas:\n" . join("", map { "\t$_\n" } @_bad_returns);
 	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
-							       method_name => 'get_objectmeta');
+							       method_name => 'get_objectmetas');
     }
-    return($metadata);
+    return($metadatas);
 }
 
 
@@ -4039,6 +4884,102 @@ sub has_object
 
 
 
+=head2 has_objects
+
+  $objects_present = $obj->has_objects($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a has_objects_params
+$objects_present is a reference to a list where each element is a bool
+has_objects_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
+	auth has a value which is a string
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a has_objects_params
+$objects_present is a reference to a list where each element is a bool
+has_objects_params is a reference to a hash where the following keys are defined:
+	ids has a value which is a reference to a list where each element is an object_id
+	types has a value which is a reference to a list where each element is an object_type
+	workspaces has a value which is a reference to a list where each element is a workspace_id
+	instances has a value which is a reference to a list where each element is an int
+	auth has a value which is a string
+object_id is a string
+object_type is a string
+workspace_id is a string
+bool is an int
+
+
+=end text
+
+
+
+=item Description
+
+Checks if the specified objects in the specified workspaces exist.
+Returns "1" for each object that exists and "0" for each that does not, in the order requested.
+
+=back
+
+=cut
+
+sub has_objects
+{
+    my $self = shift;
+    my($params) = @_;
+
+    my @_bad_arguments;
+    (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument \"params\" (value was \"$params\")");
+    if (@_bad_arguments) {
+	my $msg = "Invalid arguments passed to has_objects:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+							       method_name => 'has_objects');
+    }
+
+    my $ctx = $Bio::KBase::workspaceService::Service::CallContext;
+    my($objects_present);
+    #BEGIN has_objects
+	$self->_setContext($params->{auth});
+	$params = $self->_validateargs($params,["ids","types","workspaces"],{
+		instances => []
+	});
+	my $objs = $self->_getWorkspaceObjects($params->{workspaces},$params->{types},$params->{ids},$params->{instances});
+	$objects_present = [];
+	for (my $i=0; $i < @{$params->{ids}}; $i++) {
+		$objects_present->[$i] = defined($objs->[$i]) ? 1 : 0;
+	}
+    #END has_objects
+    my @_bad_returns;
+    (ref($objects_present) eq 'ARRAY') or push(@_bad_returns, "Invalid type for return variable \"objects_present\" (value was \"$objects_present\")");
+    if (@_bad_returns) {
+	my $msg = "Invalid returns passed to has_objects:\n" . join("", map { "\t$_\n" } @_bad_returns);
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+							       method_name => 'has_objects');
+    }
+    return($objects_present);
+}
+
+
+
+
 =head2 object_history
 
   $metadatas = $obj->object_history($params)
@@ -5977,11 +6918,7 @@ sub get_types
     my $ctx = $Bio::KBase::workspaceService::Service::CallContext;
     my($types);
     #BEGIN get_types
-	$types = [keys(%{$self->_permanentTypes()})];
-	my $cursor = $self->_mongodb()->get_collection('typeObjects')->find({});
-	while (my $object = $cursor->next) {
-		push(@{$types},$object->{id});
-	}
+	$types = [keys(%{$self->_typeRegistry()})];
     #END get_types
     my @_bad_returns;
     (ref($types) eq 'ARRAY') or push(@_bad_returns, "Invalid type for return variable \"types\" (value was \"$types\")");
@@ -6075,6 +7012,7 @@ sub add_type
 		moddate => DateTime->now()->datetime(),
 		permanent => 0
 	});
+	$self->_typesChanged();
 	$success = 1;
     #END add_type
     my @_bad_returns;
@@ -6156,6 +7094,7 @@ sub remove_type
 	my $cursor = $self->_mongodb()->get_collection('typeObjects')->find({id => $params->{type},permanent => 0});
 	if (my $object = $cursor->next) {
 		$self->_mongodb()->get_collection('typeObjects')->remove({id => $params->{type}});
+		$self->_typesChanged();
 	} else {
 		my $msg = "Trying to remove a type that doesn't exist  or a permanent type!";
 		Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,method_name => 'queue_job');
@@ -7064,6 +8003,49 @@ asHash has a value which is a bool
 
 
 
+=head2 save_objects_params
+
+=over 4
+
+
+
+=item Description
+
+Input parameters for the "save_objects" function.
+
+        list<save_object_params> objects - parameters for each object to be saved, as for the "save_object" function; the auth and asHash of each are ignored (an essential argument)
+        string auth - the authentication token of the KBase account to associate this save command
+        bool asHash - a boolean indicating if metadata should be returned as a hash
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+objects has a value which is a reference to a list where each element is a save_object_params
+auth has a value which is a string
+asHash has a value which is a bool
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+objects has a value which is a reference to a list where each element is a save_object_params
+auth has a value which is a string
+asHash has a value which is a bool
+
+
+=end text
+
+=back
+
+
+
 =head2 delete_object_params
 
 =over 4
@@ -7480,6 +8462,59 @@ asHash has a value which is a bool
 
 
 
+=head2 get_objectmetas_params
+
+=over 4
+
+
+
+=item Description
+
+Input parameters for the "get_objectmetas" function.
+
+        list<object_id> ids - IDs of the objects for which metadata is to be retrieved, or references to them if their workspace is "NO_WORKSPACE" (an essential argument)
+        list<object_type> types - types of the objects for which metadata is to be retrieved (an essential argument)
+        list<workspace_id> workspaces - IDs of the workspaces containing the objects for which metadata is to be retrieved (an essential argument)
+        list<int> instances - Versions of the objects for which metadata is to be retrieved (an optional argument; the current metadata is retrieved for any version not provided)
+        string auth - the authentication token of the KBase account to associate with this object metadata retrieval command (an optional argument)
+        bool asHash - a boolean indicating if metadata should be returned as a hash
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+asHash has a value which is a bool
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+asHash has a value which is a bool
+
+
+=end text
+
+=back
+
+
+
 =head2 get_objectmeta_by_ref_params
 
 =over 4
@@ -7743,6 +8778,56 @@ auth has a value which is a string
 
 
 
+=head2 has_objects_params
+
+=over 4
+
+
+
+=item Description
+
+Input parameters for the "has_objects" function.
+
+        list<object_id> ids - IDs of the objects to be checked for existance, or references to them if their workspace is "NO_WORKSPACE" (an essential argument)
+        list<object_type> types - types of the objects to be checked for existance (an essential argument)
+        list<workspace_id> workspaces - IDs of the workspaces containing the objects to be checked for existance (an essential argument)
+        list<int> instances - Versions of the objects to be checked for existance (an optional argument; the current object is checked for any version not provided)
+        string auth - the authentication token of the KBase account to associate with this object check command (an optional argument)
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ids has a value which is a reference to a list where each element is an object_id
+types has a value which is a reference to a list where each element is an object_type
+workspaces has a value which is a reference to a list where each element is a workspace_id
+instances has a value which is a reference to a list where each element is an int
+auth has a value which is a string
+
+
+=end text
+
+=back
+
+
+
 =head2 object_history_params
 
 =over 4
@@ -38,6 +38,7 @@ sub new {
 		command => "unknown",
 		instance => 0,
 		rawdata => undef,
+		dataObject => undef,
 		chsum => undef,
 		meta => {},
 		moddate => DateTime->now()->datetime()
@@ -59,6 +60,10 @@ sub new {
 		_chsum => $args->{chsum}
 	};
 	bless $self;
+	if (defined($args->{dataObject})) {
+		$self->{_dataObject} = $args->{dataObject};
+		$self->{_chsum} = $args->{dataObject}->chsum();
+	}
 	$self->_validateID($args->{id});
 	if (defined($args->{rawdata})) {
 		$self->processRawData($args->{rawdata});
@@ -401,6 +406,34 @@ sub dataObject {
 	return $self->{_dataObject}
 }
 
+=head3 hasDataObject
+
+Definition:
+	0/1 = hasDataObject()
+Description:
+	Returns "1" if the data object for the object has been retrieved, "0" otherwise
+
+=cut
+
+sub hasDataObject {
+	my ($self) = @_;
+	return defined($self->{_dataObject}) ? 1 : 0;
+}
+
+=head3 setDataObject
+
+Definition:
+	void setDataObject(Bio::KBase::workspaceService::DataObject)
+Description:
+	Sets the data object for the object, when it has been retrieved elsewhere
+
+=cut
+
+sub setDataObject {
+	my ($self,$dataObject) = @_;
+	$self->{_dataObject} = $dataObject;
+}
+
 =head3 objectHistory
 
 Definition:
@@ -21,6 +21,7 @@ our %return_counts = (
         'import_bio' => 1,
         'import_map' => 1,
         'save_object' => 1,
+        'save_objects' => 1,
         'delete_object' => 1,
         'delete_object_permanently' => 1,
         'get_object' => 1,
@@ -28,11 +29,13 @@ our %return_counts = (
         'get_object_by_ref' => 1,
         'save_object_by_ref' => 1,
         'get_objectmeta' => 1,
+        'get_objectmetas' => 1,
         'get_objectmeta_by_ref' => 1,
         'revert_object' => 1,
         'copy_object' => 1,
         'move_object' => 1,
         'has_object' => 1,
+        'has_objects' => 1,
         'object_history' => 1,
         'create_workspace' => 1,
         'get_workspacemeta' => 1,
@@ -60,6 +63,7 @@ our %method_authentication = (
         'import_bio' => 'optional',
         'import_map' => 'optional',
         'save_object' => 'optional',
+        'save_objects' => 'optional',
         'delete_object' => 'optional',
         'delete_object_permanently' => 'optional',
         'get_object' => 'optional',
@@ -67,11 +71,13 @@ our %method_authentication = (
         'get_object_by_ref' => 'optional',
         'save_object_by_ref' => 'optional',
         'get_objectmeta' => 'optional',
+        'get_objectmetas' => 'optional',
         'get_objectmeta_by_ref' => 'optional',
         'revert_object' => 'optional',
         'copy_object' => 'optional',
         'move_object' => 'optional',
         'has_object' => 'optional',
+        'has_objects' => 'optional',
         'object_history' => 'optional',
         'create_workspace' => 'optional',
         'get_workspacemeta' => 'optional',
@@ -102,6 +108,7 @@ sub _build_valid_methods
         'import_bio' => 1,
         'import_map' => 1,
         'save_object' => 1,
+        'save_objects' => 1,
         'delete_object' => 1,
         'delete_object_permanently' => 1,
         'get_object' => 1,
@@ -109,11 +116,13 @@ sub _build_valid_methods
         'get_object_by_ref' => 1,
         'save_object_by_ref' => 1,
         'get_objectmeta' => 1,
+        'get_objectmetas' => 1,
         'get_objectmeta_by_ref' => 1,
         'revert_object' => 1,
         'copy_object' => 1,
         'move_object' => 1,
         'has_object' => 1,
+        'has_objects' => 1,
         'object_history' => 1,
         'create_workspace' => 1,
         'get_workspacemeta' => 1,
@@ -444,6 +444,103 @@ sub saveObject {
 	return $newObject;
 }
 
+=head3 saveObjects
+
+Definition:
+	[Bio::KBase::workspaceService::Object] = saveObjects([string]:types,[string]:ids,[Bio::KBase::workspaceService::DataObject]:data,[string]:commands,[{}]:metas)
+Description:
+	Saves the input objects, whose data must already be in the database, to the workspace.
+	The current versions of the objects are retrieved and the new versions inserted with a single query each.
+
+=cut
+
+sub saveObjects {
+	my ($self,$types,$ids,$dataObjects,$commands,$metas) = @_;
+	$self->checkPermissions(["w","a"]);
+	my $objects = $self->objects();
+	#Retrieving the current versions of all objects at once
+	my $current = {};
+	my $uuids = [grep {defined($_)} map {$objects->{$_}} @{$ids}];
+	if (@{$uuids} > 0) {
+		my $objs = $self->parent()->_getObjects($uuids);
+		foreach my $obj (@{$objs}) {
+			$current->{$obj->uuid()} = {
+				owner => $obj->owner(),
+				instance => $obj->instance(),
+				meta => $obj->meta()
+			};
+		}
+	}
+	my $newObjects = [];
+	my $updates = [];
+	eval {
+		for (my $i=0; $i < @{$ids}; $i++) {
+			my ($type,$id,$meta) = ($types->[$i],$ids->[$i],$metas->[$i]);
+			my $continue = 1;
+			my ($ancestor,$instance,$owner,$olduuid);
+			my $uuid = Data::UUID->new()->create_str();
+			while($continue == 1) {
+				$ancestor = undef;
+				$instance = 0;
+				$owner = $self->currentUser();
+				$olduuid = $objects->{$id};
+				if (defined($olduuid)) {
+					#The object may have been saved since it was retrieved
+					if (!defined($current->{$olduuid})) {
+						my $obj = $self->parent()->_getObject($olduuid,{throwErrorIfMissing => 1});
+						$current->{$olduuid} = {
+							owner => $obj->owner(),
+							instance => $obj->instance(),
+							meta => $obj->meta()
+						};
+					}
+					if (!defined($meta)) {
+						$meta = $current->{$olduuid}->{meta};
+					}
+					$ancestor = $olduuid;
+					$owner = $current->{$olduuid}->{owner};
+					$instance = ($current->{$olduuid}->{instance}+1);
+				}
+				if ($self->_updateObjects($type,$id,$uuid,$olduuid) == 1) {
+					$continue = 0;
+				};
+			}
+			push(@{$updates},[$type,$id,$uuid,$olduuid]);
+			#Later saves of the same object in this call descend from this one
+			$current->{$uuid} = {
+				owner => $owner,
+				instance => $instance,
+				meta => $meta
+			};
+			push(@{$newObjects},{
+				uuid => $uuid,
+				type => $type,
+				workspace => $self->id(),
+				ancestor => $ancestor,
+				owner => $owner,
+				lastModifiedBy => $self->currentUser(),
+				command => $commands->[$i],
+				id => $id,
+				instance => $instance,
+				dataObject => $dataObjects->[$i],
+				meta => $meta
+			});
+		}
+		$newObjects = $self->parent()->_createObjects($newObjects);
+	};
+	if ($@) {
+		my $errmsg = $@;
+		#Restoring the objects in reverse order to prevent the database from getting into a bad state
+		foreach my $update (reverse(@{$updates})) {
+			$self->_updateObjects($update->[0],$update->[1],$update->[3],$update->[2]);
+		}
+		my $msg = "Save failed for ".$self->id()."!\n";
+		$msg .= $errmsg;
+		Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,method_name => 'saveObjects');
+	}
+	return $newObjects;
+}
+
 =head3 revertObject
 
 Definition:
@@ -138,6 +138,7 @@ sub setWorkspacePermission {
 	} else {
 		$self->parent()->_updateDB("workspaceUsers",{id => $self->id()},{'$set' => {'workspaces.'.$workspace => $perm}});
 	}
+	$self->parent()->_forgetWorkspaceUsers([$self->id()]);
 }
 
 =head3 getWorkspacePermission
@@ -220,6 +221,7 @@ sub updateSettings {
 	my ($self,$setting,$value) = @_;
 	$self->settings()->{$setting} = $value;
 	$self->parent()->_updateDB("workspaceUsers",{id => $self->id()},{'$set' => {'settings.'.$setting => $value}});
+	$self->parent()->_forgetWorkspaceUsers([$self->id()]);
 }
 
 sub _validateID {
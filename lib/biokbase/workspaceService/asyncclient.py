@@ -0,0 +1,211 @@
+############################################################
+#
+# asyncio client for the workspaceService.
+#
+# Requires Python 3.7 or later. Offers the same RPC methods as the blocking
+# workspaceService client in client.py, as coroutines, over keep-alive
+# HTTP/1.1 connections driven by the event loop.
+#
+# Only a token, given or from KB_AUTH_TOKEN, is supported for auth: unlike
+# the blocking client, it cannot get a token with a user_id and password or
+# read one from ~/.authrc or ~/.kbase_config. The blocking client's other
+# extras (caches, retries, metrics, replicas and streaming) are not offered.
+#
+# Passes on OSError (including ConnectionError), asyncio.TimeoutError and
+# urllib.error.HTTPError exceptions.
+#
+############################################################
+
+import asyncio
+import http.client
+import io
+import os
+import ssl
+import urllib.error
+import urllib.parse
+import zlib
+
+from .rpc import ServerError, METHODS, request_body, parse_result, \
+    parse_error
+
+_CT = 'content-type'
+_AJ = 'application/json'
+_CE = 'content-encoding'
+_COMPRESSED_ENCODINGS = frozenset(['gzip', 'deflate'])
+_URL_SCHEME = frozenset(['http', 'https'])
+_DEFAULT_PORT = {'http': http.client.HTTP_PORT,
+                 'https': http.client.HTTPS_PORT}
+
+
+class AsyncWorkspaceService(object):
+    '''
+    url - the workspace service url.
+    timeout - the deadline in seconds for each call, covering the wait for a
+        free slot, connecting, sending and reading the response.
+    token - the auth token. Defaults to the KB_AUTH_TOKEN environment
+        variable. There is no user_id or password, and no auth config file
+        is read.
+    max_concurrency - the maximum number of calls in flight at once. Further
+        calls wait for a slot. Each call in flight uses one connection.
+    '''
+
+    def __init__(self, url=None, timeout=30 * 60, token=None,
+                 max_concurrency=64):
+        if url is None:
+            url = 'http://kbase.us/services/workspace/'
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme not in _URL_SCHEME:
+            raise ValueError(url + " isn't a valid http url")
+        self.url = url
+        self._host = parsed.hostname
+        self._port = parsed.port or _DEFAULT_PORT[parsed.scheme]
+        self._ssl = ssl.create_default_context() \
+            if parsed.scheme == 'https' else None
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        self.timeout = int(timeout)
+        if self.timeout < 1:
+            raise ValueError('Timeout value must be at least 1 second')
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        if token is None:
+            token = os.environ.get('KB_AUTH_TOKEN')
+        head = ('POST ' + path + ' HTTP/1.1\r\n' +
+                'Host: ' + parsed.netloc + '\r\n' +
+                _CT + ': ' + _AJ + '\r\n' +
+                'Accept-Encoding: gzip, deflate\r\n')
+        if token is not None:
+            head += 'AUTHORIZATION: ' + token + '\r\n'
+        self._head = head + 'Content-Length: '
+        self.max_concurrency = max_concurrency
+        # created on first use, so that it binds to the running loop
+        self._slots = None
+        self._idle = []    # idle (reader, writer) pairs
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        '''
+        Close all idle connections.
+        '''
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    async def _call(self, method, params):
+        '''
+        Call a workspaceService method with a list of positional params and
+        return its result. All RPC methods of this class go through here.
+        '''
+        body = request_body(method, params).encode('utf-8')
+        status, reason, headers, data = await asyncio.wait_for(
+            self._post(body), self.timeout)
+        if headers.get(_CE, '').lower() in _COMPRESSED_ENCODINGS:
+            # 32 + MAX_WBITS accepts either a gzip or a zlib header
+            data = zlib.decompress(data, 32 + zlib.MAX_WBITS)
+        if status != http.client.OK:
+            h = urllib.error.HTTPError(self.url, status, reason, headers,
+                                       io.BytesIO(data))
+            if headers.get(_CT) == _AJ:
+                se = parse_error(data.decode('utf-8'))
+                se.httpError = h
+                raise se
+            raise h
+        return parse_result(data.decode('utf-8'))
+
+    async def _post(self, body):
+        request = (self._head + str(len(body)) + '\r\n\r\n').encode(
+            'latin-1') + body
+        if self._slots is None:
+            self._slots = asyncio.BoundedSemaphore(self.max_concurrency)
+        async with self._slots:
+            for attempt in (0, 1):
+                reused = bool(self._idle)
+                if reused:
+                    reader, writer = self._idle.pop()
+                else:
+                    reader, writer = await asyncio.open_connection(
+                        self._host, self._port, ssl=self._ssl)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    resp = await _read_response(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # the server may have closed an idle connection, so
+                    # retry once on a fresh one
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    # including cancellation when the deadline passes
+                    writer.close()
+                    raise
+                status, reason, headers, data, keep_alive = resp
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status, reason, headers, data
+
+
+async def _read_response(reader):
+    # read one HTTP/1.x response and return its status, reason, headers,
+    # body and whether the connection may be reused
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError('Server closed the connection')
+    parts = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise http.client.BadStatusLine(line)
+    version, status = parts[0], int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ''
+    headlines = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        headlines.append(line)
+    headers = http.client.parse_headers(io.BytesIO(b''.join(headlines) +
+                                                   b'\r\n'))
+    keep_alive = (version == 'HTTP/1.1' and
+                  headers.get('connection', '').lower() != 'close')
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # skip any trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n',
+                                                        b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        data = b''.join(chunks)
+    elif headers.get('content-length') is not None:
+        data = await reader.readexactly(int(headers['content-length']))
+    else:
+        data = await reader.read()
+        keep_alive = False
+    return status, reason, headers, data, keep_alive
+
+
+def _rpc_method(name, nargs):
+    if nargs:
+        async def method(self, params):
+            return await self._call(name, [params])
+    else:
+        async def method(self):
+            return await self._call(name, [])
+    method.__name__ = name
+    method.__doc__ = 'Call workspaceService.' + name + '.'
+    return method
+
+for _name, _nargs in METHODS:
+    setattr(AsyncWorkspaceService, _name, _rpc_method(_name, _nargs))
@@ -0,0 +1,211 @@
+############################################################
+#
+# Bulk retrieval of objects for the workspaceService client.
+#
+# Splits a long list of objects into get_objects calls of bounded size,
+# made a few at a time in parallel, and lists of objects to look up into
+# get_objectmetas and has_objects calls made one at a time.
+#
+############################################################
+
+import itertools
+import Queue
+import re
+import sys
+import threading
+
+from .metrics import Call
+from .rpc import ServerError
+
+# the size of the first calls, made before anything is known of the objects'
+# sizes
+_FIRST_CHUNK = 8
+
+# the errors the service fails a call with when one of its objects is missing
+_MISSING = re.compile(r'\bobject\b.*\bnot found\b', re.IGNORECASE)
+
+
+def bulk_get_objects(client, refs, ordered=True, parallel=4, chunk_size=100,
+                     chunk_bytes=8 * 1024 * 1024, auth=None, asHash=False,
+                     asJSON=False):
+    '''
+    Yield (ref, object, error) for each of refs; see
+    workspaceService.bulk_get_objects.
+    '''
+    refs = list(refs)
+    if parallel < 1:
+        raise ValueError('parallel must be at least 1')
+    chunker = _Chunker(refs, chunk_size, chunk_bytes)
+    extra = {'asHash': asHash, 'asJSON': asJSON}
+    if auth is not None:
+        extra['auth'] = auth
+    done = Queue.Queue()
+    # bounds the chunks fetched but not yet yielded
+    slots = threading.Semaphore(parallel * 2)
+    stop = threading.Event()
+
+    def work():
+        try:
+            while True:
+                slots.acquire()
+                chunk = None if stop.is_set() else chunker.next()
+                if chunk is None:
+                    return
+                start, items = chunk
+                try:
+                    results = _fetch(client, 'get_objects', items, extra,
+                                     chunker)
+                except Exception:
+                    done.put((None, sys.exc_info()))
+                    return
+                done.put((start, results))
+        finally:
+            done.put(None)
+
+    workers = [threading.Thread(target=work,
+                                name='workspaceService-bulk-%d' % i)
+               for i in range(min(parallel, len(refs)))]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    try:
+        running = len(workers)
+        waiting = {}    # start index -> results, for ordered output
+        expect = 0
+        while running:
+            chunk = done.get()
+            if chunk is None:
+                running -= 1
+                continue
+            if chunk[0] is None:
+                error = chunk[1]
+                raise error[0], error[1], error[2]
+            if not ordered:
+                slots.release()
+                for result in chunk[1]:
+                    yield result
+                continue
+            waiting[chunk[0]] = chunk[1]
+            while expect in waiting:
+                results = waiting.pop(expect)
+                slots.release()
+                expect += len(results)
+                for result in results:
+                    yield result
+    finally:
+        # wake and stop the workers if the caller stops early
+        stop.set()
+        for _ in workers:
+            slots.release()
+
+
+class _Chunker(object):
+    # hands out the refs in chunks sized by the bytes per object seen so far
+
+    def __init__(self, refs, chunk_size, chunk_bytes):
+        self.refs = refs
+        self.chunk_size = chunk_size
+        self.chunk_bytes = chunk_bytes
+        self.pos = 0
+        self.objects = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        # the start index and refs of the next chunk, or None
+        with self._lock:
+            if self.pos >= len(self.refs):
+                return None
+            if self.objects:
+                size = self.chunk_bytes * self.objects // max(self.bytes, 1)
+            else:
+                size = _FIRST_CHUNK
+            size = max(1, min(size, self.chunk_size))
+            start = self.pos
+            self.pos += size
+            return start, self.refs[start:self.pos]
+
+    def measured(self, objects, nbytes):
+        with self._lock:
+            self.objects += objects
+            self.bytes += nbytes
+
+
+def iter_objectmetas(client, refs, chunk_size=1000, auth=None,
+                     asHash=False):
+    '''
+    Yield (ref, metadata, error) for each of refs; see
+    workspaceService.iter_get_objectmetas.
+    '''
+    extra = {'asHash': asHash}
+    if auth is not None:
+        extra['auth'] = auth
+    for chunk in _chunks(refs, chunk_size):
+        for result in _fetch(client, 'get_objectmetas', chunk, extra):
+            yield result
+
+
+def iter_has_objects(client, refs, chunk_size=1000, auth=None):
+    '''
+    Yield (ref, present) for each of refs; see
+    workspaceService.iter_has_objects.
+    '''
+    extra = {}
+    if auth is not None:
+        extra['auth'] = auth
+    for chunk in _chunks(refs, chunk_size):
+        present = client._call('has_objects', [_params(chunk, extra)])
+        for ref, exists in zip(chunk, present):
+            yield ref, bool(exists)
+
+
+def _chunks(refs, chunk_size):
+    # lists of up to chunk_size of refs, which may be any iterable
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    refs = iter(refs)
+    while True:
+        chunk = list(itertools.islice(refs, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _params(refs, extra):
+    # the params of a call for the objects in refs
+    params = dict(extra, ids=[], types=[], workspaces=[], instances=[])
+    for ref in refs:
+        if 'reference' in ref:
+            params['ids'].append(ref['reference'])
+            params['types'].append(ref.get('type', ''))
+            params['workspaces'].append('NO_WORKSPACE')
+        else:
+            params['ids'].append(ref['id'])
+            params['types'].append(ref['type'])
+            params['workspaces'].append(ref['workspace'])
+        params['instances'].append(ref.get('instance'))
+    return params
+
+
+def _fetch(client, method, refs, extra, chunker=None):
+    # (ref, result, error) for each ref. The service fails a whole call if
+    # any object can't be found, so a call that fails so is split in two
+    # until the objects at fault are found. Other errors from the service,
+    # e.g. a bad token, would fail every part alike, so are raised.
+    call = Call(method)
+    try:
+        results = client._call(method, [_params(refs, extra)], call)
+    except ServerError, e:
+        if not _MISSING.search(e.message):
+            raise
+        if len(refs) == 1:
+            return [(refs[0], None, e)]
+        half = len(refs) // 2
+        return (_fetch(client, method, refs[:half], extra, chunker) +
+                _fetch(client, method, refs[half:], extra, chunker))
+    except Exception, e:
+        # e.g. the server can't be reached, so all fail alike
+        return [(ref, None, e) for ref in refs]
+    if chunker is not None:
+        chunker.measured(len(refs), call.response_bytes)
+    return [(ref, result, None) for ref, result in zip(refs, results)]
@@ -0,0 +1,562 @@
+############################################################
+#
+# Client side caches for the workspaceService client.
+#
+############################################################
+
+try:
+    import json
+except ImportError:
+    import sys
+    sys.path.append('simplejson-2.3.3')
+    import simplejson as json
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .rpc import JSONObjectEncoder, encode, decode, parse_result
+
+_CHSUM = re.compile(r'^\w+$')
+
+
+class LRUCache(object):
+    '''
+    A thread safe map of keys to strings that drops the least recently used
+    entries once the strings total more than max_bytes.
+    '''
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class RefCache(object):
+    '''
+    Cache of get_object_by_ref and get_objectmeta_by_ref results. A
+    workspace_ref names one instance of an object forever, so its results
+    never need to be refetched.
+
+    Results are held as JSON text in an in-memory LRU of up to max_bytes,
+    and decoded afresh on each hit so callers may modify them freely. If a
+    directory is given, results are also written there and survive the
+    process: metadata under refs/, named by a hash of the call, and object
+    data under data/, named by its chsum, so data shared between refs is
+    stored once. The directory is not size bounded.
+
+    A client takes any object with the same get and put methods as its
+    ref_cache.
+    '''
+
+    METHODS = frozenset(['get_object_by_ref', 'get_objectmeta_by_ref'])
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, directory=None):
+        self._memory = LRUCache(max_bytes)
+        self.directory = directory
+        if directory is not None:
+            for sub in ('refs', 'data'):
+                path = os.path.join(directory, sub)
+                if not os.path.isdir(path):
+                    try:
+                        os.makedirs(path)
+                    except OSError:
+                        if not os.path.isdir(path):    # lost a race is ok
+                            raise
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, method, params):
+        '''
+        Return the cached result of a call, or None.
+        '''
+        key = _call_key(method, params)
+        text = self._memory.get(key)
+        if text is None and self.directory is not None:
+            text = self._read(method, params, key)
+            if text is not None:
+                self._memory.put(key, text)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if text is None else parse_result(text)
+
+    def put(self, method, params, result, text=None):
+        '''
+        Cache the result of a call. text, if given, is the JSON-RPC
+        response the result was decoded from.
+        '''
+        key = _call_key(method, params)
+        if text is None:
+            text = '{"result": [' + encode(result) + ']}'
+        self._memory.put(key, text)
+        if self.directory is not None:
+            self._write(method, params, key, result)
+
+    def clear(self):
+        '''
+        Empty the in-memory tier.
+        '''
+        self._memory.clear()
+
+    def _refpath(self, key):
+        return os.path.join(self.directory, 'refs',
+                            hashlib.sha1(key).hexdigest())
+
+    def _datapath(self, params, chsum):
+        # asJSON data is a JSON string rather than a structure, so is
+        # stored separately
+        return os.path.join(self.directory, 'data',
+                            chsum + ('.str' if params.get('asJSON') else ''))
+
+    def _read(self, method, params, key):
+        try:
+            with open(self._refpath(key)) as f:
+                meta = f.read()
+            if method == 'get_objectmeta_by_ref':
+                return '{"result": [' + meta + ']}'
+            chsum = _chsum(decode(meta))
+            if chsum is None:
+                return None
+            with open(self._datapath(params, chsum)) as f:
+                data = f.read()
+        except (IOError, ValueError):
+            return None
+        return '{"result": [{"data": ' + data + ', "metadata": ' + meta + \
+            '}]}'
+
+    def _write(self, method, params, key, result):
+        if method == 'get_objectmeta_by_ref':
+            meta = result
+        elif isinstance(result, dict):
+            meta = result.get('metadata')
+        else:
+            return
+        chsum = _chsum(meta)
+        if chsum is None:
+            return
+        try:
+            if method == 'get_object_by_ref':
+                datapath = self._datapath(params, chsum)
+                # content addressed, so an existing file is already right
+                if not os.path.exists(datapath):
+                    _write_file(datapath, encode(result['data']))
+            _write_file(self._refpath(key), encode(meta))
+        except (IOError, OSError):
+            pass    # the disk tier is best effort
+
+
+def _call_key(method, params):
+    # results depend on the reference and the output format flags only;
+    # refs are not permission checked, so the auth token doesn't matter
+    key = u'%s %s %d %d' % (method, params.get('reference'),
+                            bool(params.get('asHash')),
+                            bool(params.get('asJSON')))
+    return key.encode('utf-8')
+
+
+def _chsum(meta):
+    # the chsum from object_metadata as a tuple or a hash, if it is usable
+    # as a file name
+    if isinstance(meta, dict):
+        chsum = meta.get('chsum')
+    elif isinstance(meta, list) and len(meta) > 9:
+        chsum = meta[9]
+    else:
+        return None
+    if isinstance(chsum, basestring) and _CHSUM.match(chsum):
+        return str(chsum)
+    return None
+
+
+def _write_file(path, text):
+    # write atomically, so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.rename(tmp, path)
+    except:
+        os.unlink(tmp)
+        raise
+
+
+# The objects each write changes, as pairs of the params naming the
+# workspace and the object id
+_OBJECT_WRITES = {
+    'save_object': [('workspace', 'id')],
+    'delete_object': [('workspace', 'id')],
+    'delete_object_permanently': [('workspace', 'id')],
+    'revert_object': [('workspace', 'id')],
+    'copy_object': [('new_workspace', 'new_id')],
+    'move_object': [('source_workspace', 'source_id'),
+                    ('new_workspace', 'new_id')],
+}
+# The workspaces each write changes as a whole, as the param naming the
+# workspace and its default
+_WORKSPACE_WRITES = {
+    'create_workspace': [('workspace', None)],
+    'delete_workspace': [('workspace', None)],
+    'clone_workspace': [('new_workspace', None)],
+    'set_global_workspace_permissions': [('workspace', None)],
+    'set_workspace_permissions': [('workspace', None)],
+    'load_media_from_bio': [('mediaWS', 'KBaseMedia')],
+    'import_bio': [('bioWS', 'kbase')],
+    'import_map': [('mapWS', 'kbase')],
+}
+# Writes of many objects at once, as the param listing the params of each
+# and the write each is like
+_LIST_WRITES = {
+    'save_objects': ('objects', 'save_object'),
+}
+# Writes that may change anything
+_GLOBAL_WRITES = frozenset(['patch'])
+
+WRITES = frozenset(_OBJECT_WRITES) | frozenset(_WORKSPACE_WRITES) | \
+    frozenset(_LIST_WRITES) | _GLOBAL_WRITES
+
+_sorted_encode = JSONObjectEncoder(sort_keys=True).encode
+
+
+class MetadataCache(object):
+    '''
+    Cache of workspace and object metadata results, each kept for a time
+    to live in seconds set per method by ttls. Only the methods in ttls are
+    cached; by default get_workspacemeta, get_workspacepermissions,
+    get_objectmeta and has_object.
+
+    A client with a metadata_cache drops the entries affected by each
+    write it makes, e.g. a save_object drops the cached metadata of that
+    object and of its workspace. Changes made through other clients are
+    only seen once entries expire. At most max_entries are kept, dropping
+    the oldest first.
+
+    hits, misses and invalidations count cache use.
+    '''
+
+    DEFAULT_TTLS = {
+        'get_workspacemeta': 30,
+        'get_workspacepermissions': 30,
+        'get_objectmeta': 30,
+        'has_object': 30,
+    }
+
+    def __init__(self, ttls=None, max_entries=10000):
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()    # key -> (expiry, text, tags)
+        self._tagged = {}                # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, method, params, token=None):
+        '''
+        Return the cached result of a call made with an auth token, or
+        None.
+        '''
+        key = _metadata_key(method, params, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return decode(entry[1])
+
+    def put(self, method, params, result, token=None):
+        '''
+        Cache the result of a call made with an auth token.
+        '''
+        if not isinstance(params, dict):
+            return
+        key = _metadata_key(method, params, token)
+        ws = params.get('workspace')
+        tags = [('ws', ws)]
+        if method == 'get_workspacemeta':
+            # holds the workspace's object count
+            tags.append(('wsmeta', ws))
+        elif 'id' in params:
+            tags.append(('obj', ws, params['id']))
+        entry = (time.time() + self.ttls[method], encode(result), tags)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            while self._entries and len(self._entries) >= self.max_entries:
+                self._drop(next(iter(self._entries)))
+            self._entries[key] = entry
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+
+    def invalidate(self, method, params):
+        '''
+        Drop the entries a write call may have made stale.
+        '''
+        if method in _GLOBAL_WRITES or not isinstance(params, dict):
+            self.clear()
+            return
+        if method in _LIST_WRITES:
+            listparam, method = _LIST_WRITES[method]
+            items = params.get(listparam) or []
+        else:
+            items = [params]
+        tags = []
+        for wsparam, idparam in _OBJECT_WRITES.get(method, ()):
+            for item in items:
+                ws = item.get(wsparam)
+                tags.append(('obj', ws, item.get(idparam)))
+                tags.append(('wsmeta', ws))
+        for wsparam, default in _WORKSPACE_WRITES.get(method, ()):
+            tags.append(('ws', params.get(wsparam, default)))
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tagged.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tagged.clear()
+
+    def _drop(self, key):
+        # must be called with the lock held
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tagged[tag]
+
+
+def _metadata_key(method, params, token):
+    # the results of these calls depend on who asks
+    return method + ' ' + _sorted_encode([params, token])
+
+
+class TokenCache(object):
+    '''
+    Cache of the auth tokens got with a user_id and password, so that the
+    clients sharing it make one round trip to the auth service per user
+    rather than one each. Clients share one TokenCache per process unless
+    given their own.
+
+    A token is used until refresh_ahead seconds before it expires. If it is
+    used after that, a background thread gets a new one before it expires,
+    so calls don't wait. Tokens that say nothing of their expiry are taken
+    to last default_lifetime seconds.
+
+    If path is given, tokens are also kept in that file, which is locked
+    while it is read or written, so processes can share them. The file is
+    created readable by its owner only.
+    '''
+
+    # never use a token closer than this to its expiry, or refresh_ahead
+    # if less
+    _MARGIN = 60
+
+    def __init__(self, path=None, refresh_ahead=300, default_lifetime=3600):
+        self.path = path
+        self.refresh_ahead = refresh_ahead
+        self.default_lifetime = default_lifetime
+        self._margin = min(self._MARGIN, refresh_ahead)
+        self.fetches = 0
+        self._tokens = {}    # key -> [token, expiry, used since fetched]
+        self._timers = {}
+        self._fetching = {}    # key -> lock held while fetching
+        self._lock = threading.Lock()
+
+    def get(self, user_id, password, fetch):
+        '''
+        Return a token for user_id. If there is no usable token cached,
+        fetch(user_id, password) is called for one, and must return the
+        token and the time it expires, or None if unknown.
+        '''
+        key = _token_key(user_id, password)
+        token = self._cached(key)
+        if token is not None:
+            return token
+        with self._lock:
+            lock = self._fetching.setdefault(key, threading.Lock())
+        with lock:
+            # another thread may have fetched it meanwhile
+            token = self._cached(key)
+            if token is None:
+                token, expiry = self._load(key)
+                if token is None:
+                    token, expiry = self._fetch(key, user_id, password,
+                                                fetch)
+                self._store(key, token, expiry, user_id, password, fetch,
+                            True)
+            return token
+
+    def clear(self):
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._tokens.clear()
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None or entry[1] - self._margin <= time.time():
+                return None
+            entry[2] = True
+            return entry[0]
+
+    def _fetch(self, key, user_id, password, fetch):
+        token, expiry = fetch(user_id, password)
+        with self._lock:
+            self.fetches += 1
+        if expiry is None:
+            expiry = _token_expiry(token, self.default_lifetime)
+        self._save(key, token, expiry)
+        return token, expiry
+
+    def _store(self, key, token, expiry, user_id, password, fetch, used):
+        # cache the token and arrange its refresh
+        delay = max(expiry - self.refresh_ahead - time.time(), 0)
+        timer = threading.Timer(delay, self._refresh,
+                                (key, user_id, password, fetch))
+        timer.daemon = True
+        with self._lock:
+            old = self._timers.pop(key, None)
+            if old is not None:
+                old.cancel()
+            self._tokens[key] = [token, expiry, used]
+            self._timers[key] = timer
+        timer.start()
+
+    def _refresh(self, key, user_id, password, fetch):
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None or not entry[2]:
+                # not used lately; get a new one if it's used again
+                self._timers.pop(key, None)
+                return
+            lock = self._fetching.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                token, expiry = self._fetch(key, user_id, password, fetch)
+        except Exception:
+            # keep the old token while it lasts, and try again soon
+            delay = min(self._MARGIN, entry[1] - self._margin - time.time())
+            if delay <= 0:
+                return
+            timer = threading.Timer(delay, self._refresh,
+                                    (key, user_id, password, fetch))
+            timer.daemon = True
+            with self._lock:
+                self._timers[key] = timer
+            timer.start()
+            return
+        self._store(key, token, expiry, user_id, password, fetch, False)
+
+    def _load(self, key):
+        # a usable token from the file, or (None, None)
+        if self.path is None:
+            return None, None
+        try:
+            tokens = _locked_update(self.path, None)
+        except (IOError, OSError):
+            return None, None
+        token, expiry = tokens.get(key, (None, None))
+        if token is None or expiry - self.refresh_ahead <= time.time():
+            return None, None
+        return token, expiry
+
+    def _save(self, key, token, expiry):
+        if self.path is None:
+            return
+
+        def update(tokens):
+            now = time.time()
+            for k in [k for k, v in tokens.iteritems() if v[1] <= now]:
+                del tokens[k]
+            tokens[key] = [token, expiry]
+        try:
+            _locked_update(self.path, update)
+        except (IOError, OSError):
+            pass    # the file is best effort
+
+
+def _token_key(user_id, password):
+    # don't keep the password itself as a key
+    return hashlib.sha256(
+        (user_id + u'\0' + password).encode('utf-8')).hexdigest()
+
+
+def _token_expiry(token, default_lifetime):
+    # KBase tokens are |-separated fields, one of them expiry=<epoch secs>
+    for field in token.split('|'):
+        if field.startswith('expiry='):
+            try:
+                return float(field[7:])
+            except ValueError:
+                break
+    return time.time() + default_lifetime
+
+
+def _locked_update(path, update):
+    # read the JSON object in the file, applying update to it and writing
+    # it back if given, under an exclusive lock
+    import fcntl
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0600)
+    with os.fdopen(fd, 'r+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        text = f.read()
+        try:
+            data = json.loads(text) if text else {}
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        if update is not None:
+            update(data)
+            f.seek(0)
+            f.truncate()
+            f.write(encode(data))
+    return data
+
+
+# shared by clients not given a token_cache
+DEFAULT_TOKEN_CACHE = TokenCache()
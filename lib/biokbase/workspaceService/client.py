@@ -17,19 +17,35 @@ except ImportError:
     sys.path.append('simplejson-2.3.3')
     import simplejson as json
 
-import urllib2
 import httplib
-import urlparse
-import random
-import base64
-import httplib2
-from urllib2 import URLError, HTTPError
-from ConfigParser import ConfigParser
+import socket
+import threading
+import Queue
+import time
 import os
+from .pool import ConnectionPool
+from .cache import RefCache, WRITES, DEFAULT_TOKEN_CACHE
+from .rpc import (ServerError, JSONObjectEncoder, METHODS, encode,
+                  request_envelope, request_body, parse_result, parse_error)
+from .stream import (iter_result, iter_request, iter_json, gzip_chunks,
+                     CountingReader, InflatingReader)
+from .metrics import Call, Metrics
+from .retry import RetryPolicy, IDEMPOTENT, UNAVAILABLE
+from .endpoints import Endpoints
+from . import bulk
+from .coalesce import SingleFlight
+from .writer import BufferedSaver
 
 _CT = 'content-type'
 _AJ = 'application/json'
-_URL_SCHEME = frozenset(['http', 'https'])
+_AE = 'accept-encoding'
+_CE = 'content-encoding'
+_COMPRESSED_ENCODINGS = frozenset(['gzip', 'deflate'])
+# the calls a method must have had before its latency is trusted for hedging
+_HEDGE_MIN_CALLS = 20
+# methods whose data the server will gunzip if the compressed flag is set
+_COMPRESSIBLE = frozenset(['save_object', 'save_objects',
+                           'save_object_by_ref'])
 
 
 def _get_token(user_id, password,
@@ -37,6 +53,10 @@ def _get_token(user_id, password,
                         'grant_type=client_credentials'):
     # This is bandaid helper function until we get a full
     # KBase python auth client released
+    # Returns the token and the time it expires, or None if unknown.
+    # imported here as they are slow to load and rarely needed
+    import base64
+    import httplib2
     h = httplib2.Http(disable_ssl_certificate_validation=True)
 
     auth = base64.encodestring(user_id + ':' + password)
@@ -56,11 +76,16 @@ def _get_token(user_id, password,
     else:
         raise Exception(str(resp))
 
-    return tok['access_token']
+    expiry = None
+    if tok.get('expires_in') is not None:
+        expiry = time.time() + float(tok['expires_in'])
+    return tok['access_token'], expiry
 
 
-def _read_rcfile(file=os.environ['HOME'] + '/.authrc'):  # @ReservedAssignment
+def _read_rcfile(file=None):  # @ReservedAssignment
     # Another bandaid to read in the ~/.authrc file if one is present
+    if file is None:
+        file = os.path.expanduser('~/.authrc')  # @ReservedAssignment
     authdata = None
     if os.path.exists(file):
         try:
@@ -75,12 +100,14 @@ def _read_rcfile(file=os.environ['HOME'] + '/.authrc'):  # @ReservedAssignment
     return authdata
 
 
-def _read_inifile(file=os.environ.get(  # @ReservedAssignment
-                      'KB_DEPLOYMENT_CONFIG', os.environ['HOME'] +
-                      '/.kbase_config')):
+def _read_inifile(file=None):  # @ReservedAssignment
     # Another bandaid to read in the ~/.kbase_config file if one is present
+    if file is None:
+        file = os.environ.get(  # @ReservedAssignment
+            'KB_DEPLOYMENT_CONFIG', os.path.expanduser('~/.kbase_config'))
     authdata = None
     if os.path.exists(file):
+        from ConfigParser import ConfigParser
         try:
             config = ConfigParser()
             config.read(file)
@@ -95,1284 +122,622 @@ def _read_inifile(file=os.environ.get(  # @ReservedAssignment
     return authdata
 
 
-class ServerError(Exception):
-
-    def __init__(self, name, code, message, data=None, error=None):
-        self.name = name
-        self.code = code
-        self.message = '' if message is None else message
-        self.data = data or error or ''
-        # data = JSON RPC 2.0, error = 1.1
-
-    def __str__(self):
-        return self.name + ': ' + str(self.code) + '. ' + self.message + \
-            '\n' + self.data
-
-
-class JSONObjectEncoder(json.JSONEncoder):
-
-    def default(self, obj):
-        if isinstance(obj, set):
-            return list(obj)
-        if isinstance(obj, frozenset):
-            return list(obj)
-        return json.JSONEncoder.default(self, obj)
+def _find_auth(token, user_id, password, ignore_authrc):
+    # Returns the token, or the user_id and password to get one with
+    # token overrides user_id and password
+    if token is not None:
+        return token, None
+    elif user_id is not None and password is not None:
+        return None, (user_id, password)
+    elif 'KB_AUTH_TOKEN' in os.environ:
+        return os.environ.get('KB_AUTH_TOKEN'), None
+    elif not ignore_authrc:
+        authdata = _read_inifile()
+        if authdata is None:
+            authdata = _read_rcfile()
+        if authdata is not None:
+            if authdata.get('token') is not None:
+                return authdata['token'], None
+            elif(authdata.get('user_id') is not None
+                 and authdata.get('password') is not None):
+                return None, (authdata['user_id'], authdata['password'])
+    return None, None
 
 
 class workspaceService(object):
+    '''
+    url - the workspace service url, or a list of the urls of replicas of
+        the service sharing one database. Each request goes to the replica
+        expected to answer soonest; see endpoints.Endpoints. An Endpoints
+        may also be given, to choose between replicas with other settings.
+    pool - a ConnectionPool to share with other clients. If not given, the
+        client makes its own with pool_size, pool_maxperhost and
+        pool_idle_timeout; see ConnectionPool. Connections go through the
+        proxies in the http_proxy and https_proxy environment variables,
+        except to hosts in no_proxy.
+    compress_threshold - if set, the data of save_object, save_objects and
+        save_object_by_ref calls is gzipped, and the compressed flag set,
+        when its JSON is at least this many bytes.
+    compress_level - the gzip level, from 1 (fastest) to 9 (smallest).
+    accept_compressed - ask the server to gzip or deflate large responses.
+    ref_cache - a RefCache for get_object_by_ref and get_objectmeta_by_ref
+        results. Cache hits make no call to the server.
+    metadata_cache - a MetadataCache for workspace and object metadata
+        results. Writes made through this client drop the entries they
+        affect.
+    token_cache - the TokenCache for tokens got with a user_id and password.
+        Defaults to one shared by all clients in the process.
+    metrics - the Metrics to record calls to the server in, which may be
+        shared with other clients. If not given, the client keeps its own.
+    on_call - a function called with a metrics.Call describing each call to
+        the server once it ends.
+    retry - the RetryPolicy for failed calls. Defaults to retrying read only
+        methods only; pass False to never retry. stream_save_object calls
+        are never retried, nor iter_get_objects calls once they have
+        yielded an object.
+    hedge - if set, a quantile such as 0.95. A call to a read only method
+        that has not been answered within that quantile of the method's
+        latency so far is also sent to a second replica, and whichever
+        answer comes first is used.
+    single_flight - the SingleFlight that lets identical read only calls
+        made at once share one request. May be shared with other clients;
+        if not given, the client has its own. Pass False to turn sharing
+        off.
+
+    The auth token is found on the first call rather than when the client
+    is made, so errors getting it, e.g. a bad user_id and password, are
+    raised then.
+    '''
 
     def __init__(self, url=None, timeout=30 * 60, user_id=None,
-                 password=None, token=None, ignore_authrc=False):
+                 password=None, token=None, ignore_authrc=False,
+                 pool=None, pool_size=10, pool_maxperhost=None,
+                 pool_idle_timeout=60, compress_threshold=None,
+                 compress_level=6, accept_compressed=True,
+                 ref_cache=None, metadata_cache=None, token_cache=None,
+                 metrics=None, on_call=None, retry=None, hedge=None,
+                 single_flight=None):
         if url is None:
             url = 'http://kbase.us/services/workspace/'
-        scheme, _, _, _, _, _ = urlparse.urlparse(url)
-        if scheme not in _URL_SCHEME:
-            raise ValueError(url + " isn't a valid http url")
-        self.url = url
+        if not isinstance(url, Endpoints):
+            url = Endpoints(url)
+        self._endpoints = url
+        self.url = self._endpoints.endpoints[0].url
+        # a pool may be passed in to share connections between clients
+        if pool is None:
+            pool = ConnectionPool(pool_size, pool_maxperhost,
+                                  pool_idle_timeout)
+        self._pool = pool
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.ref_cache = ref_cache
+        self.metadata_cache = metadata_cache
+        if metrics is None:
+            metrics = Metrics()
+        self.metrics = metrics
+        self.on_call = on_call
+        if retry is None:
+            retry = RetryPolicy()
+        self.retry = retry
+        self.hedge = hedge
+        if single_flight is None:
+            single_flight = SingleFlight()
+        self.single_flight = single_flight
         self.timeout = int(timeout)
-        self._headers = dict()
-        # token overrides user_id and password
-        if token is not None:
-            self._headers['AUTHORIZATION'] = token
-        elif user_id is not None and password is not None:
-            self._headers['AUTHORIZATION'] = _get_token(user_id, password)
-        elif 'KB_AUTH_TOKEN' in os.environ:
-            self._headers['AUTHORIZATION'] = os.environ.get('KB_AUTH_TOKEN')
-        elif not ignore_authrc:
-            authdata = _read_inifile()
-            if authdata is None:
-                authdata = _read_rcfile()
-            if authdata is not None:
-                if authdata.get('token') is not None:
-                    self._headers['AUTHORIZATION'] = authdata['token']
-                elif(authdata.get('user_id') is not None
-                     and authdata.get('password') is not None):
-                    self._headers['AUTHORIZATION'] = _get_token(
-                        authdata['user_id'], authdata['password'])
+        self._headers = {_CT: _AJ}
+        if accept_compressed:
+            self._headers[_AE] = 'gzip, deflate'
+        # the token is looked up on the first call, as it may mean reading
+        # config files or a round trip to the auth service
+        self._auth = (token, user_id, password, ignore_authrc)
+        self._credentials = None
+        if token_cache is None:
+            token_cache = DEFAULT_TOKEN_CACHE
+        self.token_cache = token_cache
+        self._auth_lock = threading.Lock()
         if self.timeout < 1:
             raise ValueError('Timeout value must be at least 1 second')
 
-    def load_media_from_bio(self, params):
-
-        arg_hash = {'method': 'workspaceService.load_media_from_bio',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def import_bio(self, params):
-
-        arg_hash = {'method': 'workspaceService.import_bio',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def import_map(self, params):
-
-        arg_hash = {'method': 'workspaceService.import_map',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def save_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.save_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def delete_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.delete_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def delete_object_permanently(self, params):
-
-        arg_hash = {'method': 'workspaceService.delete_object_permanently',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_objects(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_objects',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_object_by_ref(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_object_by_ref',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def save_object_by_ref(self, params):
-
-        arg_hash = {'method': 'workspaceService.save_object_by_ref',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_objectmeta(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_objectmeta',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_objectmeta_by_ref(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_objectmeta_by_ref',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def revert_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.revert_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def copy_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.copy_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def move_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.move_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def has_object(self, params):
-
-        arg_hash = {'method': 'workspaceService.has_object',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def object_history(self, params):
-
-        arg_hash = {'method': 'workspaceService.object_history',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def create_workspace(self, params):
-
-        arg_hash = {'method': 'workspaceService.create_workspace',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_workspacemeta(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_workspacemeta',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_workspacepermissions(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_workspacepermissions',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def delete_workspace(self, params):
-
-        arg_hash = {'method': 'workspaceService.delete_workspace',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def clone_workspace(self, params):
-
-        arg_hash = {'method': 'workspaceService.clone_workspace',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def list_workspaces(self, params):
-
-        arg_hash = {'method': 'workspaceService.list_workspaces',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def list_workspace_objects(self, params):
-
-        arg_hash = {'method': 'workspaceService.list_workspace_objects',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def set_global_workspace_permissions(self, params):
-
-        arg_hash = {'method': 'workspaceService.set_global_workspace_permissions',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def set_workspace_permissions(self, params):
-
-        arg_hash = {'method': 'workspaceService.set_workspace_permissions',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_user_settings(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_user_settings',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def set_user_settings(self, params):
-
-        arg_hash = {'method': 'workspaceService.set_user_settings',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def queue_job(self, params):
-
-        arg_hash = {'method': 'workspaceService.queue_job',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def set_job_status(self, params):
-
-        arg_hash = {'method': 'workspaceService.set_job_status',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_jobs(self, params):
-
-        arg_hash = {'method': 'workspaceService.get_jobs',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def get_types(self):
-
-        arg_hash = {'method': 'workspaceService.get_types',
-                    'params': [],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def add_type(self, params):
-
-        arg_hash = {'method': 'workspaceService.add_type',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def remove_type(self, params):
-
-        arg_hash = {'method': 'workspaceService.remove_type',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
-
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
-
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
-
-    def patch(self, params):
-
-        arg_hash = {'method': 'workspaceService.patch',
-                    'params': [params],
-                    'version': '1.1',
-                    'id': str(random.random())[2:]
-                    }
+    def _token(self):
+        '''
+        Return the auth token, or None if there is none, looking it up on
+        first use.
+        '''
+        if self._auth is not None:
+            with self._auth_lock:
+                if self._auth is not None:
+                    token, self._credentials = _find_auth(*self._auth)
+                    if token is not None:
+                        self._headers['AUTHORIZATION'] = token
+                    self._auth = None
+        if self._credentials is not None:
+            # the cache renews the token as it expires
+            self._headers['AUTHORIZATION'] = self.token_cache.get(
+                self._credentials[0], self._credentials[1], _get_token)
+        return self._headers.get('AUTHORIZATION')
+
+    def close(self):
+        '''
+        Close any idle pooled connections held by this client.
+        '''
+        self._pool.clear()
+
+    def iter_get_objects(self, params):
+        '''
+        Like get_objects, but returns an iterator that decodes and yields
+        each object as it arrives rather than the whole list at once. The
+        request is sent when iteration starts, and the connection is held
+        until the iterator is exhausted or closed.
+        '''
+        return self._call_iter('get_objects', [params])
+
+    def bulk_get_objects(self, refs, ordered=True, parallel=4,
+                         chunk_size=100, chunk_bytes=8 * 1024 * 1024,
+                         auth=None, asHash=False, asJSON=False):
+        '''
+        Get any number of objects with get_objects calls of bounded size,
+        up to parallel of them at a time, and return an iterator of a
+        (ref, object, error) tuple for each of refs. object is as
+        get_object returns it, or None if the object couldn't be got, in
+        which case error is the exception raised.
+
+        refs - dicts of the id, type, workspace and optionally instance of
+            each object, as for get_object, or of its workspace_ref as
+            reference.
+        ordered - yield the results in the order of refs. Otherwise they
+            are yielded as they arrive.
+        chunk_size, chunk_bytes - each call asks for at most chunk_size
+            objects, and once some have been got, as many as are expected
+            to make a response of about chunk_bytes, compressed if it is.
+        auth, asHash, asJSON - as for get_objects.
+
+        If a call fails because some of the objects in it can't be found, it
+        is split up until they are, and the others are returned. An error
+        from the service that is not about a missing object, e.g. a bad
+        token or lack of permission, is raised.
+        '''
+        return bulk.bulk_get_objects(self, refs, ordered, parallel,
+                                     chunk_size, chunk_bytes, auth, asHash,
+                                     asJSON)
+
+    def iter_get_objectmetas(self, refs, chunk_size=1000, auth=None,
+                             asHash=False):
+        '''
+        Get the metadata of any number of objects with get_objectmetas calls
+        of at most chunk_size objects, and return an iterator of a
+        (ref, metadata, error) tuple for each of refs, in order. metadata is
+        None if it couldn't be got, in which case error is the exception
+        raised. Errors not about a missing object are raised, as for
+        bulk_get_objects.
+
+        refs - an iterable of dicts as for bulk_get_objects. It is read a
+            chunk at a time, so may be a generator of any length.
+        auth, asHash - as for get_objectmetas.
+        '''
+        return bulk.iter_objectmetas(self, refs, chunk_size, auth, asHash)
+
+    def iter_has_objects(self, refs, chunk_size=1000, auth=None):
+        '''
+        Check any number of objects exist with has_objects calls of at most
+        chunk_size objects, and return an iterator of a (ref, present) tuple
+        for each of refs, in order. refs are as for iter_get_objectmetas.
+        '''
+        return bulk.iter_has_objects(self, refs, chunk_size, auth)
+
+    def stream_save_object(self, params):
+        '''
+        Like save_object, but sends the request in chunks as it is encoded
+        rather than building it in memory first. params['data'] may also be
+        a file like object, or an iterator of strings, that supplies the
+        JSON text of the data in pieces.
+        '''
+        return self._call_chunked('save_object', [params])
+
+    def stream_save_object_by_ref(self, params):
+        '''
+        Like save_object_by_ref, but streams the request as
+        stream_save_object does.
+        '''
+        return self._call_chunked('save_object_by_ref', [params])
+
+    def buffered_saver(self, workers=4, max_queue=1000,
+                       method='save_object', batch_size=100):
+        '''
+        Return a BufferedSaver that saves objects in the background with
+        this client, for use as a context manager:
+
+            with client.buffered_saver() as saver:
+                futures = [saver.save(params) for params in objects]
+
+        Every save has finished, and any error raised, when the block ends.
+        Saves waiting together are made with save_objects calls of up to
+        batch_size objects. method may also be 'save_object_by_ref', whose
+        saves are made one at a time.
+        '''
+        return BufferedSaver(self, workers, max_queue, method, batch_size)
+
+    def _open(self, body, call, endpoint=None):
+        # POST the body to an endpoint, by default the one expected to
+        # answer soonest, and return the connection and the response, whose
+        # body has not yet been read.
+        self._token()
+        if endpoint is None:
+            endpoint = self._endpoints.choose()
+        start = time.time()
+        try:
+            conn, resp = self._send(endpoint, body, call)
+        except (httplib.HTTPException, socket.error):
+            self._endpoints.failed(endpoint)
+            raise
+        except:
+            self._endpoints.abandoned(endpoint)
+            raise
+        if resp.status in UNAVAILABLE:
+            self._endpoints.failed(endpoint)
+        else:
+            self._endpoints.answered(endpoint, time.time() - start)
+        return conn, resp
+
+    def _send(self, endpoint, body, call):
+        # POST the body over a pooled keep-alive connection.
+        # The body is a string, or an iterator of strings that is sent with
+        # chunked transfer encoding. An iterator can't be replayed, so it is
+        # only sent over a new connection.
+        chunked = not isinstance(body, str)
+        for attempt in (0, 1):
+            conn = self._pool.acquire(endpoint.scheme, endpoint.host,
+                                      endpoint.port, self.timeout,
+                                      fresh=chunked)
+            sent = False
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                call.lap('connect')
+                path = endpoint.path
+                if conn.absolute_uri:
+                    path = '%s://%s:%d%s' % (endpoint.scheme, endpoint.host,
+                                             endpoint.port, endpoint.path)
+                headers = self._headers
+                if conn.proxy_headers:
+                    headers = dict(headers, **conn.proxy_headers)
+                if chunked:
+                    conn.putrequest('POST', path,
+                                    skip_accept_encoding=_AE in headers)
+                    for header, value in headers.iteritems():
+                        conn.putheader(header, value)
+                    conn.putheader('Transfer-Encoding', 'chunked')
+                    conn.endheaders()
+                    for chunk in body:
+                        conn.send('%x\r\n%s\r\n' % (len(chunk), chunk))
+                        call.request_bytes += len(chunk)
+                    conn.send('0\r\n\r\n')
+                else:
+                    conn.request('POST', path, body, headers)
+                    call.request_bytes = len(body)
+                sent = True
+                call.lap('send')
+                resp = conn.getresponse()
+                call.lap('wait')
+                return conn, resp
+            except socket.timeout:
+                self._pool.release(conn, False)
+                raise
+            except (httplib.HTTPException, socket.error):
+                self._pool.release(conn, False)
+                # the server may have closed an idle connection, so retry
+                # once on a fresh one. Once the whole request is sent the
+                # server may have carried it out, so then only calls that
+                # are safe to repeat are retried.
+                if (conn.reused and attempt == 0 and
+                        (not sent or self._repeatable(call.method))):
+                    call.retries += 1
+                    continue
+                raise
+            except:
+                # e.g. an error from the data being streamed
+                self._pool.release(conn, False)
+                raise
+
+    def _repeatable(self, method):
+        # whether a call may be sent again if it may have been carried out
+        return method in IDEMPOTENT or bool(
+            self.retry and self.retry.allows(method))
+
+    def _post(self, body, call, endpoint=None):
+        # POST the body and return the response and its fully read body
+        conn, resp = self._open(body, call, endpoint)
+        try:
+            reader, counted = self._reader(resp)
+            data = reader.read()
+        except:
+            self._pool.release(conn, False)
+            raise
+        call.response_bytes = counted.count
+        self._pool.release(conn, not resp.will_close)
+        return resp, data
+
+    def _reader(self, resp):
+        # the response body, inflated as it is read if the server
+        # compressed it, and the reader counting the bytes received
+        counted = CountingReader(resp)
+        if resp.getheader(_CE, '').lower() in _COMPRESSED_ENCODINGS:
+            return InflatingReader(counted), counted
+        return counted, counted
+
+    def _finish(self, call, error=None):
+        # record a call once it is over
+        call.end()
+        call.error = error
+        self.metrics.record(call)
+        if self.on_call is not None:
+            self.on_call(call)
+
+    def _raise_error(self, resp, data):
+        from urllib2 import HTTPError
+        from StringIO import StringIO
+        h = HTTPError(self.url, resp.status, resp.reason, resp.msg,
+                      StringIO(data))
+        if resp.getheader(_CT) == _AJ:
+            se = parse_error(data)
+            se.httpError = h
+            raise se
+        raise h
+
+    def _call(self, method, params, call=None):
+        '''
+        Call a workspaceService method with a list of positional params and
+        return its result. All RPC methods of this class go through here.
+        call, if given, is the metrics.Call to measure the call with.
+        '''
+        cache = self.ref_cache if method in RefCache.METHODS else None
+        if cache is not None:
+            result = cache.get(method, params[0])
+            if result is not None:
+                return result
+        mcache = self.metadata_cache
+        if mcache is not None and method in mcache.ttls:
+            # metadata depends on who asks
+            token = self._token()
+            result = mcache.get(method, params[0], token)
+            if result is not None:
+                return result
+        else:
+            mcache = None
+        if call is None:
+            call = Call(method)
+        try:
+            body = text = None
+            if (self.compress_threshold is not None and
+                    method in _COMPRESSIBLE):
+                body = self._compressed_request(method, params[0])
+            if body is None:
+                prefix, suffix = request_envelope(method)
+                text = encode(params)
+                body = prefix + text + suffix
+
+            if self.hedge and method in IDEMPOTENT:
+                send = lambda: self._hedged(method, body, call)
+            else:
+                send = lambda: self._request(body, call)
+            try:
+                if self.single_flight and method in IDEMPOTENT:
+                    # the result depends on who asks
+                    key = (method, text, self._token())
+                    data = self.single_flight.do(
+                        key, lambda: self._retrying(method, send, call), call)
+                else:
+                    data = self._retrying(method, send, call)
+            finally:
+                self._wrote(method, params)
+            result = parse_result(data)
+            call.lap('decode')
+        except Exception, e:
+            self._finish(call, e)
+            raise
+        self._finish(call)
+        if cache is not None:
+            cache.put(method, params[0], result, data)
+        if mcache is not None:
+            mcache.put(method, params[0], result, token)
+        return result
+
+    def _request(self, body, call, endpoint=None):
+        # POST the body and return the body of a successful response
+        resp, data = self._post(body, call, endpoint)
+        if resp.status != httplib.OK:
+            self._raise_error(resp, data)
+        return data
+
+    def _hedged(self, method, body, call):
+        # as _request, but if no answer comes within the hedge quantile of
+        # the method's latency, also send the request to another endpoint
+        # and take whichever answer comes first
+        delay = self.metrics.quantile(method, self.hedge,
+                                      min_count=_HEDGE_MIN_CALLS)
+        first = self._endpoints.choose()
+        if delay is None:
+            return self._request(body, call, first)
+        answers = Queue.Queue()
+
+        def attempt(endpoint):
+            # each attempt is measured on its own, and the call takes the
+            # measurements of the attempt whose answer is used
+            sub = Call(method)
+            try:
+                answers.put((sub, self._request(body, sub, endpoint), None))
+            except Exception, e:
+                answers.put((sub, None, e))
+        _start_thread(attempt, first)
+        try:
+            sub, data, error = answers.get(timeout=delay)
+            sent = 1
+        except Queue.Empty:
+            second = self._endpoints.choose(exclude=first)
+            sent = 1
+            if second is not None:
+                _start_thread(attempt, second)
+                sent = 2
+                call.hedged = True
+            sub, data, error = answers.get()
+        if error is not None and sent == 2:
+            # the other may yet succeed
+            sub, data, error = answers.get()
+        call.absorb(sub)
+        if error is not None:
+            raise error
+        return data
+
+    def _retrying(self, method, send, call):
+        # return send(), retrying it as the retry policy allows
+        if self.retry and self.retry.allows(method):
+            return self.retry.run(send, call)
+        return send()
+
+    def _wrote(self, method, params):
+        # drop cached metadata a write may have changed. Done whether or not
+        # the call succeeded, as a failed call may have changed something.
+        if self.metadata_cache is not None and method in WRITES:
+            self.metadata_cache.invalidate(method, params[0])
+
+    def _compressed_request(self, method, params):
+        # Build the request with the data gzipped where it is large enough,
+        # or return None if it should be encoded as usual
+        prefix, suffix = request_envelope(method)
+        if method != 'save_objects':
+            text = self._compressed_params(params)
+            if text is None:
+                return None
+            return prefix + '[' + text + ']' + suffix
+        if not isinstance(params, dict) or not isinstance(
+                params.get('objects'), list):
+            return None
+        texts = [self._compressed_params(obj) for obj in params['objects']]
+        if not any(texts):
+            return None
+        parts = ['"objects": [' + ', '.join(
+            text or encode(obj)
+            for text, obj in zip(texts, params['objects'])) + ']']
+        for key, value in params.iteritems():
+            if key != 'objects':
+                parts.append(encode(key) + ': ' + encode(value))
+        return prefix + '[{' + ', '.join(parts) + '}]' + suffix
+
+    def _compressed_params(self, params):
+        # The JSON text of the params of one save, with the data gzipped if
+        # it is large enough, or None if they should be encoded as usual
+        if (not isinstance(params, dict) or 'data' not in params or
+                params.get('compressed') or params.get('retrieveFromURL')):
+            return None
+        data = params['data']
+        threshold = self.compress_threshold
+        if params.get('json'):
+            # the data is already JSON text. The server decodes it as bytes,
+            # so only ASCII text can be compressed safely.
+            if isinstance(data, unicode):
+                try:
+                    data = data.encode('ascii')
+                except UnicodeError:
+                    return None
+            if not isinstance(data, str) or len(data) < threshold:
+                return None
+            gz, text = gzip_chunks([data], threshold, self.compress_level)
+        else:
+            gz, text = gzip_chunks(iter_json(data), threshold,
+                                   self.compress_level)
+        params = dict(params)
+        del params['data']
+        if gz is None:
+            # the data is too small to compress, but has been encoded to
+            # find out, so is sent as that text rather than encoded again
+            if not params:
+                return '{"data": ' + text + '}'
+            return '{"data": ' + text + ', ' + encode(params)[1:]
+        params['compressed'] = 1
+        params['json'] = 1
+        # The gzipped bytes travel as a string of the characters with the
+        # same codes, which the server's gunzip sees as the original bytes.
+        # Sending the string as UTF-8 rather than with \u00XX escapes keeps it
+        # to about 1.5 times the gzipped size.
+        gz = json.dumps(gz.decode('latin-1'), ensure_ascii=False)
+        return '{"data": ' + gz.encode('utf-8') + ', ' + encode(params)[1:]
+
+    def _call_chunked(self, method, params):
+        # as _call, but streams the request
+        call = Call(method)
+        try:
+            try:
+                resp, data = self._post(iter_request(method, params), call)
+            finally:
+                self._wrote(method, params)
+            if resp.status != httplib.OK:
+                self._raise_error(resp, data)
+            result = parse_result(data)
+            call.lap('decode')
+        except Exception, e:
+            self._finish(call, e)
+            raise
+        self._finish(call)
+        return result
+
+    def _call_iter(self, method, params):
+        # as _call, for methods returning a list, but yields the list's
+        # elements as they are decoded from the response. Time spent by the
+        # caller between elements counts as decoding.
+        call = Call(method)
+        conn = counted = None
+        done = False
+        error = None
+        body = request_body(method, params)
+
+        def send():
+            conn, resp = self._open(body, call)
+            reader, counted = self._reader(resp)
+            if resp.status != httplib.OK:
+                try:
+                    data = reader.read()
+                except:
+                    self._pool.release(conn, False)
+                    raise
+                self._pool.release(conn, not resp.will_close)
+                self._raise_error(resp, data)
+            return conn, resp, reader, counted
+        try:
+            conn, resp, reader, counted = self._retrying(method, send, call)
+            for item in iter_result(reader):
+                yield item
+            reader.read()
+            done = True
+        except Exception, e:
+            error = e
+            raise
+        finally:
+            if conn is not None:
+                # a partly read response leaves the connection unusable
+                self._pool.release(conn, done and not resp.will_close)
+            if counted is not None:
+                call.response_bytes = counted.count
+            call.lap('decode')
+            self._finish(call, error)
+
+
+def _start_thread(target, *args):
+    thread = threading.Thread(target=target, args=args,
+                              name='workspaceService-hedge')
+    thread.daemon = True
+    thread.start()
+
+
+def _rpc_method(name, nargs):
+    if nargs:
+        def method(self, params):
+            return self._call(name, [params])
+    else:
+        def method(self):
+            return self._call(name, [])
+    method.__name__ = name
+    method.__doc__ = 'Call workspaceService.' + name + '.'
+    return method
 
-        body = json.dumps(arg_hash, cls=JSONObjectEncoder)
-        try:
-            request = urllib2.Request(self.url, body, self._headers)
-            ret = urllib2.urlopen(request, timeout=self.timeout)
-        except HTTPError as h:
-            if _CT in h.headers and h.headers[_CT] == _AJ:
-                b = h.read()
-                err = json.loads(b)
-                if 'error' in err:
-                    raise ServerError(**err['error'])
-                else:            # this should never happen... but if it does
-                    se = ServerError('Unknown', 0, b)
-                    se.httpError = h
-                    # h.read() will return '' in the calling code.
-                    raise se
-            else:
-                raise h
-        if ret.code != httplib.OK:
-            raise URLError('Received bad response code from server:' +
-                           ret.code)
-        resp = json.loads(ret.read())
 
-        if 'result' in resp:
-            return resp['result'][0]
-        else:
-            raise ServerError('Unknown', 0, 'An unknown server error occurred')
+for _name, _nargs in METHODS:
+    setattr(workspaceService, _name, _rpc_method(_name, _nargs))
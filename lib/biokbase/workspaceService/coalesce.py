@@ -0,0 +1,68 @@
+############################################################
+#
+# Coalescing of identical concurrent calls for the workspaceService
+# client.
+#
+############################################################
+
+import sys
+import threading
+
+
+class SingleFlight(object):
+    '''
+    Lets identical calls made at the same time share one request to the
+    server: a call made while an identical one is in flight waits for it
+    and gets its response rather than sending its own. Each caller decodes
+    the shared response itself, so gets its own copy of the result.
+
+    A client takes a SingleFlight as its single_flight, which may be shared
+    between clients. coalesced counts the calls that shared another's
+    request.
+    '''
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, send, call):
+        '''
+        Return send(), or if a call with the same key is in flight, what
+        its send returns, raising what it raises. call is the metrics.Call,
+        marked as coalesced if it waits for another.
+        '''
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if leader:
+            try:
+                flight.result = send()
+            except:
+                flight.error = sys.exc_info()
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            return flight.result
+        call.coalesced = True
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error[0], flight.error[1], flight.error[2]
+        return flight.result
+
+
+class _Flight(object):
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
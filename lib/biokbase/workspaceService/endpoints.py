@@ -0,0 +1,135 @@
+############################################################
+#
+# Choice between replicas of the workspace service for the
+# workspaceService client.
+#
+############################################################
+
+import httplib
+import random
+import threading
+import time
+import urlparse
+
+_URL_SCHEME = frozenset(['http', 'https'])
+_DEFAULT_PORT = {'http': httplib.HTTP_PORT, 'https': httplib.HTTPS_PORT}
+
+
+class Endpoint(object):
+    '''
+    One replica of the service, and what has been seen of it.
+
+    ewma - the moving average of the seconds to the response headers, or
+        None until a call has been answered.
+    inflight - the number of requests sent and not yet answered.
+    failures - the number of calls in a row that failed.
+    ejected_until - the time until which the endpoint is not used, if it
+        has failed.
+    '''
+
+    def __init__(self, url):
+        parsed = urlparse.urlparse(url)
+        if parsed.scheme not in _URL_SCHEME:
+            raise ValueError(url + " isn't a valid http url")
+        self.url = url
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port or _DEFAULT_PORT[parsed.scheme]
+        self.path = parsed.path or '/'
+        if parsed.query:
+            self.path += '?' + parsed.query
+        self.ewma = None
+        self.inflight = 0
+        self.failures = 0
+        self.ejected_until = 0
+
+    def __repr__(self):
+        return 'Endpoint(%r)' % self.url
+
+
+class Endpoints(object):
+    '''
+    Thread safe choice of the endpoint to send each request to, from a list
+    of urls of replicas sharing one database.
+
+    The endpoint with the least expected wait is chosen: its moving average
+    latency, weighted by weight, times one more than its requests in flight.
+    Endpoints not yet tried are chosen first, and those failing lately
+    last. To keep the averages current, a fraction explore of requests go
+    to a random endpoint instead, though never to one whose last request
+    failed.
+
+    After eject_after failures in a row, an endpoint is not used for
+    eject_for seconds, doubling with each further failure up to
+    max_eject_for. If every endpoint is ejected, the one back soonest is
+    used.
+    '''
+
+    def __init__(self, urls, weight=0.3, explore=0.05, eject_after=2,
+                 eject_for=5, max_eject_for=60):
+        if isinstance(urls, basestring):
+            urls = [urls]
+        if not urls:
+            raise ValueError('At least one url is required')
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.weight = weight
+        self.explore = explore
+        self.eject_after = eject_after
+        self.eject_for = eject_for
+        self.max_eject_for = max_eject_for
+        self._lock = threading.Lock()
+
+    def choose(self, exclude=None):
+        '''
+        Return the endpoint to send a request to, counting the request as in
+        flight until answered, failed or abandoned is called. Returns None
+        if there is no endpoint other than exclude.
+        '''
+        now = time.time()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e is not exclude]
+            if not candidates:
+                return None
+            live = [e for e in candidates if e.ejected_until <= now]
+            if not live:
+                best = min(candidates, key=lambda e: e.ejected_until)
+            elif (len(live) > 1 and random.random() < self.explore and
+                    any(e.failures == 0 for e in live)):
+                best = random.choice([e for e in live if e.failures == 0])
+            else:
+                best = min(live, key=lambda e: (
+                    e.failures, (e.ewma or 0) * (e.inflight + 1)))
+            best.inflight += 1
+            return best
+
+    def answered(self, endpoint, seconds):
+        '''
+        Record that an endpoint answered a request in seconds.
+        '''
+        with self._lock:
+            endpoint.inflight -= 1
+            endpoint.failures = 0
+            endpoint.ejected_until = 0
+            if endpoint.ewma is None:
+                endpoint.ewma = seconds
+            else:
+                endpoint.ewma += self.weight * (seconds - endpoint.ewma)
+
+    def abandoned(self, endpoint):
+        '''
+        Record that a request was given up for reasons of the caller's own.
+        '''
+        with self._lock:
+            endpoint.inflight -= 1
+
+    def failed(self, endpoint):
+        '''
+        Record that a request to an endpoint failed without an answer.
+        '''
+        with self._lock:
+            endpoint.inflight -= 1
+            endpoint.failures += 1
+            extra = endpoint.failures - self.eject_after
+            if extra >= 0:
+                endpoint.ejected_until = time.time() + min(
+                    self.eject_for * 2 ** extra, self.max_eject_for)
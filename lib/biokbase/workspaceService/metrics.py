@@ -0,0 +1,278 @@
+############################################################
+#
+# Call metrics for the workspaceService client.
+#
+# Each call the client makes to the server is timed in phases, and its
+# sizes, retries and any error are counted by method.
+#
+############################################################
+
+import bisect
+import threading
+import time
+
+from .rpc import ServerError
+
+# connect - getting a connection from the pool, connecting if it is new
+# send - sending the request
+# wait - waiting for the server, until the response headers arrive
+# decode - reading and decoding the response body
+PHASES = ('connect', 'send', 'wait', 'decode')
+
+# upper bounds in seconds of the latency histogram buckets
+BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30,
+           60, 300)
+
+
+class Call(object):
+    '''
+    The measurements of one call to the server, passed to a client's on_call
+    hook when the call ends.
+
+    method - the method called.
+    phases - the seconds spent in each of PHASES.
+    seconds - the seconds the call took in all.
+    request_bytes, response_bytes - the sizes of the request and response
+        bodies as sent, i.e. compressed if they were.
+    retries - the number of times the request was resent.
+    hedged - whether the request was also sent to a second replica.
+    coalesced - whether the call shared an identical call's request rather
+        than sending its own.
+    error - the exception the call raised, or None.
+    '''
+
+    __slots__ = ('method', 'phases', 'seconds', 'request_bytes',
+                 'response_bytes', 'retries', 'hedged', 'coalesced', 'error',
+                 'start', '_last')
+
+    def __init__(self, method):
+        self.method = method
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.seconds = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.hedged = False
+        self.coalesced = False
+        self.error = None
+        self.start = self._last = time.time()
+
+    def lap(self, phase):
+        '''
+        Add the time since the last lap to a phase.
+        '''
+        now = time.time()
+        self.phases[phase] += now - self._last
+        self._last = now
+
+    def absorb(self, attempt):
+        '''
+        Take the phases and sizes of a Call measuring one attempt at this
+        call.
+        '''
+        for phase, seconds in attempt.phases.iteritems():
+            self.phases[phase] += seconds
+        self.request_bytes = attempt.request_bytes
+        self.response_bytes = attempt.response_bytes
+        self.retries += attempt.retries
+        self._last = time.time()
+
+    def end(self):
+        self.seconds = time.time() - self.start
+
+
+class _Histogram(object):
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self, nbuckets):
+        self.counts = [0] * (nbuckets + 1)    # the last is for > all bounds
+        self.sum = 0.0
+
+
+class _MethodStats(object):
+
+    def __init__(self, nbuckets):
+        self.calls = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.hedges = 0
+        self.coalesced = 0
+        self.errors = {}    # (name, code) -> count
+        self.latency = dict((phase, _Histogram(nbuckets))
+                            for phase in PHASES + ('total',))
+
+
+class Metrics(object):
+    '''
+    Thread safe counts and latency histograms, by method, of the calls made
+    by the clients sharing it. Calls answered from a client side cache are
+    not counted.
+
+    buckets - the upper bounds in seconds of the latency histogram buckets.
+    '''
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def record(self, call):
+        '''
+        Add a finished Call.
+        '''
+        buckets = self.buckets
+        error = _error_key(call.error) if call.error is not None else None
+        with self._lock:
+            stats = self._methods.get(call.method)
+            if stats is None:
+                stats = self._methods[call.method] = _MethodStats(
+                    len(buckets))
+            stats.calls += 1
+            stats.request_bytes += call.request_bytes
+            stats.response_bytes += call.response_bytes
+            stats.retries += call.retries
+            stats.hedges += call.hedged
+            stats.coalesced += call.coalesced
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+            latency = stats.latency
+            for phase, seconds in call.phases.iteritems():
+                hist = latency[phase]
+                hist.counts[bisect.bisect_left(buckets, seconds)] += 1
+                hist.sum += seconds
+            hist = latency['total']
+            hist.counts[bisect.bisect_left(buckets, call.seconds)] += 1
+            hist.sum += call.seconds
+
+    def stats(self):
+        '''
+        Return a snapshot of the metrics as a dict of method names to dicts
+        of:
+            calls, request_bytes, response_bytes, retries, hedges,
+                coalesced - totals.
+            errors - a dict of (error name, code) to the number of calls
+                that raised it. ServerErrors are counted by their name and
+                code, HTTPErrors as 'HTTPError' and the HTTP status, and
+                other exceptions by their class name and code ''.
+            latency - a dict of PHASES and 'total' to dicts of:
+                count, sum - the number of calls and the seconds they took.
+                buckets - a list of (upper bound, count) pairs, where count
+                    is the number of calls that took no more than the
+                    bound. The last bound is infinity.
+        '''
+        bounds = self.buckets + (float('inf'),)
+        out = {}
+        with self._lock:
+            for method, stats in self._methods.iteritems():
+                latency = {}
+                for phase, hist in stats.latency.iteritems():
+                    cumulative = []
+                    total = 0
+                    for bound, count in zip(bounds, hist.counts):
+                        total += count
+                        cumulative.append((bound, total))
+                    latency[phase] = {'count': total, 'sum': hist.sum,
+                                      'buckets': cumulative}
+                out[method] = {'calls': stats.calls,
+                               'request_bytes': stats.request_bytes,
+                               'response_bytes': stats.response_bytes,
+                               'retries': stats.retries,
+                               'hedges': stats.hedges,
+                               'coalesced': stats.coalesced,
+                               'errors': dict(stats.errors),
+                               'latency': latency}
+        return out
+
+    def quantile(self, method, q, phase='total', min_count=1):
+        '''
+        Estimate the q quantile (e.g. 0.95) of the seconds calls to a method
+        spent in a phase, or return None if there have been fewer than
+        min_count calls.
+        '''
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                return None
+            counts = list(stats.latency[phase].counts)
+        total = sum(counts)
+        if not total or total < min_count:
+            return None
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(counts):
+            if i == len(self.buckets):
+                # beyond the largest bound
+                return self.buckets[-1]
+            upper = self.buckets[i]
+            if count and seen + count >= rank:
+                # interpolate within the bucket
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+    def clear(self):
+        with self._lock:
+            self._methods.clear()
+
+    def prometheus(self, prefix='workspace_client'):
+        '''
+        Return the metrics in the Prometheus text exposition format.
+        '''
+        stats = self.stats()
+        lines = []
+
+        def family(name, kind, help):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help))
+            lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+
+        family('call_seconds', 'histogram',
+               'Time taken by calls to the workspace service, by phase.')
+        for method in sorted(stats):
+            for phase in PHASES + ('total',):
+                hist = stats[method]['latency'][phase]
+                labels = 'method="%s",phase="%s"' % (method, phase)
+                for bound, count in hist['buckets']:
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('%s_call_seconds_bucket{%s,le="%s"} %d' %
+                                 (prefix, labels, le, count))
+                lines.append('%s_call_seconds_sum{%s} %r' %
+                             (prefix, labels, hist['sum']))
+                lines.append('%s_call_seconds_count{%s} %d' %
+                             (prefix, labels, hist['count']))
+        for name, help in (
+                ('calls', 'Calls to the workspace service.'),
+                ('request_bytes', 'Bytes of request bodies sent.'),
+                ('response_bytes', 'Bytes of response bodies received.'),
+                ('retries', 'Requests resent.'),
+                ('hedges', 'Requests also sent to a second replica.'),
+                ('coalesced', 'Calls that shared an identical call\'s '
+                 'request.')):
+            family(name + '_total', 'counter', help)
+            for method in sorted(stats):
+                lines.append('%s_%s_total{method="%s"} %d' %
+                             (prefix, name, method, stats[method][name]))
+        family('errors_total', 'counter',
+               'Calls to the workspace service that raised an error.')
+        for method in sorted(stats):
+            for (name, code), count in sorted(
+                    stats[method]['errors'].iteritems()):
+                lines.append(
+                    '%s_errors_total{method="%s",name="%s",code="%s"} %d' %
+                    (prefix, method, _escape(name), _escape(code), count))
+        return '\n'.join(lines) + '\n'
+
+
+def _error_key(error):
+    if isinstance(error, ServerError):
+        return error.name, str(error.code)
+    code = getattr(error, 'code', None)    # e.g. urllib2.HTTPError
+    return type(error).__name__, '' if code is None else str(code)
+
+
+def _escape(value):
+    return unicode(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n').encode('utf-8')
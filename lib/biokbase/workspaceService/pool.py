@@ -0,0 +1,198 @@
+############################################################
+#
+# Keep-alive HTTP(S) connection pool for the workspaceService client.
+#
+# Connections are keyed by (scheme, host, port). A pool may be shared
+# between any number of clients and threads.
+#
+# Like urllib2, connections go through the proxies set in the http_proxy
+# and https_proxy environment variables, except to hosts in no_proxy.
+#
+############################################################
+
+import base64
+import httplib
+import select
+import socket
+import threading
+import time
+import urllib
+import urlparse
+
+_HTTP_CLASSES = {'http': httplib.HTTPConnection,
+                 'https': httplib.HTTPSConnection}
+
+
+class ConnectionPool(object):
+    '''
+    A thread safe pool of persistent HTTP(S) connections.
+
+    maxsize - the maximum number of idle connections kept open across all
+        hosts.
+    maxperhost - if set, the maximum number of connections, idle or in
+        use, open to any one host at a time. Threads wanting more
+        connections to a host wait for one to be released, and acquire
+        raises socket.timeout if none is released in time. By default there
+        is no limit.
+    idle_timeout - idle connections older than this many seconds are
+        closed rather than reused.
+    '''
+
+    def __init__(self, maxsize=10, maxperhost=None, idle_timeout=60):
+        if maxsize < 0:
+            raise ValueError('maxsize cannot be negative')
+        if maxperhost is not None and maxperhost < 1:
+            raise ValueError('maxperhost must be at least 1')
+        self.maxsize = int(maxsize)
+        self.maxperhost = None if maxperhost is None else int(maxperhost)
+        self.idle_timeout = idle_timeout
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = {}    # key -> list of (connection, last use time)
+        self._open = {}    # key -> count of open connections
+        self._idlecount = 0
+
+    def acquire(self, scheme, host, port, timeout, fresh=False):
+        '''
+        Get a connection to the host, either an idle pooled connection or,
+        always if fresh is True, a new one. The connection's reused
+        attribute is True if it has already carried a request. Blocks for up
+        to timeout seconds if the host's connection limit has been reached.
+        '''
+        key = (scheme, host, port)
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                self._expire(key)
+                idle = self._idle.get(key)
+                if idle and fresh and self._full(key):
+                    # make room for the new connection
+                    idle.pop(0)[0].close()
+                    self._idlecount -= 1
+                    self._open[key] -= 1
+                if idle and not fresh:
+                    conn, _ = idle.pop()
+                    self._idlecount -= 1
+                    if _dropped(conn):
+                        conn.close()
+                        self._open[key] -= 1
+                        continue
+                    conn.reused = True
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    conn.timeout = timeout
+                    return conn
+                if not self._full(key):
+                    self._open[key] = self._open.get(key, 0) + 1
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise socket.timeout(
+                        'Timed out waiting for a connection to %s://%s:%s' %
+                        key)
+                self._cond.wait(remaining)
+        conn = _connect(scheme, host, port, timeout)
+        conn.pool_key = key
+        conn.reused = False
+        return conn
+
+    def _full(self, key):
+        # whether no more connections may be opened to the host
+        return (self.maxperhost is not None and
+                self._open.get(key, 0) >= self.maxperhost)
+
+    def release(self, conn, reusable=True):
+        '''
+        Return a connection to the pool. If reusable is False, or the pool is
+        full, the connection is closed instead.
+        '''
+        key = conn.pool_key
+        with self._cond:
+            if (reusable and conn.sock is not None and
+                    self._idlecount < self.maxsize):
+                self._idle.setdefault(key, []).append((conn, time.time()))
+                self._idlecount += 1
+                conn = None
+            else:
+                self._open[key] -= 1
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    def clear(self):
+        '''
+        Close all idle connections.
+        '''
+        with self._cond:
+            idle = self._idle
+            self._idle = {}
+            self._idlecount = 0
+            for key, conns in idle.iteritems():
+                self._open[key] -= len(conns)
+            self._cond.notify_all()
+        for conns in idle.itervalues():
+            for conn, _ in conns:
+                conn.close()
+
+    def _expire(self, key):
+        # must be called with the lock held
+        idle = self._idle.get(key)
+        if not idle:
+            return
+        cutoff = time.time() - self.idle_timeout
+        keep = []
+        for conn, used in idle:
+            if conn.sock is not None and used >= cutoff:
+                keep.append((conn, used))
+            else:
+                conn.close()
+        self._open[key] -= len(idle) - len(keep)
+        self._idlecount -= len(idle) - len(keep)
+        self._idle[key] = keep
+
+
+def _dropped(conn):
+    # whether the server has closed an idle connection, which then reads as
+    # ready; an idle connection has nothing else to read. poll is used where
+    # there is one, as select cannot wait on descriptors of 1024 or more.
+    if conn.sock is None:
+        return True
+    try:
+        if hasattr(select, 'poll'):
+            poller = select.poll()
+            poller.register(conn.sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (select.error, socket.error):
+        return True
+
+
+def _connect(scheme, host, port, timeout):
+    # a new connection to the host, through the proxy for the scheme if
+    # there is one. A connection through an http proxy must be sent the
+    # absolute URI of a request, and its proxy_headers with it; https is
+    # tunnelled through the proxy, so needs neither.
+    proxy = urllib.getproxies().get(scheme)
+    if not proxy or urllib.proxy_bypass(host):
+        conn = _HTTP_CLASSES[scheme](host, port, timeout=timeout)
+        conn.absolute_uri = False
+        conn.proxy_headers = {}
+        return conn
+    if '://' not in proxy:
+        proxy = 'http://' + proxy
+    parsed = urlparse.urlparse(proxy)
+    headers = {}
+    if parsed.username is not None:
+        credentials = '%s:%s' % (urllib.unquote(parsed.username),
+                                 urllib.unquote(parsed.password or ''))
+        headers['Proxy-Authorization'] = (
+            'Basic ' + base64.b64encode(credentials))
+    conn = _HTTP_CLASSES[scheme](parsed.hostname, parsed.port,
+                                 timeout=timeout)
+    if scheme == 'https':
+        conn.set_tunnel(host, port, headers)
+        conn.absolute_uri = False
+        conn.proxy_headers = {}
+    else:
+        conn.absolute_uri = True
+        conn.proxy_headers = headers
+    return conn
@@ -0,0 +1,112 @@
+############################################################
+#
+# Retrying of failed workspaceService calls.
+#
+# Only calls that are safe to repeat are retried: those that don't change
+# anything on the server, unless the caller opts in to retrying others.
+#
+############################################################
+
+import httplib
+import random
+import socket
+import threading
+import time
+
+from .rpc import ServerError
+
+# methods that only read, so may be sent again however many times
+IDEMPOTENT = frozenset([
+    'get_object', 'get_objects', 'get_object_by_ref',
+    'get_objectmeta', 'get_objectmetas', 'get_objectmeta_by_ref',
+    'has_object', 'has_objects', 'object_history',
+    'get_workspacemeta', 'get_workspacepermissions',
+    'list_workspaces', 'list_workspace_objects', 'get_user_settings',
+    'get_types', 'get_jobs',
+])
+
+# HTTP statuses a proxy answers with when the server is down or overloaded
+UNAVAILABLE = frozenset([502, 503, 504])
+
+
+class RetryPolicy(object):
+    '''
+    When and how often to retry failed calls. A policy may be shared by any
+    number of clients and threads.
+
+    Calls to IDEMPOTENT methods are retried after connection errors,
+    timeouts, malformed responses and HTTP 502, 503 and 504 responses; never
+    after an error reported by the service itself.
+
+    max_attempts - the most times to send a request, including the first.
+    backoff - the base delay in seconds. The delay before the nth retry is
+        random, up to backoff * 2 ** (n - 1) but no more than max_backoff.
+    deadline - no retry is started more than this many seconds after a
+        call began.
+    budget - retries are limited to this fraction of calls, so that an
+        overloaded server is not swamped with retries. A reserve of
+        min_retries lets occasional failures be retried however few calls
+        there are.
+    retry_writes - also retry the methods that change things. True for all
+        methods, or a set of method names. Such a call may then be carried
+        out twice.
+    '''
+
+    def __init__(self, max_attempts=4, backoff=0.1, max_backoff=10,
+                 deadline=60, budget=0.1, min_retries=10,
+                 retry_writes=False):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.budget = budget
+        self.min_retries = min_retries
+        self.retry_writes = retry_writes
+        self._tokens = float(min_retries)
+        self._lock = threading.Lock()
+
+    def allows(self, method):
+        '''
+        Return whether calls to a method may be retried.
+        '''
+        if method in IDEMPOTENT or self.retry_writes is True:
+            return True
+        return bool(self.retry_writes) and method in self.retry_writes
+
+    def run(self, send, call):
+        '''
+        Return send(), calling it again as the policy allows when it raises.
+        call is the metrics.Call, whose retries are counted.
+        '''
+        with self._lock:
+            self._tokens = min(self._tokens + self.budget,
+                               max(self.min_retries, 1))
+        attempt = 1
+        while True:
+            try:
+                return send()
+            except Exception, e:
+                if attempt >= self.max_attempts or not retryable(e):
+                    raise
+                delay = random.uniform(0, min(
+                    self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+                if time.time() + delay > call.start + self.deadline:
+                    raise
+                with self._lock:
+                    if self._tokens < 1:
+                        raise
+                    self._tokens -= 1
+            time.sleep(delay)
+            attempt += 1
+            call.retries += 1
+
+
+def retryable(error):
+    '''
+    Return whether a call that raised an error may succeed if sent again.
+    '''
+    if isinstance(error, ServerError):
+        return False
+    if isinstance(error, (socket.error, httplib.HTTPException)):
+        return True
+    return getattr(error, 'code', None) in UNAVAILABLE
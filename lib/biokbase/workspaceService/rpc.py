@@ -0,0 +1,304 @@
+############################################################
+#
+# The workspaceService JSON-RPC 1.1 protocol, shared by the blocking
+# client (client.py) and the asyncio client (asyncclient.py).
+#
+# This module must stay importable by both Python 2 and Python 3.
+#
+############################################################
+
+try:
+    import json
+except ImportError:
+    import sys
+    sys.path.append('simplejson-2.3.3')
+    import simplejson as json
+
+import random
+
+
+class ServerError(Exception):
+
+    def __init__(self, name, code, message, data=None, error=None):
+        self.name = name
+        self.code = code
+        self.message = '' if message is None else message
+        self.data = data or error or ''
+        # data = JSON RPC 2.0, error = 1.1
+
+    def __str__(self):
+        return self.name + ': ' + str(self.code) + '. ' + self.message + \
+            '\n' + self.data
+
+
+class JSONObjectEncoder(json.JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, set):
+            return list(obj)
+        if isinstance(obj, frozenset):
+            return list(obj)
+        return json.JSONEncoder.default(self, obj)
+
+
+class Codec(object):
+    '''
+    A JSON backend. encode returns a str, writing sets and frozensets as
+    lists; decode takes a str.
+    '''
+
+    def __init__(self, name, encode, decode):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self):
+        return 'Codec(%r)' % self.name
+
+
+def _json_codec():
+    return Codec('json', _tree_encoder().encode, json.JSONDecoder().decode)
+
+
+def _tree_encoder():
+    # Requests and results are trees, so the check for reference cycles,
+    # which costs about as much as the encoding, is skipped. A cycle then
+    # exceeds the recursion limit, which encode turns back into the
+    # ValueError the check raises.
+    return JSONObjectEncoder(check_circular=False)
+
+
+def _simplejson_codec():
+    import simplejson
+    from simplejson.encoder import c_make_encoder
+    if c_make_encoder is None:
+        raise ImportError('simplejson is built without its C speedups')
+    # iterable_as_array has the C encoder write sets as lists itself
+    encoder = simplejson.JSONEncoder(iterable_as_array=True,
+                                     check_circular=False,
+                                     namedtuple_as_object=False)
+    decoder = simplejson.JSONDecoder()
+
+    def decode(text):
+        # given bytes, simplejson decodes ASCII strings as str rather than
+        # unicode as json does
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        return decoder.decode(text)
+    return Codec('simplejson', encoder.encode, decode)
+
+
+def _ujson_codec():
+    import ujson
+    return Codec('ujson', _or_json(ujson.dumps), ujson.loads)
+
+
+def _orjson_codec():
+    import orjson
+
+    def encode(obj):
+        return orjson.dumps(obj, default=_set_list).decode('utf-8')
+    return Codec('orjson', _or_json(encode), orjson.loads)
+
+
+def _set_list(obj):
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(repr(obj) + ' is not JSON serializable')
+
+
+def _or_json(fast):
+    # Fall back to the standard encoder for what a fast one can't encode,
+    # e.g. sets or integers of more than 64 bits
+    slow = _tree_encoder().encode
+
+    def encode(obj):
+        try:
+            return fast(obj)
+        except (TypeError, OverflowError, ValueError):
+            return slow(obj)
+    return encode
+
+
+# in order of preference
+_CODECS = (('orjson', _orjson_codec), ('ujson', _ujson_codec),
+           ('simplejson', _simplejson_codec), ('json', _json_codec))
+
+# a backend must round trip this exactly, to the same types as json, to be
+# chosen, which e.g. old ujson releases, that round floats, do not
+_PROBE = {u'f': [0.1 + 0.2, 1e-320, -2.5e300], u'i': [2 ** 62, -1],
+          u's': [u'\u00e9\u4e2d\U0001f600', u'"\\/\n\x00', u'ascii'],
+          u'b': [True, None], u'n': {u'x': []}}
+
+
+def _usable(codec):
+    try:
+        text = codec.encode(_PROBE)
+        return (isinstance(text, str) and
+                _same(codec.decode(text), json.loads(text)) and
+                codec.decode(text) == _PROBE and
+                codec.decode(codec.encode([set([1])])) == [[1]])
+    except Exception:
+        return False
+
+
+def _same(a, b):
+    # whether two decoded values are equal and of the same types throughout
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        keys = dict((k, k) for k in b)
+        return (len(a) == len(b) and
+                all(k in keys and _same(k, keys[k]) and _same(v, b[k])
+                    for k, v in a.items()))
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _codecs():
+    # the usable backends, fastest first
+    for name, make in _CODECS:
+        try:
+            codec = make()
+        except (ImportError, TypeError):
+            continue
+        if _usable(codec):
+            yield codec
+
+
+def available_codecs():
+    '''
+    Return the names of the JSON backends that can be used here, fastest
+    first.
+    '''
+    return [codec.name for codec in _codecs()]
+
+
+def set_codec(codec=None):
+    '''
+    Set the JSON backend used for requests and responses, by name (one of
+    available_codecs()) or as a Codec. By default, and if None is given, the
+    fastest available is used: orjson, ujson, simplejson with its C
+    speedups, or the standard json module.
+    '''
+    global _codec
+    if codec is None:
+        codec = next(_codecs())
+    elif not isinstance(codec, Codec):
+        codec = dict(_CODECS)[codec]()
+    _codec = codec
+    return codec
+
+
+def get_codec():
+    '''
+    Return the Codec in use.
+    '''
+    return _codec or set_codec()
+
+
+# chosen on first use, as trying the backends takes a while
+_codec = None
+
+
+def encode(obj):
+    try:
+        return (_codec or set_codec()).encode(obj)
+    except RuntimeError:
+        # raises ValueError if obj has a reference cycle, otherwise it is
+        # just too deep
+        JSONObjectEncoder().encode(obj)
+        raise
+
+
+def decode(text):
+    return (_codec or set_codec()).decode(text)
+
+METHODS = (
+    # name, number of positional parameters
+    ('load_media_from_bio', 1),
+    ('import_bio', 1),
+    ('import_map', 1),
+    ('save_object', 1),
+    ('save_objects', 1),
+    ('delete_object', 1),
+    ('delete_object_permanently', 1),
+    ('get_object', 1),
+    ('get_objects', 1),
+    ('get_object_by_ref', 1),
+    ('save_object_by_ref', 1),
+    ('get_objectmeta', 1),
+    ('get_objectmetas', 1),
+    ('get_objectmeta_by_ref', 1),
+    ('revert_object', 1),
+    ('copy_object', 1),
+    ('move_object', 1),
+    ('has_object', 1),
+    ('has_objects', 1),
+    ('object_history', 1),
+    ('create_workspace', 1),
+    ('get_workspacemeta', 1),
+    ('get_workspacepermissions', 1),
+    ('delete_workspace', 1),
+    ('clone_workspace', 1),
+    ('list_workspaces', 1),
+    ('list_workspace_objects', 1),
+    ('set_global_workspace_permissions', 1),
+    ('set_workspace_permissions', 1),
+    ('get_user_settings', 1),
+    ('set_user_settings', 1),
+    ('queue_job', 1),
+    ('set_job_status', 1),
+    ('get_jobs', 1),
+    ('get_types', 0),
+    ('add_type', 1),
+    ('remove_type', 1),
+    ('patch', 1),
+)
+
+# The static part of each request, up to the params. The request id is
+# appended per call.
+_REQUEST_PREFIX = dict((name, '{"method": "workspaceService.' + name +
+                        '", "version": "1.1", "params": ')
+                       for name, _ in METHODS)
+
+
+def request_envelope(method):
+    '''
+    Return the text of a JSON-RPC request for a method that goes before and
+    after the params.
+    '''
+    return _REQUEST_PREFIX[method], ', "id": "' + str(random.random())[2:] + \
+        '"}'
+
+
+def request_body(method, params):
+    '''
+    Build the JSON-RPC request for a method and its list of positional
+    params.
+    '''
+    prefix, suffix = request_envelope(method)
+    return prefix + encode(params) + suffix
+
+
+def parse_result(data):
+    '''
+    Get the result from the body of a successful (HTTP 200) response.
+    '''
+    resp = decode(data)
+    if 'result' in resp:
+        return resp['result'][0]
+    else:
+        raise ServerError('Unknown', 0, 'An unknown server error occurred')
+
+
+def parse_error(data):
+    '''
+    Build the ServerError for the body of a JSON error response.
+    '''
+    err = decode(data)
+    if 'error' in err:
+        return ServerError(**err['error'])
+    else:            # this should never happen... but if it does
+        return ServerError('Unknown', 0, data)
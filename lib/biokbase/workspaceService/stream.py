@@ -0,0 +1,323 @@
+############################################################
+#
+# Incremental encoding of workspaceService requests and decoding of
+# responses.
+#
+# Lets the client send a request as it is encoded, and hand back the
+# elements of a list result (e.g. the objects of a get_objects call) one
+# at a time as they arrive, so that neither the whole body nor the whole
+# decoded result need be held in memory at once.
+#
+############################################################
+
+try:
+    import json
+except ImportError:
+    import sys
+    sys.path.append('simplejson-2.3.3')
+    import simplejson as json
+
+import itertools
+import Queue
+import threading
+import zlib
+
+from .rpc import ServerError, encode, request_envelope
+
+_WS = ' \t\n\r'
+_CHUNK = 64 * 1024
+# How many levels of containers to walk in an object's data before encoding
+# what is below in one go. 2 reaches the elements of the lists in the data,
+# e.g. the features of a genome.
+_DATA_DEPTH = 2
+
+
+def iter_request(method, params, chunk_size=_CHUNK):
+    '''
+    Yield the JSON-RPC request for a method and its list of positional
+    params as strings of about chunk_size bytes.
+
+    File like objects (with a read method) and iterators found in the
+    params are not encoded. They must instead supply, as strings, the JSON
+    text of the value they stand for, which is copied into the request.
+    '''
+    prefix, suffix = request_envelope(method)
+    # the data is two levels down, in the params dict in the params list
+    frags = _iterencode(params, _DATA_DEPTH + 2)
+    return _chunks(itertools.chain([prefix], frags, [suffix]), chunk_size)
+
+
+def iter_json(obj, chunk_size=_CHUNK):
+    '''
+    Yield the JSON text for an object's data as strings of about chunk_size
+    bytes.
+    '''
+    return _chunks(_iterencode(obj, _DATA_DEPTH), chunk_size)
+
+
+def gzip_chunks(chunks, threshold, level=6):
+    '''
+    Gzip the concatenated strings from an iterator if they total at least
+    threshold bytes. Returns the gzipped bytes and None, or, if the strings
+    are fewer bytes, None and the strings joined, so that the caller need
+    not produce them again.
+
+    Compression runs on a worker thread fed through a bounded queue, so that
+    producing the strings (e.g. encoding JSON with iter_json) overlaps with
+    compressing them; zlib releases the GIL.
+    '''
+    chunks = iter(chunks)
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= threshold:
+            break
+    else:
+        return None, ''.join(head)
+    queue = Queue.Queue(8)
+    out = []
+    err = []
+
+    def compress():
+        z = zlib.compressobj(level, zlib.DEFLATED, 31)    # gzip format
+        for chunk in iter(queue.get, None):
+            if not err:
+                try:
+                    out.append(z.compress(chunk))
+                except Exception, e:
+                    err.append(e)
+        if not err:
+            out.append(z.flush())
+
+    worker = threading.Thread(target=compress,
+                              name='workspaceService-gzip')
+    worker.daemon = True
+    worker.start()
+    try:
+        while head:
+            queue.put(head.pop(0))
+        for chunk in chunks:
+            queue.put(chunk)
+    finally:
+        queue.put(None)
+        worker.join()
+    if err:
+        raise err[0]
+    return ''.join(out), None
+
+
+def _chunks(frags, chunk_size):
+    # join the fragments into strings of about chunk_size bytes
+    buf = []
+    size = 0
+    for frag in frags:
+        if isinstance(frag, unicode):
+            frag = frag.encode('utf-8')
+        buf.append(frag)
+        size += len(frag)
+        if size >= chunk_size:
+            yield ''.join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield ''.join(buf)
+
+
+def _iterencode(obj, depth):
+    if hasattr(obj, 'read'):
+        while True:
+            data = obj.read(_CHUNK)
+            if not data:
+                return
+            yield data
+    elif hasattr(obj, 'next') and hasattr(obj, '__iter__'):
+        for frag in obj:
+            yield frag
+    elif depth and isinstance(obj, dict) and all(
+            isinstance(k, basestring) for k in obj):
+        yield '{'
+        sep = ''
+        for k, v in obj.iteritems():
+            yield sep + encode(k) + ': '
+            for frag in _iterencode(v, depth - 1):
+                yield frag
+            sep = ', '
+        yield '}'
+    elif depth and isinstance(obj, (list, tuple, set, frozenset)):
+        yield '['
+        sep = ''
+        for v in obj:
+            yield sep
+            for frag in _iterencode(v, depth - 1):
+                yield frag
+            sep = ', '
+        yield ']'
+    else:
+        yield encode(obj)
+
+
+class CountingReader(object):
+    '''
+    Wraps a file like object and counts the bytes read from it.
+    '''
+
+    def __init__(self, fp):
+        self._fp = fp
+        self.count = 0
+
+    def read(self, size=-1):
+        data = self._fp.read() if size < 0 else self._fp.read(size)
+        self.count += len(data)
+        return data
+
+
+class InflatingReader(object):
+    '''
+    Wraps a file like object holding gzip or zlib (HTTP deflate) data and
+    reads it inflated, a piece at a time.
+    '''
+
+    def __init__(self, fp):
+        self._fp = fp
+        # 32 + MAX_WBITS accepts either a gzip or a zlib header
+        self._z = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        self._buf = ''
+        self._eof = False
+
+    def read(self, size=-1):
+        if size < 0:
+            data = self._buf
+            if not self._eof:
+                data += self._z.decompress(self._z.unconsumed_tail +
+                                           self._fp.read())
+                data += self._z.flush()
+                self._eof = True
+            self._buf = ''
+            return data
+        while len(self._buf) < size and not self._eof:
+            data = self._z.unconsumed_tail or self._fp.read(_CHUNK)
+            if data:
+                # limit the output so a small read can't inflate hugely
+                self._buf += self._z.decompress(data, size - len(self._buf))
+            else:
+                self._buf += self._z.flush()
+                self._eof = True
+        data, self._buf = self._buf[:size], self._buf[size:]
+        return data
+
+
+class JSONStream(object):
+    '''
+    Reads JSON values one at a time from a file like object. Only the text
+    of the value being decoded is buffered.
+    '''
+
+    def __init__(self, fp, chunk_size=_CHUNK):
+        self._fp = fp
+        self._chunk = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size):
+        # read at least size more bytes, dropping what has been consumed
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        while size > 0 and not self._eof:
+            data = self._fp.read(max(size, self._chunk))
+            if not data:
+                self._eof = True
+            self._buf += data
+            size -= len(data)
+
+    def peek(self):
+        '''
+        Return the next non whitespace character, or '' at the end of the
+        stream.
+        '''
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf) or self._eof:
+                return buf[pos:pos + 1]
+            self._fill(self._chunk)
+
+    def expect(self, char):
+        '''
+        Consume the next non whitespace character, which must be char.
+        '''
+        c = self.peek()
+        if c != char:
+            raise ValueError('Expected %r in JSON stream but got %r' %
+                             (char, c))
+        self._pos += 1
+
+    def value(self, _decode=json.JSONDecoder().raw_decode):
+        '''
+        Decode and return the next complete JSON value.
+        '''
+        self.peek()
+        while True:
+            try:
+                val, end = _decode(self._buf, self._pos)
+            except ValueError:
+                if self._eof:
+                    raise
+                end = None
+            # a number at the end of the buffer may continue in the next read
+            if end is not None and (end < len(self._buf) or self._eof):
+                self._pos = end
+                return val
+            # grow the buffer geometrically so large values are not
+            # re-scanned once per chunk
+            self._fill(len(self._buf) - self._pos)
+
+    def items(self):
+        '''
+        Iterate over the elements of the JSON array that comes next.
+        '''
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect(']')
+                return
+
+
+def iter_result(fp):
+    '''
+    Iterate over the elements of the list returned by a JSON-RPC 1.1
+    response read from fp. Raises ServerError if the response holds an
+    error.
+    '''
+    stream = JSONStream(fp)
+    stream.expect('{')
+    seen_result = False
+    while stream.peek() != '}':
+        key = stream.value()
+        stream.expect(':')
+        if key == 'result':
+            stream.expect('[')
+            for item in stream.items():
+                yield item
+            stream.expect(']')
+            seen_result = True
+        elif key == 'error':
+            raise ServerError(**stream.value())
+        else:
+            stream.value()
+        if stream.peek() == ',':
+            stream.expect(',')
+    if not seen_result:
+        raise ServerError('Unknown', 0, 'An unknown server error occurred')
@@ -0,0 +1,236 @@
+############################################################
+#
+# Write-behind saving of objects for the workspaceService client.
+#
+############################################################
+
+import collections
+import Queue
+import sys
+import threading
+
+
+class SaveFuture(object):
+    '''
+    The pending result of a save made through a BufferedSaver.
+    '''
+
+    def __init__(self, params):
+        self.params = params
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def done(self):
+        '''
+        Return whether the save has finished, successfully or not.
+        '''
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        '''
+        Wait for the save and return the object_metadata of the saved
+        object, or raise what the save raised. Raises
+        BufferedSaver.Timeout if timeout seconds pass first.
+        '''
+        error = self.exception(timeout)
+        if error is not None:
+            raise error[0], error[1], error[2]
+        return self._result
+
+    def exception(self, timeout=None):
+        '''
+        Wait for the save and return the sys.exc_info() of the error it
+        raised, or None if it succeeded.
+        '''
+        if not self._done.wait(timeout):
+            raise BufferedSaver.Timeout('The save has not finished')
+        return self._error
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+
+class BufferedSaver(object):
+    '''
+    Saves objects in the background through a workspaceService client, so
+    that a loader can hand over objects without waiting for each to be
+    saved. Use it as a context manager, which closes it on exit:
+
+        with BufferedSaver(client) as saver:
+            for params in objects:
+                saver.save(params)
+
+    Saves are made by worker threads, each with a queue of at most
+    max_queue // workers saves; save blocks while the queue it needs is
+    full. Saves of the same object (workspace and id) always go to the same
+    worker, so are made in the order they were given.
+
+    With the save_object method, each worker takes all the saves waiting in
+    its queue, up to batch_size, and makes them with one save_objects call
+    per workspace. If such a call fails, its saves are made again one at a
+    time, so that each SaveFuture gets its own outcome.
+
+    flush and close wait until every save given so far is finished, and
+    raise the first error of any that failed since the last flush. Each
+    save's own outcome is also available from the SaveFuture it returns.
+    '''
+
+    class Timeout(Exception):
+        pass
+
+    def __init__(self, client, workers=4, max_queue=1000,
+                 method='save_object', batch_size=100):
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        self.client = client
+        self.method = method
+        self.batch_size = batch_size
+        self._save = getattr(client, method)
+        self._save_many = None
+        if method == 'save_object' and batch_size > 1:
+            self._save_many = client.save_objects
+        self._queues = [Queue.Queue(max(max_queue // workers, 1))
+                        for _ in range(workers)]
+        self._errors = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = []
+        for i, queue in enumerate(self._queues):
+            worker = threading.Thread(target=self._work, args=(queue,),
+                                      name='workspaceService-saver-%d' % i)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # don't hide the error that ended the block
+            try:
+                self.close()
+            except Exception:
+                pass
+
+    def save(self, params, timeout=None):
+        '''
+        Queue a save with the params of the save method, and return a
+        SaveFuture for its result. Blocks while the queue is full, raising
+        BufferedSaver.Timeout if timeout seconds pass first.
+        '''
+        if self._closed:
+            raise ValueError('The saver is closed')
+        future = SaveFuture(params)
+        queue = self._queues[hash((params.get('workspace'),
+                                   params.get('id'))) % len(self._queues)]
+        try:
+            queue.put(future, timeout=timeout)
+        except Queue.Full:
+            raise BufferedSaver.Timeout('The save queue is full')
+        return future
+
+    def flush(self):
+        '''
+        Wait until every save given so far has finished. Raises the error of
+        the first that failed since the last flush, if any did.
+        '''
+        for queue in self._queues:
+            queue.join()
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0][0], errors[0][1], errors[0][2]
+
+    def close(self):
+        '''
+        Flush, and stop the workers. Further saves are refused.
+        '''
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            for queue in self._queues:
+                queue.put(None)
+            for worker in self._workers:
+                worker.join()
+
+    def _work(self, queue):
+        while True:
+            batch = [queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except Queue.Empty:
+                    break
+            try:
+                futures = [future for future in batch if future is not None]
+                if self._save_many is None:
+                    for future in futures:
+                        self._run(future)
+                else:
+                    for group in self._groups(futures):
+                        self._run_batch(group)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _groups(self, futures):
+        # the saves that can share a save_objects call, in order. A save of
+        # an object already saved in another group of the run starts a new
+        # run, so saves of the same object are never reordered.
+        runs = []
+        groups = objects = None
+        for future in futures:
+            params = future.params
+            key = (params.get('workspace'), params.get('auth'),
+                   params.get('asHash'))
+            obj = (params.get('workspace'), params.get('id'))
+            if groups is None or objects.get(obj, key) != key:
+                groups = collections.OrderedDict()
+                objects = {}
+                runs.append(groups)
+            groups.setdefault(key, []).append(future)
+            objects[obj] = key
+        return [group for groups in runs for group in groups.values()]
+
+    def _run_batch(self, futures):
+        if len(futures) > 1:
+            first = futures[0].params
+            params = {'objects': [future.params for future in futures]}
+            for key in ('auth', 'asHash'):
+                if first.get(key) is not None:
+                    params[key] = first[key]
+            try:
+                result = self._save_many(params)
+            except Exception:
+                # find which saves failed by making each on its own
+                pass
+            else:
+                for future, metadata in zip(futures, result):
+                    future._finish(metadata)
+                return
+        for future in futures:
+            self._run(future)
+
+    def _run(self, future):
+        try:
+            result = self._save(future.params)
+        except Exception:
+            error = sys.exc_info()
+            with self._lock:
+                self._errors.append(error)
+            future._finish(error=error)
+        else:
+            future._finish(result)
@@ -64,6 +64,16 @@ function workspaceService(url, auth, auth_cb) {
         return json_call_ajax("workspaceService.save_object", [params], 1, _callback, _error_callback);
     };
 
+    this.save_objects = function (params, _callback, _errorCallback) {
+    return json_call_ajax("workspaceService.save_objects",
+        [params], 1, _callback, _errorCallback);
+};
+
+    this.save_objects_async = function (params, _callback, _error_callback) {
+        deprecationWarning();
+        return json_call_ajax("workspaceService.save_objects", [params], 1, _callback, _error_callback);
+    };
+
     this.delete_object = function (params, _callback, _errorCallback) {
     return json_call_ajax("workspaceService.delete_object",
         [params], 1, _callback, _errorCallback);
@@ -134,6 +144,16 @@ function workspaceService(url, auth, auth_cb) {
         return json_call_ajax("workspaceService.get_objectmeta", [params], 1, _callback, _error_callback);
     };
 
+    this.get_objectmetas = function (params, _callback, _errorCallback) {
+    return json_call_ajax("workspaceService.get_objectmetas",
+        [params], 1, _callback, _errorCallback);
+};
+
+    this.get_objectmetas_async = function (params, _callback, _error_callback) {
+        deprecationWarning();
+        return json_call_ajax("workspaceService.get_objectmetas", [params], 1, _callback, _error_callback);
+    };
+
     this.get_objectmeta_by_ref = function (params, _callback, _errorCallback) {
     return json_call_ajax("workspaceService.get_objectmeta_by_ref",
         [params], 1, _callback, _errorCallback);
@@ -184,6 +204,16 @@ function workspaceService(url, auth, auth_cb) {
         return json_call_ajax("workspaceService.has_object", [params], 1, _callback, _error_callback);
     };
 
+    this.has_objects = function (params, _callback, _errorCallback) {
+    return json_call_ajax("workspaceService.has_objects",
+        [params], 1, _callback, _errorCallback);
+};
+
+    this.has_objects_async = function (params, _callback, _error_callback) {
+        deprecationWarning();
+        return json_call_ajax("workspaceService.has_objects", [params], 1, _callback, _error_callback);
+    };
+
     this.object_history = function (params, _callback, _errorCallback) {
     return json_call_ajax("workspaceService.object_history",
         [params], 1, _callback, _errorCallback);
@@ -0,0 +1,48 @@
+#!/usr/bin/perl
+########################################################################
+# Benchmarks authenticating calls with and without the cache of
+# validated authentications, offline: simple accounts are used, with
+# each validation made to take as long as a remote one would.
+# Needs no database or auth service.
+#
+#	perl benchmarkAuthenticate.pl [--calls 1000] [--users 10] [--latency 0.05]
+########################################################################
+use strict;
+use warnings;
+use Getopt::Long;
+use Time::HiRes qw(time sleep);
+use Bio::KBase::workspaceService::Impl;
+
+my $calls = 1000;
+my $users = 10;
+my $latency = 0.05;
+GetOptions("calls=i" => \$calls, "users=i" => \$users, "latency=f" => \$latency)
+	or die "Usage: $0 [--calls 1000] [--users 10] [--latency 0.05]\n";
+
+#Making each validation as slow as a call to the auth service
+my $validations = 0;
+my $validate = \&Bio::KBase::workspaceService::Impl::_validateAuthentication;
+{
+	no warnings 'redefine';
+	*Bio::KBase::workspaceService::Impl::_validateAuthentication = sub {
+		$validations++;
+		sleep($latency);
+		return $validate->(@_);
+	};
+}
+
+foreach my $size (0,1000) {
+	my $impl = bless({
+		_accounttype => "simple",
+		"_auth-cache-ttl" => 300,
+		"_auth-cache-invalid-ttl" => 60,
+		"_auth-cache-size" => $size
+	},"Bio::KBase::workspaceService::Impl");
+	$validations = 0;
+	my $start = time();
+	for (my $i=0; $i < $calls; $i++) {
+		local $Bio::KBase::workspaceService::Server::CallContext = {};
+		$impl->_setContext("user".($i % $users));
+	}
+	printf("%-10s %10.1f ms %8d validations\n",($size > 0 ? "cached" : "uncached"),(time()-$start)*1000,$validations);
+}
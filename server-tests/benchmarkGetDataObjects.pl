@@ -0,0 +1,65 @@
+#!/usr/bin/perl
+########################################################################
+# Benchmarks reading data objects from GridFS one at a time, as
+# _getDataObjects used to, against reading them in one batch.
+# Needs a mongod; the benchmark database is dropped when it finishes.
+#
+#	perl benchmarkGetDataObjects.pl [--host localhost] [--objects 500] [--size 10000]
+########################################################################
+use strict;
+use warnings;
+use Getopt::Long;
+use Time::HiRes qw(time);
+use Bio::KBase::workspaceService::Impl;
+
+my $host = "localhost";
+my $count = 500;
+my $size = 10000;
+GetOptions("host=s" => \$host, "objects=i" => \$count, "size=i" => \$size)
+	or die "Usage: $0 [--host localhost] [--objects 500] [--size 10000]\n";
+
+my $impl = Bio::KBase::workspaceService::Impl->new({
+	"mongodb-host" => $host,
+	"mongodb-database" => "workspace_benchmark_$$",
+	accounttype => "simple"
+});
+my $db = $impl->_mongodb();
+
+#Returns the number of queries and getmores the server has answered
+sub roundTrips {
+	my $ops = $db->run_command({serverStatus => 1})->{opcounters};
+	return $ops->{query} + $ops->{getmore};
+}
+
+sub report {
+	my ($label,$start,$trips) = @_;
+	printf("%-12s %10.1f ms %10d round trips\n",$label,(time()-$start)*1000,roundTrips()-$trips);
+}
+
+eval {
+	my $chsums = [];
+	for (my $i=0; $i < $count; $i++) {
+		my $data = {id => "object".$i, padding => ("ACGT" x int($size/4))};
+		push(@{$chsums},$impl->_createDataObject($data)->chsum());
+	}
+	print "$count data objects of about $size bytes\n";
+
+	my $grid = $impl->_gridfs();
+	my $trips = roundTrips();
+	my $start = time();
+	foreach my $chsum (@{$chsums}) {
+		my $file = $grid->find_one({chsum => $chsum});
+		$file->slurp();
+	}
+	report("one by one",$start,$trips);
+
+	$trips = roundTrips();
+	$start = time();
+	my $objs = $impl->_getDataObjects($chsums);
+	report("batched",$start,$trips);
+	die "Batched read returned the wrong objects!\n"
+		if (join(",",map {$_->chsum()} @{$objs}) ne join(",",@{$chsums}));
+};
+my $error = $@;
+$db->drop();
+die $error if ($error);
@@ -0,0 +1,105 @@
+use FindBin qw($Bin);
+use lib $Bin.'/../lib';
+use Bio::KBase::workspaceService::CompressResponse;
+use strict;
+use warnings;
+use Test::More;
+use Plack::Test;
+use HTTP::Request::Common;
+use IO::Uncompress::Gunzip qw(gunzip);
+use IO::Uncompress::Inflate qw(inflate);
+my $test_count = 23;
+
+################################################################################
+#Test initialization: an app answering with a large or small body, given as an
+#array, a filehandle or through a streaming writer
+################################################################################
+my $large = '{"version":"1.1","result":[{"data":"'.("ACGT" x 1000).'"}]}';
+my $small = '{"version":"1.1","result":[1]}';
+my $app = sub {
+	my ($env) = @_;
+	my $body = $env->{PATH_INFO} =~ m/small/ ? $small : $large;
+	my $headers = ['Content-Type' => 'application/json','Content-Length' => length($body)];
+	if ($env->{PATH_INFO} =~ m/encoded/) {
+		push(@{$headers},'Content-Encoding' => 'identity');
+	}
+	if ($env->{PATH_INFO} =~ m/filehandle/) {
+		open(my $fh,'<',\$body);
+		return [200,$headers,$fh];
+	}
+	if ($env->{PATH_INFO} =~ m/streaming/) {
+		return sub {
+			my ($respond) = @_;
+			my $writer = $respond->([200,$headers]);
+			$writer->write($body);
+			$writer->close();
+		};
+	}
+	return [200,$headers,[$body]];
+};
+my $handler = Bio::KBase::workspaceService::CompressResponse->wrap($app,threshold => 1024,level => 6);
+################################################################################
+#Negotiating the encoding
+################################################################################
+is(Bio::KBase::workspaceService::CompressResponse::_chooseEncoding("gzip, deflate"),"gzip",
+	"gzip is preferred to deflate");
+is(Bio::KBase::workspaceService::CompressResponse::_chooseEncoding("gzip;q=0, deflate"),"deflate",
+	"gzip;q=0 refuses gzip");
+is(Bio::KBase::workspaceService::CompressResponse::_chooseEncoding("GZIP ; q=0.5"),"gzip",
+	"Codings and parameters are matched loosely");
+ok !defined(Bio::KBase::workspaceService::CompressResponse::_chooseEncoding("br, identity")),
+	"No encoding is chosen when neither gzip nor deflate is accepted";
+ok !defined(Bio::KBase::workspaceService::CompressResponse::_chooseEncoding(undef)),
+	"No encoding is chosen without an Accept-Encoding header";
+################################################################################
+#Compressing responses
+################################################################################
+test_psgi app => $handler, client => sub {
+	my ($cb) = @_;
+	my $res = $cb->(GET "/",'Accept-Encoding' => 'gzip, deflate');
+	is($res->header('Content-Encoding'),"gzip","A large response is gzipped");
+	is($res->header('Content-Length'),length($res->content),
+		"Content-Length is that of the gzipped body");
+	is($res->header('Vary'),"Accept-Encoding","The response varies by Accept-Encoding");
+	my $out;
+	gunzip(\$res->content => \$out);
+	is($out,$large,"The gzipped body inflates to the response");
+
+	$res = $cb->(GET "/",'Accept-Encoding' => 'gzip;q=0, deflate');
+	is($res->header('Content-Encoding'),"deflate","A client refusing gzip gets deflate");
+	$out = undef;
+	inflate(\$res->content => \$out);
+	is($out,$large,"The deflated body inflates to the response");
+
+	$res = $cb->(GET "/",'Accept-Encoding' => 'gzip;q=0');
+	ok !defined($res->header('Content-Encoding')) && $res->content eq $large,
+		"A client refusing every encoding gets the response as is";
+
+	$res = $cb->(GET "/");
+	ok !defined($res->header('Content-Encoding')) && $res->content eq $large,
+		"A client without Accept-Encoding gets the response as is";
+	is($res->header('Vary'),"Accept-Encoding","An uncompressed response also varies by Accept-Encoding");
+
+	$res = $cb->(GET "/small",'Accept-Encoding' => 'gzip');
+	ok !defined($res->header('Content-Encoding')),
+		"A response under the threshold is not compressed";
+	is($res->content,$small,"A response under the threshold is passed through");
+	is($res->header('Content-Length'),length($small),"A response under the threshold keeps its Content-Length");
+
+	$res = $cb->(GET "/filehandle",'Accept-Encoding' => 'gzip');
+	ok !defined($res->header('Content-Encoding')),
+		"A filehandle body is not compressed";
+	is($res->content,$large,"A filehandle body is passed through");
+
+	$res = $cb->(GET "/streaming",'Accept-Encoding' => 'gzip');
+	ok !defined($res->header('Content-Encoding')),
+		"A streamed response is not compressed";
+	is($res->content,$large,"A streamed response is passed through");
+
+	$res = $cb->(GET "/encoded",'Accept-Encoding' => 'gzip');
+	is($res->header('Content-Encoding'),"identity",
+		"A response with a Content-Encoding keeps it");
+	is($res->content,$large,"A response with a Content-Encoding is passed through");
+};
+
+done_testing($test_count);
@@ -7,7 +7,7 @@ use Test::More;
 use Test::Exception;
 use Test::Deep;
 use Data::Dumper;
-my $test_count = 93;
+my $test_count = 115;
 
 ################################################################################
 #Test intiailization: setting test config, instantiating Impl, getting auth token
@@ -53,15 +53,18 @@ my @impl_methods = qw(
 	set_global_workspace_permissions
 	set_workspace_permissions
 	save_object
+	save_objects
 	delete_workspace
 	delete_object
 	delete_object_permanently
 	get_object
 	get_objectmeta
+	get_objectmetas
 	revert_object
 	copy_object
 	move_object
 	has_object
+	has_objects
 	get_object_by_ref
 	get_objectmeta_by_ref
 	get_workspacemeta
@@ -511,6 +514,74 @@ eval {
 	$bool = $impl->has_object($conf2);
 };
 is($bool,0, "Confirm that Test2 does not exist");
+#Checking several objects at once
+my $bools;
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$bools = $impl->has_objects({
+		ids => ["Test1","Test2","Test1"],
+		types => ["TestData","TestData","TestData"],
+		workspaces => ["testworkspace","testworkspace","testworkspace"],
+		instances => [undef,undef,0],
+		auth => $oauth
+	});
+};
+is_deeply($bools,[1,0,1], "has_objects determined which objects exist");
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$bools = $impl->has_objects({
+		ids => ["Test1","Test1"],
+		types => ["Genome","Genome"],
+		workspaces => ["testworkspace","testworkspace"],
+		instances => [undef,0],
+		auth => $oauth
+	});
+};
+is_deeply($bools,[0,0], "has_objects finds no object of the wrong type, with or without an instance");
+my $gone = {
+	id => "TestGone",
+	type => "TestData",
+	data => {name => "gone"},
+	workspace => "testworkspace",
+	auth => $oauth
+};
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$impl->save_object($gone);
+	delete $gone->{data};
+	$impl->delete_object($gone);
+	$impl->delete_object_permanently($gone);
+	$bools = $impl->has_objects({
+		ids => ["TestGone","TestGone"],
+		types => ["TestData","TestData"],
+		workspaces => ["testworkspace","testworkspace"],
+		instances => [undef,0],
+		auth => $oauth
+	});
+};
+is_deeply($bools,[0,0], "has_objects finds no deleted object, with or without an instance");
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$metas = $impl->get_objectmetas({
+		ids => ["Test1","Test1"],
+		types => ["TestData","TestData"],
+		workspaces => ["testworkspace","testworkspace"],
+		instances => [undef,0],
+		auth => $oauth
+	});
+};
+ok @{$metas} == 2, "get_objectmetas returned two object metadatas";
+ok $metas->[0]->[0] eq "Test1" && $metas->[1]->[3] == 0,
+	"get_objectmetas returned the metadata of the requested objects";
+throws_ok {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$impl->get_objectmetas({
+		ids => ["Test1","Test2"],
+		types => ["TestData","TestData"],
+		workspaces => ["testworkspace","testworkspace"],
+		auth => $oauth
+	});
+} qr/Object testworkspace\/TestData\/Test2 not found!/, "get_objectmetas dies when an object is missing";
 
 # Test a few bad characters when saving IDs
 {
@@ -678,6 +749,54 @@ eval {
 ok defined($output), "Multiple objects retrieved at once!";
 ok @{$output} == 3, "Three objects retrieved at once!";
 ################################################################################
+# Saving multiple objects at once
+################################################################################
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$objmetas = $impl->save_objects({
+		objects => [
+			{id => "TestBulk1", type => "TestData", data => {name => "bulk1"}, workspace => "testworkspace2"},
+			{id => "TestBulk2", type => "TestData", data => {name => "bulk2"}, workspace => "testworkspace2"},
+			{id => "TestBulk1", type => "TestData", data => {name => "bulk3"}, workspace => "testworkspace2"}
+		],
+		auth => $oauth
+	});
+};
+is($@,'',"save_objects - Command ran without errors");
+ok @{$objmetas} == 3, "Three objects saved at once!";
+ok $objmetas->[2]->[3] == $objmetas->[0]->[3] + 1,
+	"save_objects saved the second TestBulk1 as the next instance of the first!";
+throws_ok {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$impl->save_objects({
+		objects => [
+			{id => "TestBulk3", type => "TestData", data => {name => "bulk4"}, workspace => "testworkspace2"},
+			{id => "TestBulk4", type => "NoSuchType", data => {name => "bulk5"}, workspace => "testworkspace2"}
+		],
+		auth => $oauth
+	});
+} qr/Specified type not valid!/, "save_objects dies when given an invalid type";
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$bool = $impl->has_object({id => "TestBulk3", type => "TestData", workspace => "testworkspace2", auth => $oauth});
+};
+is($bool,0, "save_objects saved nothing when one object was invalid");
+eval {
+	local $Bio::KBase::workspaceService::Server::CallContext = {};
+	$output = $impl->get_objects({
+		ids => ["TestBulk2","TestBulk1"],
+		types => ["TestData","TestData"],
+		workspaces => ["testworkspace2","testworkspace2"],
+		auth => $oauth
+	});
+};
+ok join(",",map {$_->{data}->{name}} @{$output}) eq "bulk2,bulk3",
+	"get_objects returned the data of each object in the requested order!";
+my $dataObj = $impl->_createDataObject({name => "bulk2"});
+$impl->_createDataObject({name => "bulk2"});
+ok $impl->_gridfs()->files()->find({chsum => $dataObj->chsum()})->count() == 1,
+	"Saving data already in the database does not store it again!";
+################################################################################
 # Cloning workspaces with objects
 ################################################################################ 
 $conf2 = {
@@ -781,6 +900,13 @@ ok !defined($typehash->{TempTestType}),
 	"TempTestType no longer exists!";
 ok defined($typehash->{Genome}),
 	"Genome exists!";
+#A type added by another server process is found once the type version changes
+$impl->_mongodb()->get_collection('typeObjects')->insert({id => "OtherProcessType",owner => "kbasetest",permanent => 0});
+$impl->_mongodb()->get_collection('typeRegistry')->update({id => "version"},{'$inc' => {version => 1}},{upsert => 1,safe => 1});
+lives_ok {$impl->_validateObjectType("OtherProcessType")}
+	"A type added by another process is accepted!";
+$impl->_mongodb()->get_collection('typeObjects')->remove({id => "OtherProcessType"});
+$impl->_typesChanged();
 
 # Test types with illegal characters throw an error
 {
@@ -790,6 +916,66 @@ ok defined($typehash->{Genome}),
 			"shouldn't add type Foo-bar - bad chars";
 }
 ################################################################################
+# Remembering validated authentications
+################################################################################
+{
+	$impl->_authenticate($oauth);
+	my $hits = $impl->_cacheStatistics()->{authentication}->{hits};
+	my $output = $impl->_authenticate($oauth);
+	ok $impl->_cacheStatistics()->{authentication}->{hits} == $hits + 1 && $output->{user} eq "kbasetest",
+		"A token validated before is taken from the cache!";
+	throws_ok {$impl->_authenticate("un=nobody|expiry=1|sig=bad")}
+			qr/Invalid authorization token/,
+			"An invalid token is rejected";
+	throws_ok {$impl->_authenticate("un=nobody|expiry=1|sig=bad")}
+			qr/Invalid authorization token/,
+			"An invalid token is rejected again from the cache";
+	#A token that fails to validate while the auth service is down is checked again on the next call
+	my $token = "un=kbasetest|expiry=".(time()+3600)."|sig=transient";
+	{
+		no warnings 'redefine';
+		local *Bio::KBase::AuthToken::validate = sub {return 0;};
+		throws_ok {$impl->_authenticate($token)}
+				qr/Invalid authorization token/,
+				"A token is rejected while its validation fails";
+	}
+	{
+		no warnings 'redefine';
+		local *Bio::KBase::AuthToken::validate = sub {return 1;};
+		local *Bio::KBase::AuthToken::user_id = sub {return "kbasetest";};
+		lives_ok {$impl->_authenticate($token)}
+				"A token whose validation failed transiently is not rejected from the cache";
+	}
+}
+################################################################################
+# Remembering workspace users between calls
+################################################################################
+{
+	$impl->_getWorkspaceUser("kbasetest");
+	my $hits = $impl->_cacheStatistics()->{workspaceUsers}->{hits};
+	my $user = $impl->_getWorkspaceUser("kbasetest");
+	ok $impl->_cacheStatistics()->{workspaceUsers}->{hits} == $hits + 1 && $user->id() eq "kbasetest",
+		"A workspace user read before is taken from the cache!";
+	$user->updateSettings("workspace","cachetest");
+	ok $impl->_getWorkspaceUser("kbasetest")->settings()->{workspace} eq "cachetest",
+		"Changing a workspace user removes it from the cache!";
+}
+{
+	#The cache statistics are written to the log of a call once the interval has passed
+	package LoggingContext;
+	sub new {return bless {messages => []},shift;}
+	sub log_info {my ($self,$message) = @_;push(@{$self->{messages}},$message);}
+	package main;
+	my $ctx = LoggingContext->new();
+	local $Bio::KBase::workspaceService::Server::CallContext = $ctx;
+	local $impl->{'_cache-stats-interval'} = 60;
+	local $impl->{_cacheStatsLogged} = time() - 61;
+	$impl->_logCacheStatistics();
+	$impl->_logCacheStatistics();
+	ok @{$ctx->{messages}} == 1 && $ctx->{messages}->[0] =~ m/^Cache statistics: authentication \d+ hits \d+ misses \([\d.]+% hit rate\), workspaceUsers/,
+		"The cache statistics are logged once per interval";
+}
+################################################################################
 #Cleanup: clearing out all objects from the workspace database
 ################################################################################ 
 $impl->_clearAllWorkspaces();
@@ -278,6 +278,25 @@ module workspaceService {
 	*/
 	funcdef save_object(save_object_params params) returns (object_metadata metadata) authentication optional;
 	
+	/* Input parameters for the "save_objects" function.
+	
+		list<save_object_params> objects - parameters for each object to be saved, as for the "save_object" function; the auth and asHash of each are ignored (an essential argument)
+		string auth - the authentication token of the KBase account to associate this save command
+		bool asHash - a boolean indicating if metadata should be returned as a hash
+	
+	*/
+	typedef structure {
+		list<save_object_params> objects;
+		string auth;
+		bool asHash;
+	} save_objects_params;
+	
+	/*
+		Saves the input objects into the selected workspaces, returning the object_metadata of each saved object in the order of the input.
+		Objects are checked and saved together, so this is much faster than calling "save_object" for each. If any object fails validation, none are saved.
+	*/
+	funcdef save_objects(save_objects_params params) returns (list<object_metadata> metadatas) authentication optional;
+	
 	/* Input parameters for the "delete_object" function.
 	
 		object_type type - type of the object to be deleted (an essential argument)
@@ -476,6 +495,31 @@ module workspaceService {
 	*/
 	funcdef get_objectmeta(get_objectmeta_params params) returns (object_metadata metadata) authentication optional; 
 	
+	/* Input parameters for the "get_objectmetas" function.
+	
+		list<object_id> ids - IDs of the objects for which metadata is to be retrieved, or references to them if their workspace is "NO_WORKSPACE" (an essential argument)
+		list<object_type> types - types of the objects for which metadata is to be retrieved (an essential argument)
+		list<workspace_id> workspaces - IDs of the workspaces containing the objects for which metadata is to be retrieved (an essential argument)
+		list<int> instances - Versions of the objects for which metadata is to be retrieved (an optional argument; the current metadata is retrieved for any version not provided)
+		string auth - the authentication token of the KBase account to associate with this object metadata retrieval command (an optional argument)
+		bool asHash - a boolean indicating if metadata should be returned as a hash
+			
+	*/
+	typedef structure { 
+		list<object_id> ids;
+		list<object_type> types;
+		list<workspace_id> workspaces;
+		list<int> instances;
+		string auth;
+		bool asHash;
+	} get_objectmetas_params;
+	
+	/*
+		Retrieves the metadata for the specified objects from the specified workspaces, in the order requested.
+		This is much faster than calling "get_objectmeta" for each object.
+	*/
+	funcdef get_objectmetas(get_objectmetas_params params) returns (list<object_metadata> metadatas) authentication optional;
+	
 	/* Input parameters for the "get_objectmeta_by_ref" function.
 	
 		workspace_ref reference - reference to a specific instance of a specific object in a workspace (an essential argument)
@@ -606,6 +650,29 @@ module workspaceService {
 	*/
 	funcdef has_object(has_object_params params) returns (bool object_present) authentication optional;
 	
+	/* Input parameters for the "has_objects" function.
+	
+		list<object_id> ids - IDs of the objects to be checked for existance, or references to them if their workspace is "NO_WORKSPACE" (an essential argument)
+		list<object_type> types - types of the objects to be checked for existance (an essential argument)
+		list<workspace_id> workspaces - IDs of the workspaces containing the objects to be checked for existance (an essential argument)
+		list<int> instances - Versions of the objects to be checked for existance (an optional argument; the current object is checked for any version not provided)
+		string auth - the authentication token of the KBase account to associate with this object check command (an optional argument)
+			
+	*/
+	typedef structure { 
+		list<object_id> ids;
+		list<object_type> types;
+		list<workspace_id> workspaces;
+		list<int> instances;
+		string auth;
+	} has_objects_params;
+	
+	/*
+		Checks if the specified objects in the specified workspaces exist.
+		Returns "1" for each object that exists and "0" for each that does not, in the order requested.
+	*/
+	funcdef has_objects(has_objects_params params) returns (list<bool> objects_present) authentication optional;
+	
 	/* Input parameters for the "object_history" function.
 	
 		object_type type - type of the object to have history printed (an essential argument)